@@ -4,6 +4,17 @@ from binance.um_futures import UMFutures
 from dotenv import load_dotenv
 import os
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from order_validation import fetch_market_data, validate_orders, print_violations
+from grid_layout import MODES, build_ladder, get_atr
+from grid_recenter import GridRecenter
+import runtime
+from profiling import span
+from shutdown import shutdown, cancel_working, flush_logs
+from metrics import METRICS
+from exchange_cache import get_exchange_info
+
 # =====================================================
 # Setup
 # =====================================================
@@ -32,7 +43,7 @@ logging.basicConfig(
 # =====================================================
 def is_valid_symbol(symbol):
     try:
-        info = client.exchange_info()
+        info = get_exchange_info(client)
         symbols = [s["symbol"] for s in info["symbols"]]
         return symbol in symbols
     except Exception as e:
@@ -55,7 +66,7 @@ def get_current_price(symbol):
 # =====================================================
 def get_min_notional(symbol):
     try:
-        info = client.exchange_info()
+        info = get_exchange_info(client)
         for s in info["symbols"]:
             if s["symbol"] == symbol:
                 for f in s["filters"]:
@@ -71,7 +82,7 @@ def get_min_notional(symbol):
 # =====================================================
 def validate_args(args):
     if len(args) < 6:
-        print("Usage: python grid_orders.py <symbol> <lower_price> <upper_price> <num_grids> <quantity>")
+        print("Usage: python grid_orders.py <symbol> <lower_price> <upper_price> <num_grids> <quantity> [--mode arithmetic|geometric|atr] [--recenter]")
         sys.exit(1)
 
     symbol = args[1].upper()
@@ -118,24 +129,48 @@ def validate_args(args):
 # =====================================================
 # Main logic: Place Grid Orders
 # =====================================================
-def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
+def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity, mode="arithmetic", recenter=False):
+    market = fetch_market_data(client, [symbol])
+    mid_price = market["prices"].get(symbol)
+
     print(f"🚀 Starting Grid Trading Strategy for {symbol}")
-    print(f"Range: {lower_price} → {upper_price} | Grids: {num_grids} | Qty: {quantity}")
+    print(f"Range: {lower_price} → {upper_price} | Grids: {num_grids} | Qty: {quantity} | Mode: {mode}")
     print("----------------------------------------------------")
 
-    logging.info(f"Grid Strategy Started for {symbol}: {lower_price}-{upper_price} ({num_grids} grids)")
+    logging.info(f"Grid Strategy Started for {symbol}: {lower_price}-{upper_price} ({num_grids} grids, {mode})")
+
+    # 1️⃣ Build a tick-aligned ladder ({mode} spacing)
+    filters = market["filters"].get(symbol)
+    tick_size = filters["tick_size"] if filters else 0.01
+    atr = get_atr(client, symbol) if mode == "atr" else None
+    if mode == "atr" and atr is None:
+        print("⚠️ ATR unavailable, falling back to arithmetic spacing.")
 
-    # 1️⃣ Calculate grid spacing
-    grid_gap = (upper_price - lower_price) / (num_grids - 1)
-    grid_prices = [round(lower_price + i * grid_gap, 2) for i in range(num_grids)]
+    # 2️⃣ Split into BUYs below and SELLs above the live price
+    buy_prices, sell_prices = build_ladder(lower_price, upper_price, num_grids, mode, tick_size, mid_price, atr)
 
-    # 2️⃣ Split into BUYs and SELLs
-    mid_index = num_grids // 2
-    buy_prices = grid_prices[:mid_index]
-    sell_prices = grid_prices[mid_index + 1:]
+    # 3️⃣ Validate the whole ladder in one pass before placing anything
+    ladder = [{"symbol": symbol, "side": "BUY", "type": "LIMIT", "quantity": quantity, "price": p} for p in buy_prices]
+    ladder += [{"symbol": symbol, "side": "SELL", "type": "LIMIT", "quantity": quantity, "price": p} for p in sell_prices]
+    violations = validate_orders(client, ladder, market=market)
+    if violations:
+        print_violations(violations)
+        logging.error(f"Grid rejected by pre-trade validation: {len(violations)} violations")
+        return
 
-    # 3️⃣ Place BUY orders below midpoint
+    # Re-centering mode: place in batches and follow the price out of the range
+    if recenter:
+        grid = GridRecenter(client, symbol, lower_price, upper_price, num_grids, quantity, mode, tick_size, mid_price, atr)
+        grid.run(buy_prices, sell_prices)
+        logging.info("Grid Strategy Execution Completed.\n")
+        return
+
+    # 4️⃣ Place BUY orders below the live price, nearest first
+    placed = []
+    stats = METRICS.strategy(f"grid {symbol}", "grid", symbol, len(ladder), "levels")
     for i, price in enumerate(buy_prices):
+        if shutdown.requested.is_set():
+            break
         try:
             order = client.new_order(
                 symbol=symbol,
@@ -145,6 +180,9 @@ def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
                 quantity=quantity,
                 price=price
             )
+            placed.append(order["orderId"])
+            stats.on_order(order)
+            stats.step(len(placed))
             msg = f"✅ BUY Limit [{i+1}] at {price} for {quantity} {symbol}"
             print(msg)
             logging.info(msg)
@@ -153,8 +191,10 @@ def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
             print(err)
             logging.error(err)
 
-    # 4️⃣ Place SELL orders above midpoint
+    # 5️⃣ Place SELL orders above the live price, nearest first
     for i, price in enumerate(sell_prices):
+        if shutdown.requested.is_set():
+            break
         try:
             order = client.new_order(
                 symbol=symbol,
@@ -164,6 +204,9 @@ def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
                 quantity=quantity,
                 price=price
             )
+            placed.append(order["orderId"])
+            stats.on_order(order)
+            stats.step(len(placed))
             msg = f"✅ SELL Limit [{i+1}] at {price} for {quantity} {symbol}"
             print(msg)
             logging.info(msg)
@@ -172,6 +215,17 @@ def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
             print(err)
             logging.error(err)
 
+    # A half-placed ladder is lopsided: take back what went out
+    if shutdown.requested.is_set():
+        cancelled = cancel_working(client, symbol, placed)
+        stats.finish("stopped")
+        msg = f"🛑 Grid placement stopped: {len(placed)}/{len(ladder)} levels placed, {cancelled} cancelled."
+        print(msg)
+        logging.warning(msg)
+        flush_logs()
+        return
+
+    stats.finish("placed")
     print("\n🎯 Grid Orders Successfully Placed!")
     print("💡 The bot will automatically profit from market oscillations.")
     logging.info("Grid Strategy Execution Completed.\n")
@@ -180,5 +234,24 @@ def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
 # Entry Point
 # =====================================================
 if __name__ == "__main__":
-    symbol, lower_price, upper_price, num_grids, quantity = validate_args(sys.argv)
-    place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity)
+    args = sys.argv[:]
+    options = runtime.flags(args)
+    mode = "arithmetic"
+    recenter = "--recenter" in args
+    if recenter:
+        args.remove("--recenter")
+    if "--mode" in args:
+        i = args.index("--mode")
+        mode = args[i + 1].lower()
+        del args[i:i + 2]
+    if mode not in MODES:
+        print(f"❌ Invalid grid mode. Use one of: {', '.join(MODES)}.")
+        sys.exit(1)
+
+    client = runtime.start(options, "grid_orders", client)
+    with span("validate"):
+        symbol, lower_price, upper_price, num_grids, quantity = validate_args(args)
+    runtime.setup(options, "grid_orders", client)
+    place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity, mode, recenter)
+    if options.paper and not recenter:
+        client.hold()
@@ -1,10 +1,20 @@
 import sys
 import logging
-import requests
 from binance.um_futures import UMFutures
 from dotenv import load_dotenv
 import os
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from order_validation import fetch_market_data, validate_orders, print_violations
+from grid_layout import MODES, build_ladder, get_atr
+from exchange_cache import get_exchange_info, round_to_step
+from sentiment import SentimentEngine, FEAR_THRESHOLD, GREED_THRESHOLD
+import runtime
+from profiling import span
+from shutdown import shutdown, cancel_working, flush_logs
+from metrics import METRICS
+
 # =====================================================
 # Setup
 # =====================================================
@@ -32,7 +42,7 @@ logging.basicConfig(
 # =====================================================
 def is_valid_symbol(symbol):
     try:
-        info = client.exchange_info()
+        info = get_exchange_info(client)
         symbols = [s["symbol"] for s in info["symbols"]]
         return symbol in symbols
     except Exception as e:
@@ -55,7 +65,7 @@ def get_current_price(symbol):
 # =====================================================
 def get_min_notional(symbol):
     try:
-        info = client.exchange_info()
+        info = get_exchange_info(client)
         for s in info["symbols"]:
             if s["symbol"] == symbol:
                 for f in s["filters"]:
@@ -67,32 +77,27 @@ def get_min_notional(symbol):
         return 100.0
 
 # =====================================================
-# NEW: Live Fear & Greed Index Fetcher
+# Helper: Live multi-source sentiment
 # =====================================================
-def get_live_fear_greed_index():
+def get_live_sentiment(symbol):
     """
-    Fetches latest Fear & Greed Index from alternative.me API.
-    Returns value (0–100) and textual classification.
+    Starts the sentiment engine (Fear & Greed, funding rate, open interest,
+    long/short ratio) and returns it with its composite 0–100 index.
     """
-    try:
-        url = "https://api.alternative.me/fng/?limit=1"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        value = int(data["data"][0]["value"])
-        classification = data["data"][0]["value_classification"]
-        print(f"📊 Live Fear & Greed Index: {value} ({classification})")
-        return value, classification
-    except Exception as e:
-        print(f"⚠️ Could not fetch live Fear & Greed Index: {e}")
-        return 50, "Neutral"  # fallback
+    engine = SentimentEngine.default(client, symbol).start()
+    value, classification = engine.index_value(), engine.classification()
+    print(f"📊 Live Sentiment Index: {value} ({classification})")
+    for name, feed in engine.snapshot()["feeds"].items():
+        if feed["signal"] is not None:
+            print(f"   • {name}: {feed['raw']} → {feed['signal']:+.2f}")
+    return engine, value, classification
 
 # =====================================================
 # Helper: Validate user input
 # =====================================================
 def validate_args(args):
     if len(args) < 6:
-        print("Usage: python grid_orders_with_sentiment.py <symbol> <lower_price> <upper_price> <num_grids> <quantity>")
+        print("Usage: python grid_orders_with_sentiment.py <symbol> <lower_price> <upper_price> <num_grids> <quantity> [--mode arithmetic|geometric|atr]")
         sys.exit(1)
 
     symbol = args[1].upper()
@@ -139,17 +144,18 @@ def validate_args(args):
 # =====================================================
 # Main logic: Place Grid Orders (Sentiment-Adaptive)
 # =====================================================
-def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
+def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity, mode="arithmetic"):
     # 1️⃣ Get live market sentiment
-    index_value, classification = get_live_fear_greed_index()
+    sentiment, index_value, classification = get_live_sentiment(symbol)
+    sentiment.stop()
 
     # 2️⃣ Adjust grid parameters based on sentiment
-    if index_value <= 25:
+    if index_value <= FEAR_THRESHOLD:
         print("😨 Market in Extreme Fear → Widening grid & increasing buy size.")
         lower_price *= 0.98        # extend lower bound
         upper_price *= 1.02        # extend upper bound
         quantity *= 1.2            # buy more per level
-    elif index_value >= 75:
+    elif index_value >= GREED_THRESHOLD:
         print("🚀 Market in Extreme Greed → Tightening grid & reducing buy size.")
         lower_price *= 1.01        # shift range up
         upper_price *= 0.99
@@ -157,24 +163,43 @@ def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
     else:
         print("🙂 Market Neutral → Standard grid parameters.")
 
+    market = fetch_market_data(client, [symbol])
+    mid_price = market["prices"].get(symbol)
+    filters = market["filters"].get(symbol)
+    if filters:
+        quantity = round_to_step(quantity, filters["step_size"])   # keep scaled size on the lot step
+
     print(f"\n🚀 Starting Grid Trading Strategy for {symbol}")
     print(f"Market Sentiment: {classification} ({index_value})")
-    print(f"Range: {lower_price:.2f} → {upper_price:.2f} | Grids: {num_grids} | Qty: {quantity:.6f}")
+    print(f"Range: {lower_price:.2f} → {upper_price:.2f} | Grids: {num_grids} | Qty: {quantity:.6f} | Mode: {mode}")
     print("----------------------------------------------------")
 
     logging.info(f"Grid Strategy Started for {symbol}: {lower_price}-{upper_price} ({num_grids} grids) | Sentiment: {classification} ({index_value})")
 
-    # 3️⃣ Calculate grid spacing
-    grid_gap = (upper_price - lower_price) / (num_grids - 1)
-    grid_prices = [round(lower_price + i * grid_gap, 2) for i in range(num_grids)]
+    # 3️⃣ Build a tick-aligned ladder ({mode} spacing)
+    tick_size = filters["tick_size"] if filters else 0.01
+    atr = get_atr(client, symbol) if mode == "atr" else None
+    if mode == "atr" and atr is None:
+        print("⚠️ ATR unavailable, falling back to arithmetic spacing.")
 
-    # 4️⃣ Split into BUYs and SELLs
-    mid_index = num_grids // 2
-    buy_prices = grid_prices[:mid_index]
-    sell_prices = grid_prices[mid_index + 1:]
+    # 4️⃣ Split into BUYs below and SELLs above the live price
+    buy_prices, sell_prices = build_ladder(lower_price, upper_price, num_grids, mode, tick_size, mid_price, atr)
 
-    # 5️⃣ Place BUY orders below midpoint
+    # 5️⃣ Validate the whole ladder in one pass before placing anything
+    ladder = [{"symbol": symbol, "side": "BUY", "type": "LIMIT", "quantity": quantity, "price": p} for p in buy_prices]
+    ladder += [{"symbol": symbol, "side": "SELL", "type": "LIMIT", "quantity": quantity, "price": p} for p in sell_prices]
+    violations = validate_orders(client, ladder, market=market)
+    if violations:
+        print_violations(violations)
+        logging.error(f"Grid rejected by pre-trade validation: {len(violations)} violations")
+        return
+
+    # 6️⃣ Place BUY orders below the live price, nearest first
+    placed = []
+    stats = METRICS.strategy(f"grid {symbol}", "grid", symbol, len(ladder), "levels")
     for i, price in enumerate(buy_prices):
+        if shutdown.requested.is_set():
+            break
         try:
             order = client.new_order(
                 symbol=symbol,
@@ -184,6 +209,9 @@ def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
                 quantity=quantity,
                 price=price
             )
+            placed.append(order["orderId"])
+            stats.on_order(order)
+            stats.step(len(placed))
             msg = f"✅ BUY Limit [{i+1}] at {price} for {quantity} {symbol}"
             print(msg)
             logging.info(msg)
@@ -192,8 +220,10 @@ def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
             print(err)
             logging.error(err)
 
-    # 6️⃣ Place SELL orders above midpoint
+    # 7️⃣ Place SELL orders above the live price, nearest first
     for i, price in enumerate(sell_prices):
+        if shutdown.requested.is_set():
+            break
         try:
             order = client.new_order(
                 symbol=symbol,
@@ -203,6 +233,9 @@ def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
                 quantity=quantity,
                 price=price
             )
+            placed.append(order["orderId"])
+            stats.on_order(order)
+            stats.step(len(placed))
             msg = f"✅ SELL Limit [{i+1}] at {price} for {quantity} {symbol}"
             print(msg)
             logging.info(msg)
@@ -211,6 +244,17 @@ def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
             print(err)
             logging.error(err)
 
+    # A half-placed ladder is lopsided: take back what went out
+    if shutdown.requested.is_set():
+        cancelled = cancel_working(client, symbol, placed)
+        stats.finish("stopped")
+        msg = f"🛑 Grid placement stopped: {len(placed)}/{len(ladder)} levels placed, {cancelled} cancelled."
+        print(msg)
+        logging.warning(msg)
+        flush_logs()
+        return
+
+    stats.finish("placed")
     print("\n🎯 Grid Orders Successfully Placed!")
     print("💡 The bot will automatically profit from market oscillations based on sentiment.")
     logging.info("Grid Strategy Execution Completed.\n")
@@ -219,5 +263,21 @@ def place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity):
 # Entry Point
 # =====================================================
 if __name__ == "__main__":
-    symbol, lower_price, upper_price, num_grids, quantity = validate_args(sys.argv)
-    place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity)
+    args = sys.argv[:]
+    options = runtime.flags(args)
+    mode = "arithmetic"
+    if "--mode" in args:
+        i = args.index("--mode")
+        mode = args[i + 1].lower()
+        del args[i:i + 2]
+    if mode not in MODES:
+        print(f"❌ Invalid grid mode. Use one of: {', '.join(MODES)}.")
+        sys.exit(1)
+
+    client = runtime.start(options, "grid_orders_with_sentiment", client)
+    with span("validate"):
+        symbol, lower_price, upper_price, num_grids, quantity = validate_args(args)
+    runtime.setup(options, "grid_orders_with_sentiment", client)
+    place_grid_orders(symbol, lower_price, upper_price, num_grids, quantity, mode)
+    if options.paper:
+        client.hold()
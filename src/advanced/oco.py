@@ -1,19 +1,19 @@
 import sys
 import logging
-from binance.um_futures import UMFutures
-from dotenv import load_dotenv
 import os
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from client_factory import create_client
+from paper import PaperExchange, paper_flag
+from profiling import profile_flag, start_profiling, span
+from exchange_cache import get_exchange_info
+
 # -----------------------------------------------------
 # Setup
 # -----------------------------------------------------
-load_dotenv()
-
-API_KEY = os.getenv("API_KEY")
-API_SECRET = os.getenv("API_SECRET")
-BASE_URL = os.getenv("BASE_URL", "https://testnet.binancefuture.com")
-
-client = UMFutures(key=API_KEY, secret=API_SECRET, base_url=BASE_URL)
+# Built in __main__ once the arguments have been checked (see client_factory)
+client = None
 
 # -----------------------------------------------------
 # Setup logging (always write to Satvik-binance-bot/bot.log)
@@ -37,7 +37,7 @@ print(f"📝 Logging to: {LOG_FILE}")
 # -----------------------------------------------------
 def is_valid_symbol(symbol):
     try:
-        info = client.exchange_info()
+        info = get_exchange_info(client)
         symbols = [s["symbol"] for s in info["symbols"]]
         return symbol in symbols
     except Exception as e:
@@ -49,7 +49,7 @@ def is_valid_symbol(symbol):
 # -----------------------------------------------------
 def get_min_notional(symbol):
     try:
-        info = client.exchange_info()
+        info = get_exchange_info(client)
         for s in info["symbols"]:
             if s["symbol"] == symbol:
                 for f in s["filters"]:
@@ -82,7 +82,10 @@ def show_price_hint(symbol, side):
 # -----------------------------------------------------
 # Helper: Validate user input
 # -----------------------------------------------------
-def validate_args(args):
+def parse_args(args):
+    """
+    Local checks only, so a bad invocation exits before any network work.
+    """
     if len(args) < 6:
         print("Usage: python oco_orders.py <symbol> <BUY/SELL> <quantity> <takeProfitPrice> <stopLossPrice>")
         sys.exit(1)
@@ -109,6 +112,12 @@ def validate_args(args):
         print("❌ Quantity and prices must be greater than 0.")
         sys.exit(1)
 
+    return symbol, side, quantity, take_profit, stop_loss
+
+
+def validate_args(args):
+    symbol, side, quantity, take_profit, stop_loss = parse_args(args)
+
     # Validate symbol
     if not is_valid_symbol(symbol):
         print(f"❌ Invalid trading symbol: {symbol}")
@@ -185,5 +194,17 @@ def place_oco_order(symbol, side, quantity, take_profit, stop_loss):
 # Entry Point
 # -----------------------------------------------------
 if __name__ == "__main__":
-    symbol, side, quantity, take_profit, stop_loss = validate_args(sys.argv)
+    args = sys.argv[:]
+    paper = paper_flag(args)
+    profile = profile_flag(args)
+    parse_args(args)
+    client = create_client()
+    if paper:
+        client = PaperExchange(client).start()
+    if profile:
+        start_profiling("oco", client)
+    with span("validate"):
+        symbol, side, quantity, take_profit, stop_loss = validate_args(args)
     place_oco_order(symbol, side, quantity, take_profit, stop_loss)
+    if paper:
+        client.hold()
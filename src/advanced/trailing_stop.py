@@ -0,0 +1,456 @@
+import sys
+import time
+import heapq
+import logging
+import threading
+from binance.um_futures import UMFutures
+from dotenv import load_dotenv
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from exchange_cache import get_symbol_filters, round_to_step, round_up_to_step, FILTER_REJECT_CODES
+from order_submit import submit_order, client_order_id, OrderUnknownError
+from rate_limiter import ORDER_LIMITER
+from records import OrderRecord
+from price_feed import PriceFeed
+import runtime
+from profiling import span
+from shutdown import shutdown, flush_logs
+
+# =====================================================
+# Setup
+# =====================================================
+load_dotenv()
+
+API_KEY = os.getenv("API_KEY")
+API_SECRET = os.getenv("API_SECRET")
+BASE_URL = os.getenv("BASE_URL", "https://testnet.binancefuture.com")
+
+client = UMFutures(key=API_KEY, secret=API_SECRET, base_url=BASE_URL)
+
+# Logging setup
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+LOG_FILE = os.path.join(PROJECT_ROOT, "bot.log")
+
+logging.basicConfig(
+    filename=LOG_FILE,
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+ORDER_GONE_CODES = (-2011, -2013)   # unknown order / order does not exist
+RETRY_DELAY = 2                     # seconds before a failed stop placement is retried
+MAX_REJECTS = 3                     # exchange rejections in a row before a stop stops retrying
+
+# =====================================================
+# Trailing stop state
+# =====================================================
+class TrailingStop:
+    """
+    One trailing stop protecting a position. side is the closing order side:
+    SELL trails below a long position, BUY trails above a short position.
+    """
+
+    def __init__(self, stop_id, symbol, side, quantity, callback_rate, tick_size, price):
+        self.stop_id = stop_id
+        self.symbol = symbol
+        self.side = side
+        self.quantity = quantity
+        self.callback_rate = callback_rate   # fraction, 0.01 == 1%
+        self.tick_size = tick_size
+        self.stop_price = self.trail_from(price)
+        self.version = 0
+        self.active = True
+        self.client_id = None
+        self.order = None   # OrderRecord of the working stop order
+        self.rejects = 0   # placements the exchange rejected in a row
+
+    def trail_from(self, price):
+        if self.side == "SELL":
+            return round_to_step(price * (1 - self.callback_rate), self.tick_size)
+        return round_up_to_step(price * (1 + self.callback_rate), self.tick_size)
+
+    def next_move_price(self):
+        """
+        Price at which the trail would move by at least one tick.
+        """
+        if self.side == "SELL":
+            return (self.stop_price + self.tick_size) / (1 - self.callback_rate)
+        return (self.stop_price - self.tick_size) / (1 + self.callback_rate)
+
+
+class SymbolBook:
+    """
+    Heaps of trailing stops for one symbol. Each tick only pops the stops
+    whose trail actually moves or triggers, so a tick costs O(k log n) for
+    k affected stops instead of recomputing all n. Superseded heap entries
+    are skipped lazily via the stop version.
+    """
+
+    def __init__(self):
+        self.sell_moves = []      # min-heap of next_move_price (moves when price rises)
+        self.sell_triggers = []   # max-heap of stop_price (fires when price falls)
+        self.buy_moves = []       # max-heap of next_move_price (moves when price falls)
+        self.buy_triggers = []    # min-heap of stop_price (fires when price rises)
+
+    def push(self, stop):
+        entry_id = (stop.version, stop.stop_id)
+        if stop.side == "SELL":
+            heapq.heappush(self.sell_moves, (stop.next_move_price(), *entry_id))
+            heapq.heappush(self.sell_triggers, (-stop.stop_price, *entry_id))
+        else:
+            heapq.heappush(self.buy_moves, (-stop.next_move_price(), *entry_id))
+            heapq.heappush(self.buy_triggers, (stop.stop_price, *entry_id))
+
+    @staticmethod
+    def _pop_while(heap, crossed, stops):
+        hits = []
+        while heap:
+            key, version, stop_id = heap[0]
+            stop = stops.get(stop_id)
+            if stop is None or not stop.active or stop.version != version:
+                heapq.heappop(heap)  # stale entry
+                continue
+            if not crossed(key):
+                break
+            heapq.heappop(heap)
+            hits.append(stop)
+        return hits
+
+    def on_price(self, price, stops):
+        triggered = self._pop_while(self.sell_triggers, lambda k: price <= -k, stops)
+        triggered += self._pop_while(self.buy_triggers, lambda k: price >= k, stops)
+        for stop in triggered:
+            stop.active = False
+
+        candidates = self._pop_while(self.sell_moves, lambda k: price >= k, stops)
+        candidates += self._pop_while(self.buy_moves, lambda k: price <= -k, stops)
+        moved = []
+        for stop in candidates:
+            new_stop = stop.trail_from(price)
+            if new_stop != stop.stop_price:
+                stop.stop_price = new_stop
+                moved.append(stop)
+            stop.version += 1
+            self.push(stop)
+        return triggered, moved
+
+# =====================================================
+# Trailing stop engine
+# =====================================================
+class TrailingStopEngine:
+    """
+    Trails many positions from the local price stream and keeps one
+    reduce-only STOP_MARKET per position on the exchange. The exchange
+    order is cancel-replaced only when the trail moves by at least one
+    tick; bursts of moves are coalesced to the latest stop per position.
+    """
+
+    def __init__(self, client, feed, limiter=ORDER_LIMITER):
+        self.client = client
+        self.feed = feed
+        self.limiter = limiter
+        self.stops = {}
+        self.books = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.order_lock = threading.Lock()   # one cancel/replace (or the final cancel) at a time
+        self.wakeup = threading.Event()
+        self.running = True
+        self.run_id = int(time.time() * 1000)   # keeps ids unique across restarts
+        feed.add_listener(self.on_price)
+
+    def add(self, symbol, side, quantity, callback_pct, price):
+        filters = get_symbol_filters(self.client, symbol)
+        tick_size = filters["tick_size"] if filters else 0.01
+        stop = TrailingStop(len(self.stops) + 1, symbol, side, quantity, callback_pct / 100, tick_size, price)
+        with self.lock:
+            self.stops[stop.stop_id] = stop
+            self.books.setdefault(symbol, SymbolBook()).push(stop)
+        self._replace_order(stop)
+        return stop
+
+    def start(self):
+        threading.Thread(target=self._amend_worker, daemon=True).start()
+
+    def active_count(self):
+        return sum(1 for stop in self.stops.values() if stop.active)
+
+    def on_price(self, symbol, price, event_time=None):
+        book = self.books.get(symbol)
+        if book is None:
+            return
+        with self.lock:
+            triggered, moved = book.on_price(price, self.stops)
+            for stop in moved:
+                self.pending[stop.stop_id] = stop
+        for stop in triggered:
+            msg = f"🛑 Trailing stop #{stop.stop_id} hit: {stop.side} {stop.quantity} {symbol} at stop {stop.stop_price} (last {price})."
+            print(msg)
+            logging.info(msg)
+        if moved:
+            self.wakeup.set()
+
+    def stop(self):
+        """
+        Stops trailing and cancels every working stop order. Returns
+        (cancelled, working).
+        """
+        with self.order_lock:
+            self.running = False
+            working = [stop for stop in self.stops.values() if stop.active and stop.client_id]
+            cancelled = 0
+            for stop in working:
+                self.limiter.acquire()
+                try:
+                    self.client.cancel_order(symbol=stop.symbol, origClientOrderId=stop.client_id)
+                    cancelled += 1
+                except Exception as e:
+                    logging.error(f"❌ Failed to cancel trailing stop #{stop.stop_id}: {e}")
+        self.wakeup.set()
+        return cancelled, len(working)
+
+    def _amend_worker(self):
+        while self.running:
+            self.wakeup.wait()
+            with self.lock:
+                batch = list(self.pending.values())
+                self.pending.clear()
+                self.wakeup.clear()
+            for stop in batch:
+                if stop.active:
+                    self._replace_order(stop)
+
+    def _retry_later(self, stop):
+        def retry():
+            with self.lock:
+                if stop.active:
+                    self.pending[stop.stop_id] = stop
+            self.wakeup.set()
+
+        timer = threading.Timer(RETRY_DELAY, retry)
+        timer.daemon = True
+        timer.start()
+
+    def _replace_order(self, stop):
+        with self.order_lock:
+            if self.running:
+                self._cancel_replace(stop)
+
+    def _refresh_tick_size(self, stop):
+        # The stop price was rejected on a filter: re-round it to the tick
+        # size the exchange uses now (the refetch is throttled in the cache)
+        try:
+            filters = get_symbol_filters(self.client, stop.symbol)
+        except Exception as e:
+            logging.warning(f"Could not refresh filters for trailing stop #{stop.stop_id}: {e}")
+            return
+        if filters and filters["tick_size"] != stop.tick_size:
+            stop.tick_size = filters["tick_size"]
+            if stop.side == "SELL":
+                stop.stop_price = round_to_step(stop.stop_price, stop.tick_size)
+            else:
+                stop.stop_price = round_up_to_step(stop.stop_price, stop.tick_size)
+
+    def _cancel_replace(self, stop):
+        old_client_id = stop.client_id
+        stop_price = stop.stop_price
+        if old_client_id:
+            self.limiter.acquire()
+            try:
+                self.client.cancel_order(symbol=stop.symbol, origClientOrderId=old_client_id)
+            except Exception as e:
+                code = getattr(e, "error_code", None)
+                if code not in ORDER_GONE_CODES:
+                    # The old stop may still be working and still protects the
+                    # position; the next move retries the replace, or the
+                    # timer if the exchange could not be reached
+                    logging.error(f"❌ Failed to cancel trailing stop #{stop.stop_id}: {e}")
+                    if code is None:
+                        self._retry_later(stop)
+                    return
+                # Gone already (triggered or cancelled): place the new one anyway
+                logging.warning(f"Trailing stop #{stop.stop_id} order {old_client_id} was no longer open: {e}")
+            stop.client_id = None
+            stop.order = None
+
+        # Same stop and version, same id: a retry after a lost response finds
+        # the order that landed instead of placing a second one
+        client_id = client_order_id("trail", self.run_id, stop.stop_id, stop.version)
+        self.limiter.acquire()
+        try:
+            order = submit_order(
+                self.client,
+                client_id,
+                symbol=stop.symbol,
+                side=stop.side,
+                type="STOP_MARKET",
+                quantity=stop.quantity,
+                stopPrice=stop_price,
+                reduceOnly="true"
+            )
+            stop.client_id = client_id
+            stop.order = OrderRecord.from_dict(order)
+            stop.rejects = 0
+            msg = (f"✅ Trailing stop #{stop.stop_id} {stop.side} {stop.quantity} {stop.symbol} set at {stop_price} "
+                   f"(order {stop.order.order_id})")
+            print(msg)
+            logging.info(msg)
+        except OrderUnknownError as e:
+            # It may be working: track it so the retry (or shutdown) cancels
+            # it before anything else is placed
+            stop.client_id = client_id
+            err = f"⚠️ Trailing stop #{stop.stop_id} status unknown, checking again in {RETRY_DELAY}s: {e}"
+            print(err)
+            logging.error(err)
+            self._retry_later(stop)
+        except Exception as e:
+            code = getattr(e, "error_code", None)
+            if code is not None:
+                stop.rejects += 1
+                if code in FILTER_REJECT_CODES:
+                    self._refresh_tick_size(stop)
+                if stop.rejects >= MAX_REJECTS:
+                    err = (f"❌ Trailing stop #{stop.stop_id} rejected {stop.rejects} times, not retrying until "
+                           f"the trail moves; {stop.symbol} position is unprotected: {e}")
+                    print(err)
+                    logging.error(err)
+                    return
+            # Nothing protects the position now: keep trying
+            err = f"❌ Failed to place trailing stop #{stop.stop_id}, retrying in {RETRY_DELAY}s: {e}"
+            print(err)
+            logging.error(err)
+            self._retry_later(stop)
+
+# =====================================================
+# Helper: Load open positions
+# =====================================================
+def get_open_positions(symbol):
+    """
+    Returns [(symbol, closing_side, quantity)] for open positions.
+    symbol may be "ALL".
+    """
+    try:
+        params = {} if symbol == "ALL" else {"symbol": symbol}
+        positions = client.get_position_risk(**params)
+    except Exception as e:
+        print(f"⚠️ Could not fetch open positions: {e}")
+        return []
+
+    result = []
+    for p in positions:
+        amount = float(p["positionAmt"])
+        if amount != 0:
+            result.append((p["symbol"], "SELL" if amount > 0 else "BUY", abs(amount)))
+    return result
+
+# =====================================================
+# Helper: Validate user input
+# =====================================================
+def validate_args(args):
+    if len(args) < 3:
+        print("Usage: python trailing_stop.py <symbol|ALL> <callback_percent> [--native]")
+        sys.exit(1)
+
+    symbol = args[1].upper()
+    try:
+        callback_pct = float(args[2])
+    except ValueError:
+        print("❌ Invalid input. Callback percent must be numeric.")
+        sys.exit(1)
+
+    if not 0 < callback_pct < 100:
+        print("❌ Callback percent must be between 0 and 100.")
+        sys.exit(1)
+
+    native = "--native" in args
+    if native and not 0.1 <= callback_pct <= 5:
+        print("❌ TRAILING_STOP_MARKET only supports callback rates between 0.1% and 5%.")
+        sys.exit(1)
+
+    positions = get_open_positions(symbol)
+    if not positions:
+        print(f"❌ No open positions found for {symbol}.")
+        sys.exit(1)
+
+    return positions, callback_pct, native
+
+# =====================================================
+# Main logic
+# =====================================================
+def place_native_trailing_stops(positions, callback_pct):
+    """
+    Lets the exchange trail the stop with TRAILING_STOP_MARKET (0.1–5%).
+    """
+    for symbol, side, quantity in positions:
+        ORDER_LIMITER.acquire()
+        try:
+            order = client.new_order(
+                symbol=symbol,
+                side=side,
+                type="TRAILING_STOP_MARKET",
+                quantity=quantity,
+                callbackRate=callback_pct,
+                reduceOnly="true"
+            )
+            msg = f"✅ TRAILING_STOP_MARKET {side} {quantity} {symbol} ({callback_pct}% callback)"
+            print(msg)
+            logging.info(msg)
+            logging.info(f"Order response: {order}")
+        except Exception as e:
+            err = f"❌ Failed to place trailing stop for {symbol}: {e}"
+            print(err)
+            logging.error(err)
+
+
+def run_trailing_stops(positions, callback_pct):
+    symbols = sorted({p[0] for p in positions})
+    feed = PriceFeed()
+    engine = TrailingStopEngine(client, feed)
+    engine.start()
+
+    for symbol, side, quantity in positions:
+        try:
+            price = float(client.ticker_price(symbol)["price"])
+        except Exception as e:
+            print(f"⚠️ Could not fetch current price for {symbol}, skipping: {e}")
+            continue
+        engine.add(symbol, side, quantity, callback_pct, price)
+
+    feed.start(symbols)
+    logging.info(f"Trailing stop engine started for {len(positions)} positions ({callback_pct}% callback)")
+    print(f"🚀 Trailing {engine.active_count()} positions. Press Ctrl-C to stop trailing and cancel the stops.")
+    try:
+        while engine.active_count() and not shutdown.sleep(1):
+            pass
+        if shutdown.requested.is_set():
+            hit = sum(1 for stop in engine.stops.values() if not stop.active)
+            cancelled, working = engine.stop()
+            msg = (f"🛑 Trailing stopped: {hit}/{len(engine.stops)} stops had triggered, "
+                   f"{cancelled}/{working} working stop orders cancelled (those positions are no longer protected).")
+            print(msg)
+            logging.warning(msg)
+    except KeyboardInterrupt:
+        print("\n⏹️ Trailing stopped. Last stop orders remain on the exchange.")
+    finally:
+        feed.stop()
+        logging.info("Trailing stop engine finished.\n")
+        flush_logs()
+
+# =====================================================
+# Entry point
+# =====================================================
+if __name__ == "__main__":
+    args = sys.argv[:]
+    options = runtime.flags(args)
+    client = runtime.start(options, "trailing_stop", client)
+    with span("validate"):
+        positions, callback_pct, native = validate_args(args)
+    # No risk layer: a kill switch must not block the protective stops
+    runtime.setup(options, "trailing_stop", client, risk=False)
+    if native:
+        place_native_trailing_stops(positions, callback_pct)
+    else:
+        run_trailing_stops(positions, callback_pct)
@@ -5,6 +5,18 @@ from binance.um_futures import UMFutures
 from dotenv import load_dotenv
 import os
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from order_validation import fetch_market_data, validate_orders, print_violations, twap_slices
+import runtime
+from profiling import span
+from tca import ExecutionRecorder
+from order_submit import submit_order, client_order_id
+from funding import FundingSchedule
+from shutdown import shutdown, flush_logs
+from metrics import METRICS
+from exchange_cache import get_exchange_info
+
 # =====================================================
 # Setup
 # =====================================================
@@ -32,7 +44,7 @@ logging.basicConfig(
 # =====================================================
 def is_valid_symbol(symbol):
     try:
-        info = client.exchange_info()
+        info = get_exchange_info(client)
         symbols = [s["symbol"] for s in info["symbols"]]
         return symbol in symbols
     except Exception as e:
@@ -50,28 +62,12 @@ def get_current_price(symbol):
         print(f"⚠️ Could not fetch current market price: {e}")
         return None
 
-# =====================================================
-# Helper: Minimum Notional Check
-# =====================================================
-def get_min_notional(symbol):
-    try:
-        info = client.exchange_info()
-        for s in info["symbols"]:
-            if s["symbol"] == symbol:
-                for f in s["filters"]:
-                    if f["filterType"] == "MIN_NOTIONAL":
-                        return float(f["notional"])
-        return 100.0  # fallback
-    except Exception as e:
-        print(f"⚠️ Could not fetch minimum notional info: {e}")
-        return 100.0
-
 # =====================================================
 # Helper: Validate user arguments
 # =====================================================
 def validate_args(args):
     if len(args) < 6:
-        print("Usage: python twap_orders.py <symbol> <BUY/SELL> <total_qty> <num_slices> <interval_seconds>")
+        print("Usage: python twap_orders.py <symbol> <BUY/SELL> <total_qty> <num_slices> <interval_seconds> [--funding]")
         sys.exit(1)
 
     symbol = args[1].upper()
@@ -95,76 +91,133 @@ def validate_args(args):
         print(f"❌ Invalid trading symbol: {symbol}")
         sys.exit(1)
 
-    # 4️⃣ Split into equal chunks
-    chunk_qty = total_qty / num_slices
-
-    # 5️⃣ Notional validation for each chunk
-    current_price = get_current_price(symbol)
-    if current_price:
-        notional = current_price * chunk_qty
-        min_notional = get_min_notional(symbol)
-        if notional < min_notional:
-            print(f"❌ Each chunk notional ({notional:.2f}) is below the minimum required ({min_notional:.2f} USDT).")
-            sys.exit(1)
-    else:
+    # 4️⃣ Split into lot-step chunks; the last slice takes the remainder
+    market = fetch_market_data(client, [symbol])
+    current_price = market["prices"].get(symbol)
+    slices = twap_slices(symbol, side, total_qty, num_slices, market["filters"].get(symbol))
+    quantities = [s["quantity"] for s in slices]
+
+    # 5️⃣ Validate every slice (notional, step size) in one pass
+    violations = validate_orders(client, slices, market=market)
+    if violations:
+        print_violations(violations)
+        sys.exit(1)
+    if not current_price:
         print("⚠️ Could not verify notional value (price unavailable). Proceed with caution.")
 
     print(f"\n📊 Current {symbol} Price: {current_price:.2f} USDT" if current_price else "")
     print(f"✅ Validation Passed!")
-    print(f"→ Total Qty: {total_qty}, Slices: {num_slices}, Chunk Size: {chunk_qty:.6f}, Interval: {interval}s\n")
+    print(f"→ Total Qty: {total_qty}, Slices: {num_slices}, Chunk Size: {quantities[0]:g}"
+          f"{f' (last {quantities[-1]:g})' if quantities[-1] != quantities[0] else ''}, Interval: {interval}s\n")
 
-    return symbol, side, total_qty, num_slices, interval, chunk_qty
+    return symbol, side, total_qty, num_slices, interval, quantities
 
 # =====================================================
 # TWAP Execution Logic
 # =====================================================
-def execute_twap(symbol, side, total_qty, num_slices, interval, chunk_qty):
+def execute_twap(symbol, side, total_qty, num_slices, interval, quantities, schedule=None):
+    """
+    Sends the num_slices market orders in quantities (see twap_slices),
+    interval seconds apart. With a
+    FundingSchedule, slices that would fill just before a funding payment
+    on the paying side are held until after settlement, and the interval
+    shrinks while the mark/index basis favours the order.
+    """
     print(f"🚀 Starting TWAP Execution for {symbol}")
     print(f"Side: {side}")
     print(f"Total Quantity: {total_qty}")
-    print(f"Split: {num_slices} × {chunk_qty:.6f}")
-    print(f"Interval: {interval} seconds")
+    print(f"Split: {num_slices} × {quantities[0]:g}" + (f" (last {quantities[-1]:g})" if quantities[-1] != quantities[0] else ""))
+    print(f"Interval: {interval} seconds{' (funding-aware)' if schedule else ''}")
     print("----------------------------------------------------")
 
     logging.info(f"Starting TWAP for {symbol}: {side} {total_qty} in {num_slices} slices every {interval}s")
 
+    recorder = ExecutionRecorder(client, symbol, side, total_qty, get_current_price(symbol))
+    stats = METRICS.strategy(f"twap {symbol} {side}", "twap", symbol, num_slices, "slices")
+    start = time.time()
+    scheduled = start
+    sent = 0
+    sent_qty = 0.0
     for i in range(1, num_slices + 1):
+        if shutdown.requested.is_set():
+            break
         try:
+            pause = schedule.pause(side) if schedule else 0
+            if pause:
+                msg = f"⏸️ Holding slice {i} for {pause:.0f}s until funding has settled"
+                print(msg)
+                logging.info(msg)
+                if shutdown.sleep(pause):
+                    break
+                scheduled = time.time()
+
             current_price = get_current_price(symbol)
             if not current_price:
                 print("⚠️ Price unavailable, skipping this slice.")
                 continue
 
-            # Execute order
-            order = client.new_order(
+            # Execute order (retried safely under a per-slice client order id)
+            order = submit_order(
+                client,
+                client_order_id("twap", int(start * 1000), symbol, side, i),
                 symbol=symbol,
                 side=side,
                 type="MARKET",
-                quantity=round(chunk_qty, 6)
+                quantity=quantities[i - 1]
             )
+            recorder.record(scheduled, time.time(), order)
+            sent += 1
+            sent_qty = round(sent_qty + quantities[i - 1], 10)
+            stats.on_order(order)
+            stats.step(sent)
 
-            msg = f"✅ [{i}/{num_slices}] {side} {chunk_qty:.6f} {symbol} at ~{current_price:.2f} USDT"
+            msg = f"✅ [{i}/{num_slices}] {side} {quantities[i - 1]:g} {symbol} at ~{current_price:.2f} USDT"
             print(msg)
             logging.info(msg)
             logging.info(f"Order Response: {order}")
 
             # Wait for next slice
             if i < num_slices:
-                print(f"⏳ Waiting {interval}s before next order...")
-                time.sleep(interval)
+                wait = schedule.interval(side, interval) if schedule else interval
+                print(f"⏳ Waiting {wait:g}s before next order...")
+                if shutdown.sleep(wait):
+                    break
+                scheduled += wait
 
         except Exception as e:
             err = f"❌ Failed at slice {i}: {e}"
             print(err)
             logging.error(err)
+            stats.finish("failed")
             break
 
-    print("\n🎯 TWAP Execution Completed Successfully!")
+    if stats.status == "running":
+        stats.finish("stopped" if shutdown.requested.is_set() else "done")
+    if shutdown.requested.is_set():
+        # Market slices fill on arrival, so there is nothing working to cancel
+        msg = f"🛑 TWAP stopped after {sent}/{num_slices} slices: {sent_qty:g} of {total_qty} {symbol} sent."
+        print(msg)
+        logging.warning(msg)
+    else:
+        print("\n🎯 TWAP Execution Completed Successfully!")
     logging.info("TWAP Strategy Finished.\n")
+    recorder.finish()
+    flush_logs()
 
 # =====================================================
 # Entry point
 # =====================================================
 if __name__ == "__main__":
-    symbol, side, total_qty, num_slices, interval, chunk_qty = validate_args(sys.argv)
-    execute_twap(symbol, side, total_qty, num_slices, interval, chunk_qty)
+    args = sys.argv[:]
+    options = runtime.flags(args)
+    funding_aware = "--funding" in args
+    if funding_aware:
+        args.remove("--funding")
+    client = runtime.start(options, "twap", client)
+    with span("validate"):
+        symbol, side, total_qty, num_slices, interval, quantities = validate_args(args)
+    runtime.setup(options, "twap", client)
+    schedule = FundingSchedule(client, symbol).start() if funding_aware else None
+    execute_twap(symbol, side, total_qty, num_slices, interval, quantities, schedule)
+    if schedule:
+        schedule.stop()
@@ -1,11 +1,22 @@
 import sys
 import time
 import logging
-import requests
 from binance.um_futures import UMFutures
 from dotenv import load_dotenv
 import os
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from order_validation import fetch_market_data, validate_orders, print_violations, twap_slices
+import runtime
+from profiling import span
+from tca import ExecutionRecorder
+from order_submit import submit_order, client_order_id, lookup_order, OrderUnknownError
+from sentiment import SentimentEngine
+from shutdown import shutdown, flush_logs
+from metrics import METRICS
+from exchange_cache import get_exchange_info, get_symbol_filters, round_to_step, round_up_to_step
+
 # =====================================================
 # Setup
 # =====================================================
@@ -34,7 +45,7 @@ logging.basicConfig(
 # =====================================================
 def is_valid_symbol(symbol):
     try:
-        info = client.exchange_info()
+        info = get_exchange_info(client)
         symbols = [s["symbol"] for s in info["symbols"]]
         return symbol in symbols
     except Exception as e:
@@ -53,41 +64,20 @@ def get_current_price(symbol):
         return None
 
 # =====================================================
-# Helper: Minimum Notional Check
-# =====================================================
-def get_min_notional(symbol):
-    try:
-        info = client.exchange_info()
-        for s in info["symbols"]:
-            if s["symbol"] == symbol:
-                for f in s["filters"]:
-                    if f["filterType"] == "MIN_NOTIONAL":
-                        return float(f["notional"])
-        return 100.0  # fallback
-    except Exception as e:
-        print(f"⚠️ Could not fetch minimum notional info: {e}")
-        return 100.0
-
-# =====================================================
-# NEW: Live Fear & Greed Index Fetcher
+# Helper: Live multi-source sentiment
 # =====================================================
-def get_live_fear_greed_index():
+def get_live_sentiment(symbol):
     """
-    Fetches the latest Fear & Greed Index from alternative.me API.
-    Returns the index value (0–100) and its textual classification.
+    Starts the sentiment engine (Fear & Greed, funding rate, open interest,
+    long/short ratio) and returns it with its composite 0–100 index.
     """
-    try:
-        url = "https://api.alternative.me/fng/?limit=1"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        value = int(data["data"][0]["value"])
-        classification = data["data"][0]["value_classification"]
-        print(f"📊 Live Fear & Greed Index: {value} ({classification})")
-        return value, classification
-    except Exception as e:
-        print(f"⚠️ Could not fetch live Fear & Greed Index: {e}")
-        return 50, "Neutral"  # fallback to neutral sentiment
+    engine = SentimentEngine.default(client, symbol).start()
+    value, classification = engine.index_value(), engine.classification()
+    print(f"📊 Live Sentiment Index: {value} ({classification})")
+    for name, feed in engine.snapshot()["feeds"].items():
+        if feed["signal"] is not None:
+            print(f"   • {name}: {feed['raw']} → {feed['signal']:+.2f}")
+    return engine, value, classification
 
 # =====================================================
 # Helper: Validate user arguments
@@ -121,15 +111,16 @@ def validate_args(args):
     # 4️⃣ Split into equal chunks
     chunk_qty = total_qty / num_slices
 
-    # 5️⃣ Notional validation for each chunk
-    current_price = get_current_price(symbol)
-    if current_price:
-        notional = current_price * chunk_qty
-        min_notional = get_min_notional(symbol)
-        if notional < min_notional:
-            print(f"❌ Each chunk notional ({notional:.2f}) is below the minimum required ({min_notional:.2f} USDT).")
-            sys.exit(1)
-    else:
+    # 5️⃣ Validate the even schedule (notional, step size) in one pass. Live
+    # slices are re-sized around it, but never below a tradable size.
+    market = fetch_market_data(client, [symbol])
+    current_price = market["prices"].get(symbol)
+    slices = twap_slices(symbol, side, total_qty, num_slices, market["filters"].get(symbol))
+    violations = validate_orders(client, slices, market=market)
+    if violations:
+        print_violations(violations)
+        sys.exit(1)
+    if not current_price:
         print("⚠️ Could not verify notional value (price unavailable). Proceed with caution.")
 
     print(f"\n📊 Current {symbol} Price: {current_price:.2f} USDT" if current_price else "")
@@ -138,75 +129,163 @@ def validate_args(args):
 
     return symbol, side, total_qty, num_slices, interval, chunk_qty
 
+# =====================================================
+# Helper: Adaptive slice sizing
+# =====================================================
+MAX_SENTIMENT_TILT = 0.3   # ±30% of the even slice at extreme sentiment
+MAX_PRICE_TILT = 0.2       # ±20% when price has moved PRICE_SCALE from arrival
+PRICE_SCALE = 0.01         # 1% move from arrival price = full price tilt
+MIN_SLICE_TILT = 0.5       # smallest slice, as a multiple of the even slice
+MAX_SLICE_TILT = 1 + MAX_SENTIMENT_TILT + MAX_PRICE_TILT
+
+
+def slice_tilt(side, score, price, arrival_price):
+    """
+    Multiplier for the even share of the remaining quantity. Fear (negative
+    score) or a price below arrival makes BUY slices larger; greed or a
+    price above arrival makes SELL slices larger.
+    """
+    direction = -1 if side == "BUY" else 1
+    sentiment_term = direction * score
+    move = (price - arrival_price) / arrival_price / PRICE_SCALE
+    price_term = max(-1.0, min(1.0, direction * move))
+    return max(MIN_SLICE_TILT, 1 + MAX_SENTIMENT_TILT * sentiment_term + MAX_PRICE_TILT * price_term)
+
+
+def next_slice_qty(remaining, slices_left, tilt, price, filters, even_qty):
+    """
+    Size of the next slice. The even share of what is left is tilted, then
+    bounded so the slices after it can still take what is left within
+    MIN_SLICE_TILT..MAX_SLICE_TILT of even_qty (total_qty / num_slices),
+    then rounded to the lot step and kept tradable. The last slice takes
+    the remainder, so the executed total matches total_qty; the bounds keep
+    it within the same tilt range rather than absorbing the drift.
+    """
+    step = filters["step_size"] if filters else 0.000001
+    min_qty = max(filters["min_qty"], filters["min_notional"] / price) if filters else step
+
+    if slices_left <= 1:
+        return round_to_step(remaining, step)
+    later = slices_left - 1
+    floor = remaining - later * even_qty * MAX_SLICE_TILT   # rises as slices run out
+    cap = remaining - later * even_qty * MIN_SLICE_TILT
+    qty = round_to_step(round(max(floor, min(cap, remaining / slices_left * tilt, remaining)), 10), step)
+    if qty < floor:
+        qty = round_up_to_step(floor, step)
+    qty = max(qty, round_up_to_step(min_qty, step))
+    # Never leave a remainder too small to trade on its own
+    if remaining - qty < min_qty:
+        qty = round_to_step(remaining, step)
+    return min(qty, round_to_step(remaining, step))
+
+def slice_filled_qty(symbol, client_id, order):
+    """
+    Quantity a market slice actually filled. Trusts executedQty once the
+    order is final; otherwise asks the exchange, since assuming a full
+    fill would under-execute and assuming none would over-execute.
+    """
+    if order.get("executedQty") is not None and order.get("status") in ("FILLED", "CANCELED", "EXPIRED", "REJECTED"):
+        return float(order["executedQty"])
+    found = lookup_order(client, symbol, client_id)
+    if found is None:
+        raise OrderUnknownError(client_id, "exchange has no such order")
+    return float(found.get("executedQty") or 0)
+
 # =====================================================
 # TWAP Execution Logic (with Live Sentiment)
 # =====================================================
 def execute_twap(symbol, side, total_qty, num_slices, interval, chunk_qty):
-    # 1️⃣ Fetch live Fear & Greed sentiment
-    index_value, classification = get_live_fear_greed_index()
-
-    # 2️⃣ Adjust TWAP parameters based on sentiment
-    if index_value <= 25:
-        print("😨 Market in Extreme Fear → Increasing buy aggressiveness.")
-        if side == "BUY":
-            chunk_qty *= 1.25  # buy more per slice
-        elif side == "SELL":
-            chunk_qty *= 0.8  # sell smaller portions
-    elif index_value >= 75:
-        print("🚀 Market in Extreme Greed → Reducing exposure.")
-        if side == "BUY":
-            chunk_qty *= 0.7  # smaller buys
-        elif side == "SELL":
-            chunk_qty *= 1.3  # larger sells
-
-    print(f"\n🚀 Starting TWAP Execution for {symbol}")
+    # 1️⃣ Start live multi-source sentiment (kept fresh in the background)
+    sentiment, index_value, classification = get_live_sentiment(symbol)
+    filters = get_symbol_filters(client, symbol)
+    arrival_price = get_current_price(symbol)
+
+    print(f"\n🚀 Starting Adaptive TWAP Execution for {symbol}")
     print(f"Market Sentiment: {classification} ({index_value})")
     print(f"Side: {side}")
     print(f"Total Quantity: {total_qty}")
-    print(f"Adjusted Chunk: {chunk_qty:.6f}")
-    print(f"Split: {num_slices} × {chunk_qty:.6f}")
+    print(f"Base Split: {num_slices} × {chunk_qty:.6f} (re-sized every slice)")
     print(f"Interval: {interval} seconds")
     print("----------------------------------------------------")
 
-    logging.info(f"Starting TWAP for {symbol}: {side} {total_qty} in {num_slices} slices every {interval}s | Sentiment: {classification} ({index_value})")
+    logging.info(f"Starting adaptive TWAP for {symbol}: {side} {total_qty} in {num_slices} slices every {interval}s | Sentiment: {classification} ({index_value})")
 
+    # 2️⃣ Slice on a fixed clock; each slice is sized from what is left
+    recorder = ExecutionRecorder(client, symbol, side, total_qty, arrival_price, strategy="twap_sentiment")
+    stats = METRICS.strategy(f"twap+sent {symbol} {side}", "twap", symbol, num_slices, "slices")
+    executed = 0.0
+    start = time.time()
     for i in range(1, num_slices + 1):
+        remaining = round(total_qty - executed, 10)
+        if remaining <= 0 or shutdown.requested.is_set():
+            break
         try:
             current_price = get_current_price(symbol)
             if not current_price:
                 print("⚠️ Price unavailable, skipping this slice.")
-                continue
-
-            # Execute market order
-            order = client.new_order(
-                symbol=symbol,
-                side=side,
-                type="MARKET",
-                quantity=round(chunk_qty, 6)
-            )
-
-            msg = f"✅ [{i}/{num_slices}] {side} {chunk_qty:.6f} {symbol} at ~{current_price:.2f} USDT"
-            print(msg)
-            logging.info(msg)
-            logging.info(f"Order Response: {order}")
-
-            # Pause between slices
-            if i < num_slices:
-                print(f"⏳ Waiting {interval}s before next order...")
-                time.sleep(interval)
+            else:
+                arrival_price = arrival_price or current_price
+                tilt = slice_tilt(side, sentiment.score(), current_price, arrival_price)
+                qty = next_slice_qty(remaining, num_slices - i + 1, tilt, current_price, filters, chunk_qty)
+
+                slice_id = client_order_id("twaps", int(start * 1000), symbol, side, i)
+                order = submit_order(
+                    client,
+                    slice_id,
+                    symbol=symbol,
+                    side=side,
+                    type="MARKET",
+                    quantity=qty,
+                    newOrderRespType="RESULT"
+                )
+                recorder.record(start + (i - 1) * interval, time.time(), order)
+                stats.on_order(order)
+                stats.step(i, status=f"tilt {tilt:.2f}")
+                filled = slice_filled_qty(symbol, slice_id, order)
+                executed = round(executed + filled, 10)
+
+                msg = (f"✅ [{i}/{num_slices}] {side} {filled:.6f} {symbol} at ~{current_price:.2f} USDT "
+                       f"(tilt {tilt:.2f}, sentiment {sentiment.index_value()}, {total_qty - executed:.6f} left)")
+                print(msg)
+                logging.info(msg)
+                logging.info(f"Order Response: {order}")
 
         except Exception as e:
             err = f"❌ Failed at slice {i}: {e}"
             print(err)
             logging.error(err)
+            stats.finish("failed")
             break
 
-    print("\n🎯 TWAP Execution Completed Successfully!")
-    logging.info("TWAP Strategy Finished.\n")
+        # 3️⃣ Wait for the next scheduled slice time (no drift from order latency)
+        if i < num_slices:
+            wait = start + i * interval - time.time()
+            if wait > 0:
+                print(f"⏳ Waiting {wait:.0f}s before next order...")
+                if shutdown.sleep(wait):
+                    break
+
+    sentiment.stop()
+    if stats.status != "failed":
+        stats.finish("stopped" if shutdown.requested.is_set() else "done")
+    if shutdown.requested.is_set():
+        msg = f"🛑 TWAP stopped early: {executed:.6f} of {total_qty} {symbol} executed."
+        print(msg)
+        logging.warning(msg)
+    else:
+        print(f"\n🎯 TWAP Execution Completed: {executed:.6f} of {total_qty} {symbol} executed.")
+    logging.info(f"TWAP Strategy Finished: {executed} of {total_qty} executed.\n")
+    recorder.finish()
+    flush_logs()
 
 # =====================================================
 # Entry point
 # =====================================================
 if __name__ == "__main__":
-    symbol, side, total_qty, num_slices, interval, chunk_qty = validate_args(sys.argv)
+    args = sys.argv[:]
+    options = runtime.flags(args)
+    client = runtime.start(options, "twap_with_sentiment", client)
+    with span("validate"):
+        symbol, side, total_qty, num_slices, interval, chunk_qty = validate_args(args)
+    runtime.setup(options, "twap_with_sentiment", client)
     execute_twap(symbol, side, total_qty, num_slices, interval, chunk_qty)
@@ -0,0 +1,95 @@
+import logging
+
+from rate_limiter import ORDER_LIMITER
+from exchange_cache import note_rejection
+
+# -----------------------------------------------------
+# Batch order helpers
+# -----------------------------------------------------
+BATCH_PLACE_SIZE = 5     # POST /fapi/v1/batchOrders limit
+BATCH_CANCEL_SIZE = 10   # DELETE /fapi/v1/batchOrders limit
+UNKNOWN_CODE = -1007     # sent but unanswered: the order may be working
+
+
+def unknown_result(message):
+    """
+    Batch entry for an order whose outcome is unknown. It is an error for
+    is_error(), but must be looked up by clientOrderId before re-placing.
+    """
+    return {"code": UNKNOWN_CODE, "msg": message, "unknown": True}
+
+
+def is_unknown(result):
+    return bool(result.get("unknown"))
+
+
+def _encode(order):
+    # batchOrders is sent as JSON, so every value goes over as a string
+    return {k: (str(v).lower() if isinstance(v, bool) else str(v)) for k, v in order.items() if v is not None}
+
+
+def place_batch(client, orders, limiter=ORDER_LIMITER):
+    """
+    Places orders through new_batch_order in chunks of 5. Returns one
+    response per order, in order; failed entries are {"code", "msg"} dicts.
+    Orders whose outcome is unknown (timeout, lost connection) are looked
+    up by newClientOrderId: the order found replaces the entry, and only
+    those that cannot be looked up stay unknown (see is_unknown).
+    """
+    from order_submit import is_ambiguous
+
+    results = []
+    for start in range(0, len(orders), BATCH_PLACE_SIZE):
+        chunk = orders[start:start + BATCH_PLACE_SIZE]
+        limiter.acquire(len(chunk))
+        try:
+            results.extend(client.new_batch_order([_encode(o) for o in chunk]))
+        except Exception as e:
+            logging.error(f"❌ Batch order request failed: {e}")
+            if is_ambiguous(e):
+                results.extend(unknown_result(str(e)) for _ in chunk)
+            else:
+                results.extend({"code": -1, "msg": str(e)} for _ in chunk)
+    for result in results:
+        if "code" in result:
+            note_rejection(result["code"])
+    return [_settle(client, o, r) if is_unknown(r) else r for o, r in zip(orders, results)]
+
+
+def _settle(client, order, result):
+    from order_submit import lookup_order, OrderUnknownError
+
+    client_id = order.get("newClientOrderId")
+    if not client_id:
+        return result
+    try:
+        found = lookup_order(client, order["symbol"], client_id)
+    except OrderUnknownError as e:
+        logging.error(f"❌ Batch order {client_id} {e}")
+        return result
+    if found is None:
+        return {"code": -1, "msg": f"not placed ({result['msg']})"}
+    logging.info(f"Batch order {client_id} was accepted despite the error.")
+    return found
+
+
+def cancel_batch(client, symbol, order_ids, limiter=ORDER_LIMITER):
+    """
+    Cancels orders through cancel_batch_order in chunks of 10. Returns one
+    response per id; orders that already filled come back as {"code", "msg"}.
+    """
+    results = []
+    order_ids = list(order_ids)
+    for start in range(0, len(order_ids), BATCH_CANCEL_SIZE):
+        chunk = order_ids[start:start + BATCH_CANCEL_SIZE]
+        limiter.acquire()
+        try:
+            results.extend(client.cancel_batch_order(symbol=symbol, orderIdList=chunk, origClientOrderIdList=None))
+        except Exception as e:
+            logging.error(f"❌ Batch cancel request failed: {e}")
+            results.extend({"code": -1, "msg": str(e)} for _ in chunk)
+    return results
+
+
+def is_error(result):
+    return "code" in result and "orderId" not in result
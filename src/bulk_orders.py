@@ -0,0 +1,224 @@
+import os
+import sys
+import csv
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from client_factory import create_client
+from order_validation import fetch_market_data, validate_orders, print_violations
+from batch_orders import place_batch, is_error, is_unknown, BATCH_PLACE_SIZE
+from risk import start_risk
+from paper import PaperExchange, paper_flag
+from profiling import profile_flag, start_profiling, span
+
+# -----------------------------------------------------
+# Setup
+# -----------------------------------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LOG_FILE = os.path.join(PROJECT_ROOT, "bot.log")
+
+logging.basicConfig(
+    filename=LOG_FILE,
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+CHUNK_ROWS = 1000   # rows validated and submitted per pass, so huge files stream
+MAX_WORKERS = 8     # concurrent batch requests; the shared limiter sets the pace
+# A bulk file is a deliberate, pre-validated list that can rest thousands of
+# orders, so the 100-open-order default of the risk layer is raised for it;
+# the notional limits still apply. 0 disables the cap (the exchange's own
+# per-symbol limit then rejects rows individually).
+BULK_MAX_OPEN_ORDERS = int(os.getenv("BULK_MAX_OPEN_ORDERS", "10000"))
+TYPE_ALIASES = {"STOP_LIMIT": "STOP", "STOP-LIMIT": "STOP"}
+FIELDS = ("symbol", "side", "type", "quantity", "price", "stopPrice", "takeProfit", "stopLoss", "timeInForce", "reduceOnly")
+
+# -----------------------------------------------------
+# Reading orders
+# -----------------------------------------------------
+def read_rows(path):
+    """
+    Yields one order dict per CSV row or JSONL line. CSV needs a header with
+    any of: symbol, side, type, quantity, price, stopPrice, takeProfit,
+    stopLoss, timeInForce, reduceOnly.
+    """
+    with open(path, newline="") as f:
+        if path.lower().endswith((".jsonl", ".json")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            for row in csv.DictReader(f):
+                yield {k: v for k, v in row.items() if k and v not in (None, "")}
+
+
+def normalize(row):
+    """
+    Upper-cases symbol/side/type and converts numeric fields to floats.
+    """
+    order = {k: row[k] for k in FIELDS if row.get(k) not in (None, "")}
+    order["symbol"] = str(order.get("symbol", "")).upper()
+    order["side"] = str(order.get("side", "")).upper()
+    kind = str(order.get("type", "MARKET")).upper()
+    order["type"] = TYPE_ALIASES.get(kind, kind)
+    for key in ("quantity", "price", "stopPrice", "takeProfit", "stopLoss"):
+        if key in order:
+            order[key] = float(order[key])
+    return order
+
+
+def to_requests(order):
+    """
+    Expands one validated order into exchange order params. OCO becomes a
+    take-profit LIMIT plus a STOP at the stop-loss, as oco.py places it.
+    """
+    base = {"symbol": order["symbol"], "side": order["side"], "quantity": order["quantity"]}
+    if order.get("reduceOnly"):
+        base["reduceOnly"] = order["reduceOnly"]
+    kind = order["type"]
+    if kind == "MARKET":
+        return [dict(base, type="MARKET")]
+    if kind == "LIMIT":
+        return [dict(base, type="LIMIT", timeInForce=order.get("timeInForce", "GTC"), price=order["price"])]
+    if kind == "STOP":
+        return [dict(base, type="STOP", timeInForce=order.get("timeInForce", "GTC"),
+                     stopPrice=order["stopPrice"], price=order["price"])]
+    if kind == "STOP_MARKET":
+        return [dict(base, type="STOP_MARKET", stopPrice=order["stopPrice"])]
+    if kind == "OCO":
+        return [
+            dict(base, type="LIMIT", timeInForce="GTC", price=order["takeProfit"]),
+            dict(base, type="STOP", timeInForce="GTC", stopPrice=order["stopLoss"], price=order["stopLoss"]),
+        ]
+    raise ValueError(f"Unsupported order type {kind}")
+
+# -----------------------------------------------------
+# Main logic
+# -----------------------------------------------------
+def process_chunk(client, rows, first_row, market, pool, dry_run=False):
+    """
+    Validates one chunk against cached filters and submits the valid
+    orders concurrently in batches of 5. Returns one result per row.
+    """
+    results = []
+    orders = []
+    for offset, row in enumerate(rows):
+        try:
+            orders.append(normalize(row))
+        except (ValueError, TypeError) as e:
+            orders.append(None)
+            results.append((offset, "invalid", None, str(e)))
+
+    new_symbols = sorted({o["symbol"] for o in orders if o} - set(market["filters"]))
+    if new_symbols:
+        fetched = fetch_market_data(client, new_symbols)
+        for key in market:
+            market[key].update(fetched[key])
+
+    valid = [(offset, o) for offset, o in enumerate(orders) if o]
+    with span("validate"):
+        violations = validate_orders(client, [o for _, o in valid], market=market)
+    rejected = {}
+    for v in violations:
+        offset = valid[v["index"]][0]
+        rejected.setdefault(offset, []).append(f"{v['check']}: {v['message']}")
+        v["index"] = first_row + offset - 1  # print_violations shows 1-based rows
+    if violations:
+        print_violations(violations, limit=5)
+    for offset, messages in rejected.items():
+        results.append((offset, "rejected", None, "; ".join(messages)))
+
+    # Flatten to exchange requests, remembering which row each came from
+    child_orders = []
+    for offset, order in valid:
+        if offset in rejected:
+            continue
+        try:
+            child_orders.extend((offset, r) for r in to_requests(order))
+        except (KeyError, ValueError) as e:
+            results.append((offset, "invalid", None, str(e)))
+
+    if dry_run:
+        results.extend((offset, "valid", None, "") for offset in sorted({o for o, _ in child_orders}))
+        return [(first_row + o, status, oid, msg) for o, status, oid, msg in results]
+
+    batches = [child_orders[i:i + BATCH_PLACE_SIZE] for i in range(0, len(child_orders), BATCH_PLACE_SIZE)]
+    jobs = [(batch, pool.submit(place_batch, client, [r for _, r in batch])) for batch in batches]
+    for batch, job in jobs:
+        for (offset, _), response in zip(batch, job.result()):
+            if is_unknown(response):
+                results.append((offset, "unknown", None, response.get("msg", "")))
+            elif is_error(response):
+                results.append((offset, "error", None, response.get("msg", "")))
+            else:
+                results.append((offset, "placed", response["orderId"], ""))
+    return [(first_row + o, status, oid, msg) for o, status, oid, msg in results]
+
+
+def run_bulk(client, path, results_path, dry_run=False):
+    start = time.time()
+    market = {"filters": {}, "prices": {}, "marks": {}}
+    counts = {}
+
+    print(f"🚀 {'Validating' if dry_run else 'Submitting'} orders from {path}")
+    logging.info(f"Bulk order run started: {path} (dry_run={dry_run})")
+
+    with open(results_path, "w", newline="") as out, ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        writer = csv.writer(out)
+        writer.writerow(["row", "status", "orderId", "message"])
+        first_row = 1
+        rows = read_rows(path)
+        while True:
+            chunk = [row for _, row in zip(range(CHUNK_ROWS), rows)]
+            if not chunk:
+                break
+            results = process_chunk(client, chunk, first_row, market, pool, dry_run)
+            for result in sorted(results, key=lambda r: r[0]):
+                writer.writerow(result)
+                counts[result[1]] = counts.get(result[1], 0) + 1
+            first_row += len(chunk)
+            print(f"   ... {first_row - 1} rows processed")
+
+    elapsed = time.time() - start
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    msg = f"🎯 Bulk run finished in {elapsed:.1f}s: {summary or 'no rows'}. Results: {results_path}"
+    print(msg)
+    logging.info(msg)
+    return counts
+
+# -----------------------------------------------------
+# Helper: Validate user input
+# -----------------------------------------------------
+def validate_args(args):
+    if len(args) < 2:
+        print("Usage: python bulk_orders.py <orders.csv|orders.jsonl> [--dry-run]")
+        sys.exit(1)
+    path = args[1]
+    if not os.path.isfile(path):
+        print(f"❌ File not found: {path}")
+        sys.exit(1)
+    return path
+
+# -----------------------------------------------------
+# Entry point
+# -----------------------------------------------------
+if __name__ == "__main__":
+    args = sys.argv[:]
+    paper = paper_flag(args)
+    profile = profile_flag(args)
+    dry_run = "--dry-run" in args
+    if dry_run:
+        args.remove("--dry-run")
+    path = validate_args(args)
+    results_path = os.path.splitext(path)[0] + ".results.csv"
+
+    client = create_client()
+    if paper:
+        client = PaperExchange(client).start()
+    if not dry_run:
+        start_risk(client, follow=False, max_open_orders=BULK_MAX_OPEN_ORDERS)
+    if profile:
+        start_profiling("bulk_orders", client)
+    run_bulk(client, path, results_path, dry_run)
@@ -0,0 +1,39 @@
+import os
+
+# -----------------------------------------------------
+# Lazy REST client construction
+# -----------------------------------------------------
+# Importing the connector pulls in requests/urllib3 (~150 ms). Entry points
+# parse and check their arguments first and only then call create_client(),
+# so a bad invocation exits immediately and nothing heavy loads at import.
+_clients = {}
+
+
+def load_env():
+    """
+    Loads .env into os.environ, for entry points that read their own
+    settings before building a client.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def create_client(key=None, secret=None, base_url=None):
+    """
+    Returns a UMFutures client for the given credentials (defaults from
+    .env), building it on first use and reusing it afterwards.
+    """
+    from binance.um_futures import UMFutures
+
+    load_env()
+    key = key or os.getenv("API_KEY")
+    secret = secret or os.getenv("API_SECRET")
+    base_url = base_url or os.getenv("BASE_URL", "https://testnet.binancefuture.com")
+
+    cache_key = (key, base_url)
+    if cache_key not in _clients:
+        from json_codec import install
+
+        _clients[cache_key] = install(UMFutures(key=key, secret=secret, base_url=base_url))
+    return _clients[cache_key]
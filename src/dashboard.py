@@ -0,0 +1,288 @@
+import os
+import sys
+import time
+import atexit
+import logging
+import threading
+
+from metrics import METRICS, time_client
+from rate_limiter import ORDER_LIMITER, WEIGHT_LIMITER
+from shutdown import shutdown
+from time_sync import MAX_RECV_WINDOW
+
+# -----------------------------------------------------
+# Live terminal dashboard (--dashboard)
+# -----------------------------------------------------
+# Draws the metrics registry with curses at most DASHBOARD_FPS times a
+# second: strategy progress and fill rates, request latency percentiles,
+# rate-limit buckets, price-feed staleness, the clock offset and
+# sentiment inputs. Output that would have scrolled past (print lines) is
+# shown in an event panel at the bottom, and the last of it is printed
+# again on exit. Press q to request a graceful shutdown.
+DASHBOARD_FPS = float(os.getenv("DASHBOARD_FPS", "4"))
+STALE_AFTER = float(os.getenv("DASHBOARD_STALE_AFTER", "5"))  # seconds without a tick before a feed shows as stale
+LATENCY_SERIES = ("submit", "query", "price_fetch", "exchange_info")
+REPLAY_LINES = 20
+
+
+def _bar(fraction, width):
+    fraction = min(1.0, max(0.0, fraction or 0.0))
+    filled = int(round(fraction * width))
+    return "█" * filled + "·" * (width - filled)
+
+
+def _age(seconds):
+    if seconds is None or seconds == float("inf"):
+        return "-"
+    if seconds < 10:
+        return f"{seconds:.1f}s"
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    return f"{seconds / 60:.0f}m"
+
+
+def _strategy_lines(registry, now):
+    lines = [(f"{'STRATEGY':<22}{'type':<7}{'symbol':<11}{'progress':<24}{'sent':>6}{'filled':>7}{'fill%':>7}"
+              f"{'qty':>12}  {'status':<16}{'upd':>6}", "header")]
+    for stats in list(registry.strategies.values()):
+        fraction = stats.done / stats.target if stats.target else None
+        progress = f"{_bar(fraction, 10)} {stats.done}/{stats.target} {stats.unit}" if stats.target else "-"
+        rate = stats.fill_rate()
+        style = "warn" if stats.status in ("failed", "error", "stopped") else None
+        lines.append((f"{stats.name[:21]:<22}{stats.kind[:6]:<7}{stats.symbol[:10]:<11}{progress[:23]:<24}"
+                      f"{stats.sent:>6}{stats.filled:>7}{'-' if rate is None else f'{rate * 100:.0f}%':>7}"
+                      f"{stats.filled_qty:>12.6g}  {stats.status[:15]:<16}{_age(now - stats.updated):>6}", style))
+    if len(lines) == 1:
+        lines.append(("(no strategy running yet)", None))
+    return lines
+
+
+def _latency_lines(registry):
+    lines = [(f"{'LATENCY ms':<22}{'calls':>7}{'errors':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}", "header")]
+    series = [s for s in LATENCY_SERIES if s in registry.latencies]
+    series += sorted(s for s in registry.latencies if s not in LATENCY_SERIES)
+    for name in series:
+        result = registry.percentiles(name)
+        if result is None:
+            continue
+        _, points, longest = result
+        errors = registry.counters.get(name + ".errors", 0)
+        lines.append((f"{name:<22}{registry.counters.get(name + '.calls', 0):>7}{errors:>7}"
+                      f"{points[50] * 1000:>9.1f}{points[90] * 1000:>9.1f}{points[99] * 1000:>9.1f}{longest * 1000:>9.1f}",
+                      "warn" if errors else None))
+    return lines
+
+
+def _limiter_lines(registry):
+    lines = [(f"{'RATE LIMITS':<22}{'in use':<28}{'waited':>8}", "header")]
+    limiters = [("orders", ORDER_LIMITER), ("weight", WEIGHT_LIMITER)] + registry.watched("limiter")
+    for name, limiter in limiters:
+        used = limiter.in_use()
+        lines.append((f"{name:<22}{_bar(used, 20)} {used * 100:>5.1f}%{limiter.waited:>7.1f}s",
+                      "warn" if used > 0.9 else None))
+    return lines
+
+
+def _feed_lines(registry, now):
+    lines = [(f"{'PRICE FEEDS':<22}{'channel':<12}{'price':>14}{'age':>8}", "header")]
+    seen = {}
+    for feed in registry.watched("feed"):
+        for symbol in list(feed.symbols):
+            key = (symbol, feed.channel)
+            age = now - feed.updated[symbol] if symbol in feed.updated else float("inf")
+            if key not in seen or age < seen[key][1]:
+                seen[key] = (feed.prices.get(symbol), age)
+    for (symbol, channel), (price, age) in sorted(seen.items()):
+        stale = age > STALE_AFTER
+        lines.append((f"{symbol:<22}{channel:<12}{'-' if price is None else f'{price:.8g}':>14}{_age(age):>8}"
+                      f"{'  STALE' if stale else ''}", "warn" if stale else None))
+    if len(lines) == 1:
+        lines.append(("(no live feed)", None))
+    return lines
+
+
+def _time_sync_lines(registry):
+    lines = []
+    for sync in registry.watched("time_sync"):
+        m = sync.metrics()
+        if not lines:
+            lines.append((f"{'CLOCK':<22}{'offset ms':>10}{'rtt ms':>9}{'recvWindow':>12}{'samples':>9}", "header"))
+        lines.append((f"{'server - local':<22}{m['offset_ms']:>+10.1f}{m['rtt_ms']:>9.1f}{m['recv_window']:>12}"
+                      f"{m['samples']:>9}", "warn" if m["recv_window"] >= MAX_RECV_WINDOW else None))
+    return lines
+
+
+def _sentiment_lines(registry, now):
+    lines = []
+    for engine in registry.watched("sentiment"):
+        snapshot = engine.snapshot()
+        lines.append((f"{'SENTIMENT':<22}index {snapshot['index']} {engine.classification()} "
+                      f"(score {snapshot['score']:+.2f})", "header"))
+        for name, feed in snapshot["feeds"].items():
+            raw = "-" if feed["raw"] is None else f"{feed['raw']:.6g}"
+            signal = "-" if feed["signal"] is None else f"{feed['signal']:+.2f}"
+            age = now - feed["updated"] if feed["updated"] else None
+            lines.append((f"  {name:<20}raw {raw:>12}   signal {signal:>6}   age {_age(age):>6}", None))
+    return lines
+
+
+def render(registry, title, height, frame_ms=0.0, fps=DASHBOARD_FPS):
+    """
+    The dashboard as [(text, style)] lines, style None, "title", "header"
+    or "warn". Recent events fill whatever rows are left below height.
+    """
+    now = time.time()
+    state = f"🛑 stopping, {shutdown.remaining():.0f}s left" if shutdown.requested.is_set() else "q: stop"
+    lines = [(f"{title} | up {_age(now - registry.started)} | {time.strftime('%H:%M:%S', time.gmtime(now))} UTC"
+              f" | frame {frame_ms:.1f} ms @ {fps:g} fps | {state}", "title"), ("", None)]
+    for section in (_strategy_lines(registry, now), _latency_lines(registry), _limiter_lines(registry),
+                    _feed_lines(registry, now), _time_sync_lines(registry), _sentiment_lines(registry, now)):
+        if section:
+            lines += section + [("", None)]
+    room = height - len(lines) - 1
+    if room > 0:
+        events = list(registry.events)[-room:]
+        lines.append(("EVENTS", "header"))
+        lines += [(f"{time.strftime('%H:%M:%S', time.gmtime(ts))} {line}", None) for ts, line in events]
+    return lines[:height]
+
+
+class _EventWriter:
+    """
+    Stands in for sys.stdout while the dashboard owns the screen: every
+    printed line goes to the registry's event panel.
+    """
+
+    encoding = "utf-8"
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.partial = ""
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        with self.lock:
+            *complete, self.partial = (self.partial + text).split("\n")
+        for line in complete:
+            if line.strip():
+                self.registry.event(line)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+class Dashboard:
+    def __init__(self, title, registry=METRICS, fps=DASHBOARD_FPS):
+        self.title = title
+        self.registry = registry
+        self.fps = fps
+        self.running = False
+        self.wake = threading.Event()
+        self.frame_ms = 0.0
+        self.screen = None
+        self.stdout = None
+        self.thread = None
+
+    def start(self):
+        import curses
+        import locale
+
+        locale.setlocale(locale.LC_ALL, "")
+        self.stdout = sys.stdout
+        self.screen = curses.initscr()
+        curses.noecho()
+        curses.cbreak()   # keys arrive without Enter; Ctrl-C still signals
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        self.screen.nodelay(True)
+        self.styles = {"title": curses.A_REVERSE, "header": curses.A_BOLD, "warn": curses.A_BOLD}
+        if curses.has_colors():
+            curses.start_color()
+            curses.use_default_colors()
+            curses.init_pair(1, curses.COLOR_YELLOW, -1)
+            self.styles["warn"] = curses.color_pair(1) | curses.A_BOLD
+        sys.stdout = _EventWriter(self.registry)
+
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+        shutdown.add_exit_hook(self.stop)
+        logging.info(f"Dashboard started at {self.fps:g} fps")
+        return self
+
+    def _loop(self):
+        import curses
+
+        interval = 1 / self.fps
+        while self.running:
+            start = time.perf_counter()
+            try:
+                if self.screen.getch() in (ord("q"), ord("Q")):
+                    shutdown.request("from the dashboard")
+                self.draw()
+            except curses.error:
+                pass   # terminal too small for a line; the next frame tries again
+            except Exception as e:
+                logging.error(f"❌ Dashboard frame failed: {e}")
+            self.frame_ms = (time.perf_counter() - start) * 1000
+            self.wake.wait(max(0.0, interval - self.frame_ms / 1000))
+
+    def draw(self):
+        import curses
+
+        height, width = self.screen.getmaxyx()
+        self.screen.erase()
+        for y, (text, style) in enumerate(render(self.registry, self.title, height, self.frame_ms, self.fps)):
+            try:
+                self.screen.addnstr(y, 0, text, width - 1, self.styles.get(style, 0))
+            except curses.error:
+                pass
+        # Only the cells that changed since the last frame are sent
+        self.screen.refresh()
+
+    def stop(self):
+        if not self.running:
+            return
+        import curses
+
+        self.running = False
+        self.wake.set()
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout=1)
+        curses.nocbreak()
+        curses.echo()
+        curses.endwin()
+        sys.stdout = self.stdout
+        # Put the run's last output (results, summaries) back on the terminal
+        for _, line in list(self.registry.events)[-REPLAY_LINES:]:
+            print(line)
+
+
+def dashboard_flag(args):
+    """
+    Removes --dashboard from args in place; returns True if it was given.
+    """
+    if "--dashboard" in args:
+        args.remove("--dashboard")
+        return True
+    return False
+
+
+def start_dashboard(title, client=None):
+    """
+    Times client's requests and takes over the terminal. Returns None
+    (plain output stays) when stdout is not a terminal.
+    """
+    if not sys.stdout.isatty():
+        print("⚠️ --dashboard needs a terminal; keeping plain output.")
+        return None
+    if client is not None:
+        time_client(client)
+    return Dashboard(title).start()
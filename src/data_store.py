@@ -0,0 +1,176 @@
+import os
+import json
+import mmap
+from array import array
+
+# -----------------------------------------------------
+# Append-only columnar market-data store
+# -----------------------------------------------------
+# Layout: <root>/<dataset>/<SYMBOL>/<YYYY-MM-DD>/<column>.bin + meta.json
+# where dataset is "aggtrades" or "klines_<interval>".
+# Every column is a raw little-endian array, so a reader can memory-map a
+# month of data without parsing JSON again. Appends only ever add rows.
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(PROJECT_ROOT, "data"))
+
+# array typecode per column ("q" int64, "d" float64, "b" int8)
+SCHEMAS = {
+    "klines": [
+        ("open_time", "q"), ("open", "d"), ("high", "d"), ("low", "d"), ("close", "d"),
+        ("volume", "d"), ("close_time", "q"), ("quote_volume", "d"), ("trades", "q"),
+        ("taker_buy_volume", "d"), ("taker_buy_quote_volume", "d"),
+    ],
+    "aggtrades": [
+        ("agg_id", "q"), ("price", "d"), ("qty", "d"), ("first_id", "q"),
+        ("last_id", "q"), ("time", "q"), ("is_buyer_maker", "b"),
+    ],
+}
+TIME_COLUMN = {"klines": "open_time", "aggtrades": "time"}
+# Strictly increasing per row; resumes and overlaps are de-duplicated on it.
+# Several aggTrades can share a millisecond, so they use their id.
+KEY_COLUMN = {"klines": "open_time", "aggtrades": "agg_id"}
+NUMPY_DTYPES = {"q": "<i8", "d": "<f8", "b": "i1"}
+
+
+def _kind(dataset):
+    # "klines_1m" -> "klines"
+    return dataset.split("_")[0]
+
+
+def partition_dir(dataset, symbol, day, root=DATA_DIR):
+    return os.path.join(root, dataset, symbol, day)
+
+
+def read_meta(dataset, symbol, day, root=DATA_DIR):
+    path = os.path.join(partition_dir(dataset, symbol, day, root), "meta.json")
+    if not os.path.exists(path):
+        return {"rows": 0, "last_time": None, "last_key": None, "complete": False}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_meta(directory, meta):
+    tmp = os.path.join(directory, "meta.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(directory, "meta.json"))
+
+
+def append_rows(dataset, symbol, day, rows, complete=False, root=DATA_DIR):
+    """
+    Appends rows (tuples in schema order) to a day partition. Rows at or
+    before the partition's last stored key (KEY_COLUMN) are dropped, so
+    re-downloading an overlapping page is harmless. Returns the number of
+    rows written.
+    """
+    schema = SCHEMAS[_kind(dataset)]
+    names = [name for name, _ in schema]
+    time_index = names.index(TIME_COLUMN[_kind(dataset)])
+    key_index = names.index(KEY_COLUMN[_kind(dataset)])
+    directory = partition_dir(dataset, symbol, day, root)
+    os.makedirs(directory, exist_ok=True)
+    meta = read_meta(dataset, symbol, day, root)
+
+    if meta.get("last_key") is not None:
+        rows = [r for r in rows if r[key_index] > meta["last_key"]]
+    elif meta["last_time"] is not None:
+        # Partition written before keys were recorded
+        rows = [r for r in rows if r[time_index] > meta["last_time"]]
+
+    if rows:
+        for col, (name, code) in enumerate(schema):
+            values = array(code, (r[col] for r in rows))
+            with open(os.path.join(directory, f"{name}.bin"), "ab") as f:
+                # Drop any tail left by an interrupted append before adding rows
+                f.truncate(meta["rows"] * values.itemsize)
+                values.tofile(f)
+        meta["rows"] += len(rows)
+        meta["last_time"] = rows[-1][time_index]
+        meta["last_key"] = rows[-1][key_index]
+
+    meta["complete"] = meta["complete"] or complete
+    _write_meta(directory, meta)
+    return len(rows)
+
+
+def load_partition(dataset, symbol, day, root=DATA_DIR):
+    """
+    Memory-maps one day partition. Returns {column: array-like}; numpy
+    memmaps when numpy is installed, otherwise zero-copy memoryviews.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    directory = partition_dir(dataset, symbol, day, root)
+    rows = read_meta(dataset, symbol, day, root)["rows"]
+    columns = {}
+    for name, code in SCHEMAS[_kind(dataset)]:
+        path = os.path.join(directory, f"{name}.bin")
+        if rows == 0 or not os.path.exists(path):
+            columns[name] = array(code) if np is None else np.empty(0, dtype=NUMPY_DTYPES[code])
+        elif np is not None:
+            columns[name] = np.memmap(path, dtype=NUMPY_DTYPES[code], mode="r", shape=(rows,))
+        else:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            columns[name] = memoryview(mapped).cast(code)[:rows]
+    return columns
+
+
+class ChainedColumn:
+    """
+    One column over several partitions, read in place: indexing, slicing
+    and iteration go to the per-day memmaps, so a month is never copied
+    into memory. Slices are chained views too. np.asarray(column) (or
+    list(column)) makes the one contiguous copy when a caller needs it.
+    """
+
+    def __init__(self, parts):
+        self.parts = [p for p in parts if len(p)]
+        self.length = sum(len(p) for p in self.parts)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for part in self.parts:
+            yield from part
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step != 1:
+                return list(self)[index]
+            parts, offset = [], 0
+            for part in self.parts:
+                lo, hi = max(start - offset, 0), min(stop - offset, len(part))
+                if lo < hi:
+                    parts.append(part[lo:hi])
+                offset += len(part)
+            return ChainedColumn(parts)
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("column index out of range")
+        for part in self.parts:
+            if index < len(part):
+                return part[index]
+            index -= len(part)
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+
+        if not self.parts:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate(self.parts).astype(dtype, copy=False) if dtype else np.concatenate(self.parts)
+
+
+def load_range(dataset, symbol, days, root=DATA_DIR):
+    """
+    Loads several day partitions (e.g. a month) as {column: ChainedColumn}
+    over the per-day maps; nothing is read until it is used.
+    """
+    parts = [load_partition(dataset, symbol, day, root) for day in days]
+    return {name: ChainedColumn([p[name] for p in parts]) for name, _ in SCHEMAS[_kind(dataset)]}
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import logging
+import threading
+from decimal import Decimal, ROUND_DOWN, ROUND_UP
+
+# -----------------------------------------------------
+# Exchange metadata cache
+# -----------------------------------------------------
+# exchange_info() is a multi-hundred-KB payload. Fetch it once per process
+# and keep the parsed per-symbol filters around so order paths (iceberg
+# refills, grid levels, TWAP slices) never need another round trip.
+# The parsed filters are also kept on disk, so short-lived CLI invocations
+# start warm instead of downloading the payload every run. Long-running
+# processes refetch filters older than DISK_CACHE_TTL, and sooner when the
+# exchange rejects an order on a filter (see note_rejection).
+CACHE_TTL = 300        # seconds, in-process
+DISK_CACHE_TTL = 3600  # seconds, symbol filters change rarely
+FILTER_REJECT_CODES = (-1013, -4014)   # filter failure / price not a multiple of the tick size
+REJECT_REFRESH_INTERVAL = 60           # seconds, at most one rejection-driven refetch per interval
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DISK_CACHE_FILE = os.getenv("EXCHANGE_CACHE_FILE", os.path.join(PROJECT_ROOT, "data", "exchange_filters.json"))
+
+_lock = threading.Lock()
+_exchange_info = None
+_fetched_at = 0.0
+_filters = {}
+_filters_at = 0.0      # when _filters were fetched (disk file mtime if loaded from disk)
+_disk_loaded = False
+
+
+def get_exchange_info(client, max_age=CACHE_TTL):
+    """
+    Returns the cached exchange_info payload, refreshing it when older than max_age.
+    """
+    global _exchange_info, _fetched_at, _filters_at
+    with _lock:
+        if _exchange_info is None or time.time() - _fetched_at > max_age:
+            from json_codec import install
+
+            _exchange_info = install(client).exchange_info()
+            _fetched_at = _filters_at = time.time()
+            _filters.clear()
+            _filters.update({s["symbol"]: _parse_filters(s) for s in _exchange_info["symbols"]})
+            _save_disk_cache()
+        return _exchange_info
+
+
+def _load_disk_cache():
+    global _disk_loaded, _filters_at
+    _disk_loaded = True
+    try:
+        written_at = os.path.getmtime(DISK_CACHE_FILE)
+        if time.time() - written_at > DISK_CACHE_TTL:
+            return
+        from json_codec import loads
+
+        with open(DISK_CACHE_FILE, "rb") as f:
+            _filters.update(loads(f.read()))
+        _filters_at = written_at
+    except (OSError, ValueError):
+        pass
+
+
+def note_rejection(error_code):
+    """
+    Called with the error code of a rejected order. A filter rejection
+    means the cached filters may be out of date (tick or lot size
+    changed), so the next lookup refetches them, at most once per
+    REJECT_REFRESH_INTERVAL. Returns True if the code was a filter
+    rejection.
+    """
+    global _fetched_at, _filters_at
+    if error_code not in FILTER_REJECT_CODES:
+        return False
+    with _lock:
+        if time.time() - _filters_at > REJECT_REFRESH_INTERVAL:
+            _fetched_at = _filters_at = 0.0
+            logging.warning(f"Order rejected on a filter ({error_code}): exchange filters will be refetched.")
+    return True
+
+
+def _save_disk_cache():
+    try:
+        os.makedirs(os.path.dirname(DISK_CACHE_FILE), exist_ok=True)
+        tmp = DISK_CACHE_FILE + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(_filters, f, separators=(",", ":"))
+        os.replace(tmp, DISK_CACHE_FILE)
+    except OSError:
+        pass
+
+
+def _parse_filters(symbol_info):
+    filters = {
+        "symbol": symbol_info["symbol"],
+        "status": symbol_info.get("status", "TRADING"),
+        "tick_size": 0.01,
+        "step_size": 0.001,
+        "min_qty": 0.001,
+        "max_qty": None,
+        "min_price": 0.0,
+        "max_price": None,
+        "min_notional": 100.0,
+        "multiplier_up": None,
+        "multiplier_down": None,
+    }
+    for f in symbol_info.get("filters", []):
+        kind = f["filterType"]
+        if kind == "PRICE_FILTER":
+            filters["tick_size"] = float(f["tickSize"])
+            filters["min_price"] = float(f["minPrice"])
+            filters["max_price"] = float(f["maxPrice"])
+        elif kind == "LOT_SIZE":
+            filters["step_size"] = float(f["stepSize"])
+            filters["min_qty"] = float(f["minQty"])
+            filters["max_qty"] = float(f["maxQty"])
+        elif kind == "MIN_NOTIONAL":
+            filters["min_notional"] = float(f["notional"])
+        elif kind == "PERCENT_PRICE":
+            filters["multiplier_up"] = float(f["multiplierUp"])
+            filters["multiplier_down"] = float(f["multiplierDown"])
+    return filters
+
+
+def get_symbol_filters(client, symbol):
+    """
+    Returns the parsed trading filters for a symbol, or None if the symbol
+    is not listed. Served from memory, then the disk cache; only a cold or
+    stale cache touches the network. If a stale cache cannot be refreshed,
+    the cached filters are returned.
+    """
+    global _filters_at
+    if not _disk_loaded:
+        with _lock:
+            if not _disk_loaded:
+                _load_disk_cache()
+    cached = _filters.get(symbol)
+    if cached is not None and time.time() - _filters_at <= DISK_CACHE_TTL:
+        return cached
+
+    try:
+        get_exchange_info(client)
+    except Exception as e:
+        if cached is None:
+            raise
+        with _lock:
+            # Retry in REJECT_REFRESH_INTERVAL rather than on every lookup
+            _filters_at = time.time() - DISK_CACHE_TTL + REJECT_REFRESH_INTERVAL
+        logging.warning(f"Could not refresh exchange filters, using cached ones: {e}")
+        return cached
+    return _filters.get(symbol)
+
+
+# -----------------------------------------------------
+# Helper: Tick / step rounding
+# -----------------------------------------------------
+def round_to_step(value, step, rounding=ROUND_DOWN):
+    """
+    Rounds value to a multiple of step (tick size or lot step) without
+    float noise, e.g. round_to_step(0.0027, 0.001) -> 0.002.
+    """
+    step = Decimal(str(step))
+    units = (Decimal(str(value)) / step).to_integral_value(rounding=rounding)
+    return float(units * step)
+
+
+def round_up_to_step(value, step):
+    return round_to_step(value, step, rounding=ROUND_UP)
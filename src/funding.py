@@ -0,0 +1,111 @@
+import os
+import time
+import logging
+
+from price_feed import PriceFeed
+
+# -----------------------------------------------------
+# Funding / basis aware slice scheduling
+# -----------------------------------------------------
+# Perpetuals settle funding every few hours: whoever holds the position at
+# the timestamp pays (or receives) rate × notional. A slice filled just
+# before settlement on the paying side costs a full funding payment it
+# could have avoided by waiting a few minutes, so those slices are held
+# back until just after settlement. When the mark trades at a discount
+# (buying) or premium (selling) to the index, or funding is about to be
+# paid to us, the schedule runs faster instead.
+#
+# Decisions only read the markPrice stream cache (1s updates): no request
+# is made per slice.
+FUNDING_WINDOW = int(os.getenv("FUNDING_WINDOW", "300"))   # seconds before settlement to hold slices
+SETTLE_DELAY = 5                   # seconds after settlement before resuming
+BASIS_FAVORABLE = float(os.getenv("BASIS_FAVORABLE", "0.0005"))  # 5 bps in our favour
+FAST_FRACTION = 0.5                # interval multiplier when conditions favour us
+STALE_AFTER = 10                   # seconds; older stream data is ignored
+
+
+def funding_cost(side, rate):
+    """
+    Funding rate the new position would pay at settlement (negative if it
+    would receive). Longs pay positive rates.
+    """
+    return rate if side == "BUY" else -rate
+
+
+def basis_edge(side, mark, index):
+    """
+    How far the mark is from the index in our favour, as a fraction:
+    positive when buying below / selling above the index.
+    """
+    if not index:
+        return 0.0
+    basis = (mark - index) / index
+    return -basis if side == "BUY" else basis
+
+
+def pause_for(side, info, now_ms):
+    """
+    Seconds to hold a slice that would otherwise fill inside the funding
+    window on the paying side; 0 if it can go now.
+    """
+    to_funding = (info["next_funding"] - now_ms) / 1000
+    if funding_cost(side, info["rate"]) > 0 and 0 <= to_funding <= FUNDING_WINDOW:
+        return to_funding + SETTLE_DELAY
+    return 0.0
+
+
+def scaled_interval(side, info, interval, now_ms):
+    """
+    interval, shortened when the basis is favourable or funding will be
+    received at the coming settlement.
+    """
+    to_funding = (info["next_funding"] - now_ms) / 1000
+    receiving = funding_cost(side, info["rate"]) < 0 and 0 <= to_funding <= FUNDING_WINDOW + interval
+    if receiving or basis_edge(side, info["mark"], info["index"]) >= BASIS_FAVORABLE:
+        return interval * FAST_FRACTION
+    return interval
+
+
+class FundingSchedule:
+    """
+    Wraps a markPrice PriceFeed for one symbol. The cache is seeded with a
+    single premiumIndex request, then kept current by the stream.
+    """
+
+    def __init__(self, client, symbol, feed=None):
+        self.client = client
+        self.symbol = symbol
+        self.feed = feed or PriceFeed(channel="markPrice")
+
+    def start(self):
+        try:
+            data = self.client.mark_price(self.symbol)
+            mark = float(data["markPrice"])
+            self.feed.on_funding(self.symbol, mark, float(data["indexPrice"]),
+                                 float(data["lastFundingRate"]), int(data["nextFundingTime"]))
+            self.feed.on_price(self.symbol, mark)
+        except Exception as e:
+            logging.warning(f"Could not seed funding data for {self.symbol}: {e}")
+        if self.feed.ws is None:
+            self.feed.start([self.symbol])
+        return self
+
+    def stop(self):
+        self.feed.stop()
+
+    def info(self):
+        """
+        Cached funding data, or None if missing or stale (then the fixed
+        schedule applies).
+        """
+        if self.feed.age(self.symbol) > STALE_AFTER:
+            return None
+        return self.feed.funding_info(self.symbol)
+
+    def pause(self, side):
+        info = self.info()
+        return pause_for(side, info, time.time() * 1000) if info else 0.0
+
+    def interval(self, side, interval):
+        info = self.info()
+        return scaled_interval(side, info, interval, time.time() * 1000) if info else interval
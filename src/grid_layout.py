@@ -0,0 +1,118 @@
+import math
+import time
+import logging
+
+from exchange_cache import round_to_step, round_up_to_step
+
+# -----------------------------------------------------
+# Grid ladder layouts
+# -----------------------------------------------------
+MODES = ("arithmetic", "geometric", "atr")
+ATR_PERIOD = 14
+ATR_INTERVAL = "1h"
+ATR_TTL = 300  # seconds
+
+_atr_cache = {}
+
+
+def grid_levels(lower_price, upper_price, num_grids, mode="arithmetic", mid_price=None, atr=None, atr_mult=1.0, center=None):
+    """
+    Returns raw (unrounded) grid levels, lowest first.
+      arithmetic: equal price gaps
+      geometric:  equal percentage gaps, so levels are spaced evenly in
+                  returns instead of wasting most of a wide range far from price
+      atr:        levels every atr_mult * ATR centred on center (default
+                  mid_price), clipped to the range
+    """
+    n = num_grids - 1
+    if mode == "geometric":
+        ratio = (upper_price / lower_price) ** (1 / n)
+        return [lower_price * ratio ** i for i in range(num_grids)]
+    center = center or mid_price
+    if mode == "atr" and atr and center:
+        step = atr * atr_mult
+        levels = [center + (i - n / 2) * step for i in range(num_grids)]
+        return [p for p in levels if lower_price <= p <= upper_price]
+    gap = (upper_price - lower_price) / n
+    return [lower_price + i * gap for i in range(num_grids)]
+
+
+def build_ladder(lower_price, upper_price, num_grids, mode, tick_size, mid_price=None, atr=None, atr_mult=1.0, center=None):
+    """
+    Builds a tick-aligned ladder split around the live mid price in one pass.
+    BUY levels are rounded down and SELL levels up, so neither crosses the
+    mid; levels that collapse onto the same tick are merged.
+    Returns (buy_prices, sell_prices), each ordered nearest-to-mid first.
+    """
+    if mid_price is None:
+        mid_price = (lower_price + upper_price) / 2
+    levels = grid_levels(lower_price, upper_price, num_grids, mode, mid_price, atr, atr_mult, center)
+
+    buys, sells = set(), set()
+    for p in levels:
+        p = round(p, 8)  # keep float drift from shifted ranges off tick boundaries
+        if p < mid_price:
+            buys.add(round_to_step(p, tick_size))
+        elif p > mid_price:
+            sells.add(round_up_to_step(p, tick_size))
+    buys.discard(0.0)
+    return sorted(buys, reverse=True), sorted(sells)
+
+
+def _stored_bars(symbol, interval, count):
+    """
+    Last `count` (high, low, close) bars from the local kline store, or
+    None if the store does not hold fresh enough data.
+    """
+    from datetime import datetime, timedelta, timezone
+    from data_store import load_range
+
+    today = datetime.now(timezone.utc)
+    days = [(today - timedelta(days=d)).strftime("%Y-%m-%d") for d in (2, 1, 0)]
+    try:
+        cols = load_range(f"klines_{interval}", symbol, days)
+    except Exception:
+        return None
+    if len(cols["close"]) < count:
+        return None
+    # Ignore a store that has not been refreshed within the last few bars
+    if time.time() * 1000 - cols["close_time"][-1] > 3 * (cols["close_time"][-1] - cols["open_time"][-1] + 1):
+        return None
+    return list(zip(cols["high"][-count:], cols["low"][-count:], cols["close"][-count:]))
+
+
+def get_atr(client, symbol, interval=ATR_INTERVAL, period=ATR_PERIOD):
+    """
+    Average true range over the last `period` klines. Uses the local kline
+    store when it is fresh, otherwise one klines request; the result is
+    cached per symbol so dynamic regrids do not refetch. Returns None if
+    no klines are available.
+    """
+    key = (symbol, interval, period)
+    cached = _atr_cache.get(key)
+    if cached and time.time() - cached[0] < ATR_TTL:
+        return cached[1]
+
+    bars = _stored_bars(symbol, interval, period + 1)
+    if bars is None:
+        try:
+            klines = client.klines(symbol, interval, limit=period + 1)
+        except Exception as e:
+            print(f"⚠️ Could not fetch klines for ATR: {e}")
+            return None
+        bars = [(float(b[2]), float(b[3]), float(b[4])) for b in klines]
+    if len(bars) < 2:
+        return None
+
+    ranges = []
+    prev_close = bars[0][2]
+    for high, low, close in bars[1:]:
+        ranges.append(max(high - low, abs(high - prev_close), abs(low - prev_close)))
+        prev_close = close
+    atr = sum(ranges) / len(ranges)
+    if not math.isfinite(atr) or atr <= 0:
+        return None
+
+    _atr_cache[key] = (time.time(), atr)
+    logging.info(f"ATR({period}, {interval}) for {symbol}: {atr:.4f}")
+    return atr
@@ -0,0 +1,265 @@
+import math
+import time
+import logging
+import threading
+
+from batch_orders import place_batch, cancel_batch, is_error, is_unknown
+from grid_layout import build_ladder
+from price_feed import PriceFeed
+from tca import ExecutionRecorder
+from reconcile import Reconciler, fingerprint
+from shutdown import shutdown, cancel_working, flush_logs
+from metrics import METRICS
+from records import OrderRecord
+
+# -----------------------------------------------------
+# Dynamic grid re-centering
+# -----------------------------------------------------
+COOLDOWN = 30  # minimum seconds between two re-centers
+
+
+class GridRecenter:
+    """
+    Keeps a grid working after price leaves [lower, upper]. On a breakout
+    the range is shifted by a whole number of grid steps towards the price,
+    so most levels of the new ladder coincide with the old one. Only the
+    difference is sent: batch-cancel the levels that disappeared or changed
+    side, batch-place the new ones.
+    """
+
+    def __init__(self, client, symbol, lower_price, upper_price, num_grids, quantity,
+                 mode, tick_size, mid_price, atr=None, cooldown=COOLDOWN):
+        self.client = client
+        self.symbol = symbol
+        self.lower = lower_price
+        self.upper = upper_price
+        self.num_grids = num_grids
+        self.quantity = quantity
+        self.mode = mode
+        self.tick_size = tick_size
+        self.atr = atr
+        self.cooldown = cooldown
+        if mode == "geometric":
+            self.center = math.sqrt(lower_price * upper_price)
+        elif mode == "atr" and atr and mid_price:
+            self.center = mid_price
+        else:
+            self.center = (lower_price + upper_price) / 2
+        self.tag = f"grid{int(time.time())}"
+        self.seq = 0
+        self.working = {}              # (side, price) -> orderId, guarded by lock
+        self.levels = set()            # (side, price) of the current ladder
+        self.lock = threading.Lock()   # the Reconciler thread edits working too
+        self.last_price = None
+        self.last_recenter = 0.0
+        self.breakout = threading.Event()
+        self.recenters = 0
+        self.recorder = ExecutionRecorder(client, symbol, "GRID", None, mid_price, strategy="grid")
+        self.stats = METRICS.strategy(f"grid {symbol}", "grid", symbol, num_grids, "levels")
+
+    # -------------------------------------------------
+    # Order bookkeeping
+    # -------------------------------------------------
+    def _client_id(self):
+        self.seq += 1
+        return f"{self.tag}-{self.seq}"
+
+    def place(self, levels):
+        """
+        levels: [(side, price)]. Places them in batches and records order ids.
+        """
+        orders = [{
+            "symbol": self.symbol, "side": side, "type": "LIMIT", "timeInForce": "GTC",
+            "quantity": self.quantity, "price": price, "newClientOrderId": self._client_id(),
+        } for side, price in levels]
+        placed = 0
+        for level, result in zip(levels, place_batch(self.client, orders)):
+            if is_unknown(result):
+                # May be working: the reconciler adopts it, or cancels it if
+                # the level has been placed again meanwhile
+                err = f"⚠️ {level[0]} at {level[1]} outcome unknown, left to reconciliation: {result.get('msg')}"
+                print(err)
+                logging.warning(err)
+                continue
+            if is_error(result):
+                err = f"❌ Failed to place {level[0]} at {level[1]}: {result.get('msg')}"
+                print(err)
+                logging.error(err)
+                continue
+            order = OrderRecord.from_dict(result)
+            with self.lock:
+                self.working[level] = order.order_id
+            self.recorder.add_order(order.order_id)
+            self.stats.on_order(order)
+            placed += 1
+        self.stats.step(len(self.working))
+        return placed
+
+    def cancel(self, levels):
+        with self.lock:
+            ids = [self.working.pop(level) for level in levels if level in self.working]
+        results = cancel_batch(self.client, self.symbol, ids)
+        return sum(1 for r in results if not is_error(r))
+
+    def refresh_working(self):
+        """
+        Drops levels that filled or were cancelled outside the strategy,
+        using one open-orders request.
+        """
+        try:
+            open_orders = self.client.get_orders(symbol=self.symbol)
+        except Exception as e:
+            print(f"⚠️ Could not refresh open orders: {e}")
+            return
+        open_ids = {o.order_id for o in map(OrderRecord.from_dict, open_orders) if o.client_order_id.startswith(self.tag)}
+        with self.lock:
+            before = len(self.working)
+            # Edited in place: levels placed meanwhile by another thread stay
+            for level, oid in list(self.working.items()):
+                if oid not in open_ids:
+                    del self.working[level]
+            closed = before - len(self.working)
+        self._closed(closed)
+
+    def _closed(self, levels):
+        # Levels that left the book count as fills on the dashboard (a hand
+        # cancel looks the same from here, and is rare)
+        if levels:
+            self.stats.on_fill(levels * self.quantity, levels)
+            self.stats.step(len(self.working))
+
+    def expected_orders(self):
+        with self.lock:
+            working = list(self.working.items())
+        return {oid: fingerprint(side, price, self.quantity) for (side, price), oid in working}
+
+    def on_reconcile(self, event):
+        """
+        Reconciler callback (runs on the Reconciler thread): a grid order
+        that is no longer open (filled, cancelled by hand, expired) is
+        dropped from the working set, so the next re-center places that
+        level again. An open grid order the strategy does not track (e.g.
+        one whose placement response was lost) is adopted if its level is
+        on the ladder and free, and cancelled otherwise.
+        """
+        if event["type"] == "missing":
+            with self.lock:
+                levels = [level for level, oid in self.working.items() if oid == event["orderId"]]
+                for level in levels:
+                    del self.working[level]
+            self._closed(len(levels))
+            msg = f"⚠️ Grid order {event['orderId']} is no longer open on the exchange."
+        elif event["type"] == "unexpected":
+            msg = self._adopt_or_cancel(event["orderId"], event["exchange"])
+        else:
+            msg = f"⚠️ Grid order {event['orderId']} {event['type']}: expected {event['local']}, exchange has {event['exchange']}"
+        print(msg)
+        logging.warning(msg)
+
+    def _adopt_or_cancel(self, order_id, exchange):
+        side, price, _ = exchange
+        with self.lock:
+            level = next((l for l in self.levels if l[0] == side and round(l[1], 8) == price), None)
+            adopt = level is not None and level not in self.working and not shutdown.requested.is_set()
+            if adopt:
+                self.working[level] = order_id
+        if adopt:
+            self.recorder.add_order(order_id)
+            self.stats.step(len(self.working))
+            return f"⚠️ Untracked grid order {order_id} ({side} at {price}) adopted."
+        try:
+            self.client.cancel_order(symbol=self.symbol, orderId=order_id)
+            return f"⚠️ Untracked grid order {order_id} ({side} at {price}) cancelled: its level is taken or off the ladder."
+        except Exception as e:
+            return f"❌ Failed to cancel untracked grid order {order_id} ({side} at {price}): {e}"
+
+    # -------------------------------------------------
+    # Re-centering
+    # -------------------------------------------------
+    def shifted_range(self, price):
+        """
+        Range moved by the whole number of grid steps closest to price.
+        """
+        n = self.num_grids - 1
+        if self.mode == "geometric":
+            ratio = (self.upper / self.lower) ** (1 / n)
+            factor = ratio ** round(math.log(price / self.center) / math.log(ratio))
+            return self.lower * factor, self.upper * factor, self.center * factor
+        step = self.atr if self.mode == "atr" and self.atr else (self.upper - self.lower) / n
+        shift = round((price - self.center) / step) * step
+        return self.lower + shift, self.upper + shift, self.center + shift
+
+    def recenter(self, price):
+        lower, upper, center = self.shifted_range(price)
+        buys, sells = build_ladder(lower, upper, self.num_grids, self.mode, self.tick_size, price, self.atr, center=center)
+        desired = {("BUY", p) for p in buys} | {("SELL", p) for p in sells}
+
+        self.refresh_working()
+        with self.lock:
+            self.levels = desired
+            to_cancel = [level for level in self.working if level not in desired]
+            to_place = sorted(desired - set(self.working), key=lambda level: abs(level[1] - price))
+
+        cancelled = self.cancel(to_cancel)
+        placed = self.place(to_place)
+        self.lower, self.upper, self.center = lower, upper, center
+        self.last_recenter = time.time()
+        self.recenters += 1
+        self.stats.step(len(self.working), status=f"{self.recenters} re-centers")
+
+        msg = (f"🔁 Grid re-centered on {price:.2f}: range {lower:.2f} → {upper:.2f}, "
+               f"cancelled {cancelled}, placed {placed}, kept {len(desired) - len(to_place)}")
+        print(msg)
+        logging.info(msg)
+
+    def on_price(self, symbol, price, event_time=None):
+        if symbol != self.symbol:
+            return
+        self.last_price = price
+        if price < self.lower or price > self.upper:
+            self.breakout.set()
+
+    def run(self, buy_prices, sell_prices):
+        """
+        Places the initial ladder, then re-centers on every breakout until
+        stopped. A graceful shutdown (first Ctrl-C / SIGTERM) cancels the
+        working ladder; an interrupt without it leaves orders on the exchange.
+        """
+        levels = [("BUY", p) for p in buy_prices] + [("SELL", p) for p in sell_prices]
+        self.levels = set(levels)
+        placed = self.place(levels)
+        print(f"✅ Placed {placed} grid orders. Watching {self.symbol} for breakouts (Ctrl-C to stop)...")
+
+        feed = PriceFeed()
+        feed.add_listener(self.on_price)
+        feed.start([self.symbol])
+        reconciler = Reconciler(self.client).watch("grid", self.symbol, self.on_reconcile, self.expected_orders,
+                                                   prefix=self.tag).start()
+        try:
+            while not shutdown.requested.is_set():
+                if not self.breakout.wait(timeout=1):
+                    continue
+                wait = self.cooldown - (time.time() - self.last_recenter)
+                if wait > 0 and shutdown.sleep(wait):
+                    break
+                self.breakout.clear()
+                price = self.last_price
+                if price is not None and (price < self.lower or price > self.upper):
+                    self.recenter(price)
+            reconciler.stop()
+            with self.lock:
+                ids = list(self.working.values())
+                self.working.clear()
+            cancelled = cancel_working(self.client, self.symbol, ids)
+            self.stats.finish("stopped")
+            msg = (f"🛑 Re-centering stopped after {self.recenters} moves: "
+                   f"{cancelled}/{len(ids)} working grid orders cancelled.")
+            print(msg)
+            logging.warning(msg)
+        except KeyboardInterrupt:
+            print(f"\n⏹️ Re-centering stopped after {self.recenters} moves. Grid orders remain on the exchange.")
+        finally:
+            reconciler.stop()
+            feed.stop()
+            self.recorder.finish()
+            flush_logs()
@@ -0,0 +1,82 @@
+import sys
+import json
+import timeit
+
+import json_codec
+
+# -----------------------------------------------------
+# JSON decode micro-benchmark
+# -----------------------------------------------------
+# Decode cost per message type for each available decoder: the stdlib,
+# orjson (if installed) and field extraction for the hot stream events.
+# Messages are synthetic but shaped and sized like the real payloads, with
+# fields in the order the exchange sends them.
+def sample_messages():
+    agg = {"e": "aggTrade", "E": 1760000000123, "s": "BTCUSDT", "a": 2600000000, "p": "108123.40", "q": "0.012",
+           "f": 6500000000, "l": 6500000001, "T": 1760000000120, "m": True}
+    mark = {"e": "markPriceUpdate", "E": 1760000000000, "s": "BTCUSDT", "p": "108120.51234567",
+            "i": "108150.10934783", "P": "108110.2", "r": "0.00010000", "T": 1760025600000}
+    book = {"e": "bookTicker", "u": 8800000000000, "E": 1760000000123, "T": 1760000000120, "s": "BTCUSDT",
+            "b": "108123.30", "B": "4.512", "a": "108123.40", "A": "0.871"}
+    depth = {"e": "depthUpdate", "E": 1760000000123, "T": 1760000000120, "s": "BTCUSDT", "U": 8800000000000,
+             "u": 8800000000042, "pu": 8800000000000,
+             "b": [[f"{108123.3 - i / 10:.1f}", f"{0.1 * (i + 1):.3f}"] for i in range(20)],
+             "a": [[f"{108123.4 + i / 10:.1f}", f"{0.1 * (i + 1):.3f}"] for i in range(20)]}
+    order = {"e": "ORDER_TRADE_UPDATE", "E": 1760000000123, "T": 1760000000120, "o": {
+        "s": "BTCUSDT", "c": "twap-0123456789abcdef01234567", "S": "BUY", "o": "MARKET", "f": "GTC", "q": "0.002",
+        "p": "0", "ap": "108123.40", "sp": "0", "x": "TRADE", "X": "FILLED", "i": 4000000001, "l": "0.002",
+        "z": "0.002", "L": "108123.40", "n": "0.10812340", "N": "USDT", "T": 1760000000120, "t": 6500000001,
+        "b": "0", "a": "0", "m": False, "R": False, "wt": "CONTRACT_PRICE", "ot": "MARKET", "ps": "BOTH",
+        "cp": False, "rp": "0", "pP": False, "si": 0, "ss": 0, "V": "EXPIRE_MAKER", "pm": "NONE", "gtd": 0}}
+    symbol = {"symbol": "BTCUSDT", "pair": "BTCUSDT", "contractType": "PERPETUAL", "deliveryDate": 4133404800000,
+              "onboardDate": 1569398400000, "status": "TRADING", "baseAsset": "BTC", "quoteAsset": "USDT",
+              "marginAsset": "USDT", "pricePrecision": 2, "quantityPrecision": 3, "orderTypes": [
+                  "LIMIT", "MARKET", "STOP", "STOP_MARKET", "TAKE_PROFIT", "TAKE_PROFIT_MARKET", "TRAILING_STOP_MARKET"],
+              "timeInForce": ["GTC", "IOC", "FOK", "GTX", "GTD"], "filters": [
+                  {"filterType": "PRICE_FILTER", "minPrice": "556.80", "maxPrice": "4529764", "tickSize": "0.10"},
+                  {"filterType": "LOT_SIZE", "minQty": "0.001", "maxQty": "1000", "stepSize": "0.001"},
+                  {"filterType": "MARKET_LOT_SIZE", "minQty": "0.001", "maxQty": "120", "stepSize": "0.001"},
+                  {"filterType": "MAX_NUM_ORDERS", "limit": 200},
+                  {"filterType": "MAX_NUM_ALGO_ORDERS", "limit": 10},
+                  {"filterType": "MIN_NOTIONAL", "notional": "100"},
+                  {"filterType": "PERCENT_PRICE", "multiplierUp": "1.0500", "multiplierDown": "0.9500",
+                   "multiplierDecimal": "4"}]}
+    info = {"timezone": "UTC", "serverTime": 1760000000000, "rateLimits": [], "assets": [],
+            "symbols": [dict(symbol, symbol=f"SYM{i}USDT") for i in range(600)]}
+    return {
+        "aggTrade": json.dumps(agg, separators=(",", ":")),
+        "markPriceUpdate": json.dumps(mark, separators=(",", ":")),
+        "bookTicker": json.dumps(book, separators=(",", ":")),
+        "depthUpdate (20 levels)": json.dumps(depth, separators=(",", ":")),
+        "ORDER_TRADE_UPDATE": json.dumps(order, separators=(",", ":")),
+        "exchangeInfo": json.dumps(info, separators=(",", ":")),
+    }
+
+
+def decoders(kind):
+    result = {"json": json.loads}
+    if json_codec.orjson is not None:
+        result["orjson"] = json_codec.orjson.loads
+    if kind in json_codec.STREAM_FIELDS:
+        result["extract"] = lambda message: json_codec.extract(message, kind)
+    return result
+
+
+def per_call_us(func, message):
+    timer = timeit.Timer(lambda: func(message))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number * 1e6
+
+
+if __name__ == "__main__":
+    only = set(sys.argv[1:])
+    print(f"Backend in use: {json_codec.BACKEND}\n")
+    print(f"{'message':<26}{'size':>10}  {'decoder':<10}{'µs/msg':>10}{'vs json':>9}")
+    for kind, message in sample_messages().items():
+        if only and kind.split()[0] not in only:
+            continue
+        baseline = None
+        for name, func in decoders(kind).items():
+            us = per_call_us(func, message)
+            baseline = baseline or us
+            print(f"{kind:<26}{len(message):>9}B  {name:<10}{us:>10.2f}{baseline / us:>8.1f}x")
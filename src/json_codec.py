@@ -0,0 +1,113 @@
+import os
+import json
+
+# -----------------------------------------------------
+# Pluggable JSON decoding
+# -----------------------------------------------------
+# orjson decodes 2-4x faster than the stdlib and is used when installed
+# (JSON_BACKEND=json forces the stdlib). Hot stream handlers only need a
+# few fields of small flat events; without orjson, decode_event() pulls
+# those fields out with a few string searches instead of building the
+# whole dict.
+try:
+    if os.getenv("JSON_BACKEND", "orjson").lower() != "orjson":
+        raise ImportError
+    import orjson
+
+    BACKEND = "orjson"
+    loads = orjson.loads
+
+    def dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    orjson = None
+    BACKEND = "json"
+    loads = json.loads
+
+    def dumps(obj):
+        return json.dumps(obj, separators=(",", ":"))
+
+
+# Fields each hot stream handler reads, by event type. Each field is found
+# by its own key with str.find, so the order of fields in the payload does
+# not matter; the events are flat, so a quoted key followed by a colon is
+# always that field. A message missing any of them is decoded in full.
+# Only events where this beats json.loads are listed (see json_bench.py):
+# with six fields (markPriceUpdate) or four (bookTicker) the separate
+# scans cost more than decoding the whole event.
+STREAM_FIELDS = {
+    "aggTrade": ("E", "s", "p"),
+}
+INT_FIELDS = ("E", "T")
+EVENT_PREFIX = '{"e":"'
+# (field, key to search for, characters from key start to value, is int)
+_FIELD_KEYS = {
+    kind: tuple((name, f'"{name}":', len(name) + 3, name in INT_FIELDS) for name in fields)
+    for kind, fields in STREAM_FIELDS.items()
+}
+
+
+def extract(message, kind):
+    """
+    {field: value} for the fields STREAM_FIELDS lists for a kind event,
+    without decoding the rest, or None if one of them is missing.
+    """
+    event = {"e": kind}
+    find = message.find
+    for name, key, skip, is_int in _FIELD_KEYS[kind]:
+        start = find(key)
+        if start < 0:
+            return None
+        start += skip
+        if message.startswith('"', start):
+            start += 1
+            end = find('"', start)
+        else:
+            end = find(",", start)
+            if end < 0:
+                end = find("}", start)
+        if end < 0:
+            return None
+        value = message[start:end]
+        event[name] = int(value) if is_int else value
+    return event
+
+
+def decode_event(message):
+    """
+    Decodes a market stream event. With the stdlib backend, hot events
+    (see STREAM_FIELDS) come back with only the fields their handlers
+    use; everything else is decoded in full.
+    """
+    if orjson is None and isinstance(message, str) and message.startswith(EVENT_PREFIX):
+        kind = message[len(EVENT_PREFIX):message.find('"', len(EVENT_PREFIX))]
+        if kind in STREAM_FIELDS:
+            event = extract(message, kind)
+            if event is not None:
+                return event
+    return loads(message)
+
+
+def _fast_json(response, *args, **kwargs):
+    # The connector logs response.text on every call; without a declared
+    # charset requests would run encoding detection over the whole body
+    if response.encoding is None:
+        response.encoding = "utf-8"
+    if orjson is not None:
+        response.json = lambda **_: loads(response.content)
+    return response
+
+
+def install(client):
+    """
+    Makes client's REST responses decode with the fast backend (a requests
+    response hook, so the connector itself is untouched). Safe to call
+    more than once.
+    """
+    session = getattr(client, "session", None)
+    if session is None:
+        return client
+    hooks = session.hooks.setdefault("response", [])
+    if _fast_json not in hooks:
+        hooks.append(_fast_json)
+    return client
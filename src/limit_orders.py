@@ -1,19 +1,24 @@
 import sys
+import time
+import queue
 import logging
-from binance.um_futures import UMFutures
-from dotenv import load_dotenv
-import os
+import threading
+
+from client_factory import create_client
+from exchange_cache import get_symbol_filters, round_to_step
+from rate_limiter import ORDER_LIMITER
+from order_submit import submit_order, find_order, client_order_id, OrderUnknownError
+from user_stream import open_user_stream
+import runtime
+from profiling import span
+from shutdown import shutdown, flush_logs
 
 # -----------------------------------------------------
 # Setup
 # -----------------------------------------------------
-load_dotenv()
-
-API_KEY = os.getenv("API_KEY")
-API_SECRET = os.getenv("API_SECRET")
-BASE_URL = os.getenv("BASE_URL", "https://testnet.binancefuture.com")
-
-client = UMFutures(key=API_KEY, secret=API_SECRET, base_url=BASE_URL)
+# Built in __main__ once the arguments have been checked (see client_factory)
+client = None
+SILENT_POLLS = 5   # poll intervals without a user-data event before icebergs poll anyway
 
 # Setup logging
 logging.basicConfig(
@@ -31,13 +36,8 @@ def get_min_notional(symbol):
     for the given symbol from Binance Futures exchange info.
     """
     try:
-        info = client.exchange_info()
-        for s in info["symbols"]:
-            if s["symbol"] == symbol:
-                for f in s["filters"]:
-                    if f["filterType"] == "MIN_NOTIONAL":
-                        return float(f["notional"])
-        return 100.0  # default fallback
+        filters = get_symbol_filters(client, symbol)
+        return filters["min_notional"] if filters else 100.0  # default fallback
     except Exception as e:
         print(f"⚠️ Could not fetch minimum notional info: {e}")
         return 100.0
@@ -45,15 +45,22 @@ def get_min_notional(symbol):
 # -----------------------------------------------------
 # Helper: Validate user input
 # -----------------------------------------------------
-def validate_args(args):
+def parse_args(args):
+    """
+    Local checks only, so a bad invocation exits before any network work.
+    """
     if len(args) < 5:
-        print("Usage: python limit_orders.py <symbol> <BUY/SELL> <quantity> <price>")
+        print("Usage: python limit_orders.py <symbol> <BUY/SELL> <quantity> <price> [--iceberg <display_qty>]")
         sys.exit(1)
 
     symbol = args[1].upper()
     side = args[2].upper()
-    quantity = float(args[3])
-    price = float(args[4])
+    try:
+        quantity = float(args[3])
+        price = float(args[4])
+    except ValueError:
+        print("❌ Quantity and price must be numbers.")
+        sys.exit(1)
 
     if side not in ["BUY", "SELL"]:
         print("❌ Invalid side. Use BUY or SELL.")
@@ -63,6 +70,30 @@ def validate_args(args):
         print("❌ Quantity and price must be greater than 0.")
         sys.exit(1)
 
+    return symbol, side, quantity, price
+
+
+def iceberg_flag(args):
+    """
+    Removes --iceberg <display_qty> from args in place; returns the display
+    quantity, or None if the flag was not given.
+    """
+    if "--iceberg" not in args:
+        return None
+    i = args.index("--iceberg")
+    try:
+        display_qty = float(args[i + 1])
+    except (IndexError, ValueError):
+        print("Usage: python limit_orders.py <symbol> <BUY/SELL> <quantity> <price> [--iceberg <display_qty>]")
+        print("❌ --iceberg needs a numeric display quantity.")
+        sys.exit(1)
+    del args[i:i + 2]
+    return display_qty
+
+
+def validate_args(args):
+    symbol, side, quantity, price = parse_args(args)
+
     # Check notional value
     notional = price * quantity
     min_notional = get_min_notional(symbol)
@@ -110,9 +141,264 @@ def place_limit_order(symbol, side, quantity, price):
         print(err)
         logging.error(err)
 
+# -----------------------------------------------------
+# Iceberg mode: show only a display clip, refill on fill
+# -----------------------------------------------------
+class IcebergOrder:
+    def __init__(self, iceberg_id, symbol, side, total_qty, price, display_qty):
+        self.iceberg_id = iceberg_id
+        self.symbol = symbol
+        self.side = side
+        self.total_qty = total_qty
+        self.price = price
+        self.display_qty = display_qty
+        self.filled_qty = 0.0        # filled by completed clips
+        self.clips = 0
+        self.working_client_id = None
+        self.done = False
+        self.error = None            # why the iceberg stopped early, if it did
+
+
+class IcebergManager:
+    """
+    Works many iceberg orders at once. Clips are refilled as soon as the
+    user-data stream reports the visible clip FILLED, sized from cached
+    exchange filters (no validation round trip) and throttled by the shared
+    order rate limiter. Falls back to polling if the stream is unavailable,
+    or has been silent for SILENT_POLLS poll intervals (a dead socket does
+    not always close).
+    """
+
+    def __init__(self, client, limiter=ORDER_LIMITER, poll_interval=2):
+        self.client = client
+        self.limiter = limiter
+        self.poll_interval = poll_interval
+        self.icebergs = []
+        self.working = {}            # clientOrderId -> IcebergOrder
+        self.refills = queue.Queue()
+        self.lock = threading.Lock()
+        self.stream = None
+        self.heard = time.time()     # last stream event or fallback poll
+        self.stopped = False
+        self.run_id = int(time.time() * 1000)   # keeps clip ids unique across runs
+        self.order_lock = threading.Lock()   # a clip placement and the final cancel never overlap
+
+    def start(self):
+        try:
+            self.stream = open_user_stream(self.client)
+            self.stream.add_listener(self.on_event)
+            self.stream.start()
+        except Exception as e:
+            print(f"⚠️ User data stream unavailable, polling every {self.poll_interval}s: {e}")
+            self.stream = None
+        threading.Thread(target=self._refill_worker, daemon=True).start()
+
+    def stop(self):
+        if self.stream:
+            self.stream.stop()
+
+    def submit(self, symbol, side, total_qty, price, display_qty):
+        ice = IcebergOrder(len(self.icebergs) + 1, symbol, side, total_qty, price, display_qty)
+        self.icebergs.append(ice)
+        self._place_clip(ice)
+        return ice
+
+    def on_event(self, event):
+        self.heard = time.time()
+        if event.get("e") != "ORDER_TRADE_UPDATE":
+            return
+        o = event["o"]
+        status = o["X"]
+        if status not in ("FILLED", "CANCELED", "EXPIRED", "REJECTED"):
+            return
+        with self.lock:
+            ice = self.working.pop(o["c"], None)
+        if ice is None:
+            return
+
+        ice.filled_qty = round(ice.filled_qty + float(o["z"]), 8)
+        if status == "FILLED":
+            self.refills.put(ice)
+        else:
+            ice.done = True
+            msg = f"⚠️ Iceberg #{ice.iceberg_id} clip {status.lower()}; stopping with {ice.filled_qty} of {ice.total_qty} filled."
+            print(msg)
+            logging.warning(msg)
+
+    def wait(self):
+        """
+        Returns once every iceberg is done, or on a graceful shutdown.
+        """
+        while not all(ice.done for ice in self.icebergs):
+            if shutdown.sleep(self.poll_interval):
+                return
+            if self.stream is None:
+                self._poll()
+            elif time.time() - self.heard > SILENT_POLLS * self.poll_interval:
+                logging.warning(f"No user-data event for {time.time() - self.heard:.0f}s; polling working clips.")
+                self._poll()
+                self.heard = time.time()
+
+    def cancel_working(self):
+        """
+        Stops refills and cancels every working clip, counting what the
+        cancelled clips had filled. Returns (cancelled, working).
+        """
+        with self.order_lock, self.lock:
+            self.stopped = True
+            working, self.working = self.working, {}
+        cancelled = 0
+        for client_id, ice in working.items():
+            self.limiter.acquire()
+            try:
+                order = self.client.cancel_order(symbol=ice.symbol, origClientOrderId=client_id)
+                ice.filled_qty = round(ice.filled_qty + float(order.get("executedQty") or 0), 8)
+                cancelled += 1
+            except Exception as e:
+                logging.error(f"❌ Failed to cancel iceberg clip {client_id}: {e}")
+            ice.done = True
+        for ice in self.icebergs:
+            ice.done = True
+        return cancelled, len(working)
+
+    def _refill_worker(self):
+        while True:
+            ice = self.refills.get()
+            if not self.stopped:
+                self._place_clip(ice)
+
+    def _poll(self):
+        with self.lock:
+            working = list(self.working.items())
+        for client_id, ice in working:
+            try:
+                order = find_order(self.client, ice.symbol, client_id)
+            except Exception as e:
+                logging.error(f"❌ Failed to query iceberg clip {client_id}: {e}")
+                continue
+            if order is None:
+                # A clip whose placement outcome was unknown never reached
+                # the exchange: place it again
+                with self.lock:
+                    self.working.pop(client_id, None)
+                self.refills.put(ice)
+                continue
+            self.on_event({
+                "e": "ORDER_TRADE_UPDATE",
+                "o": {"c": client_id, "X": order["status"], "z": order["executedQty"]},
+            })
+
+    def _clip_size(self, ice, remaining):
+        filters = get_symbol_filters(self.client, ice.symbol)
+        step = filters["step_size"] if filters else 0.001
+        min_qty = filters["min_qty"] if filters else step
+        min_notional = filters["min_notional"] if filters else 0.0
+
+        clip = round_to_step(min(ice.display_qty, remaining), step)
+        leftover = round_to_step(remaining - clip, step)
+        # Never leave a tail that is too small to post on its own
+        if leftover > 0 and (leftover < min_qty or leftover * ice.price < min_notional):
+            clip = round_to_step(remaining, step)
+        return clip if clip >= min_qty else 0.0
+
+    def _place_clip(self, ice):
+        with self.order_lock:
+            self._send_clip(ice)
+
+    def _send_clip(self, ice):
+        remaining = ice.total_qty - ice.filled_qty
+        clip = self._clip_size(ice, remaining)
+        if clip <= 0:
+            ice.done = True
+            msg = f"🎯 Iceberg #{ice.iceberg_id} completed: {ice.filled_qty} {ice.symbol} in {ice.clips} clips."
+            print(msg)
+            logging.info(msg)
+            return
+
+        client_id = client_order_id("ice", self.run_id, ice.iceberg_id, ice.clips + 1)
+        with self.lock:
+            if self.stopped:
+                return
+            ice.clips += 1
+            self.working[client_id] = ice
+
+        self.limiter.acquire()
+        try:
+            # Retries transient failures and looks the clip up before resending
+            order = submit_order(
+                self.client, client_id,
+                symbol=ice.symbol,
+                side=ice.side,
+                type="LIMIT",
+                timeInForce="GTC",
+                quantity=clip,
+                price=ice.price
+            )
+            msg = f"✅ Iceberg #{ice.iceberg_id} clip {ice.clips}: {ice.side} {clip} {ice.symbol} at {ice.price} ({remaining - clip:.6f} hidden)."
+            print(msg)
+            logging.info(msg)
+            logging.info(f"Order response: {order}")
+        except OrderUnknownError as e:
+            # May be working: keep it tracked, the next poll settles it
+            logging.warning(f"Iceberg #{ice.iceberg_id} clip {client_id} outcome unknown, will poll: {e}")
+        except Exception as e:
+            with self.lock:
+                self.working.pop(client_id, None)
+            ice.error = str(e)
+            ice.done = True
+            err = (f"❌ Iceberg #{ice.iceberg_id} stopped: clip {ice.clips} could not be placed ({e}). "
+                   f"{ice.filled_qty} of {ice.total_qty} {ice.symbol} filled, {remaining:.6f} not placed.")
+            print(err)
+            logging.error(err)
+
+
+def place_iceberg_order(symbol, side, quantity, price, display_qty):
+    filters = get_symbol_filters(client, symbol)
+    if filters and display_qty * price < filters["min_notional"]:
+        print(f"❌ Display clip notional ({display_qty * price:.2f}) is below the minimum required ({filters['min_notional']:.2f} USDT).")
+        sys.exit(1)
+
+    logging.info(f"Iceberg {side} started for {quantity} {symbol} at {price}, display {display_qty}")
+    manager = IcebergManager(client)
+    manager.start()
+    manager.submit(symbol, side, quantity, price, display_qty)
+    try:
+        manager.wait()
+        if shutdown.requested.is_set():
+            cancelled, working = manager.cancel_working()
+            for ice in manager.icebergs:
+                msg = (f"🛑 Iceberg #{ice.iceberg_id} stopped: {ice.filled_qty} of {ice.total_qty} {ice.symbol} filled "
+                       f"in {ice.clips} clips; {cancelled}/{working} working clips cancelled.")
+                print(msg)
+                logging.warning(msg)
+    finally:
+        manager.stop()
+        flush_logs()
+
 # -----------------------------------------------------
 # Entry point
 # -----------------------------------------------------
 if __name__ == "__main__":
-    symbol, side, quantity, price = validate_args(sys.argv)
-    place_limit_order(symbol, side, quantity, price)
+    args = sys.argv[:]
+    options = runtime.flags(args)
+    display_qty = iceberg_flag(args)
+
+    _, _, quantity, _ = parse_args(args)
+    if display_qty is not None and not 0 < display_qty < quantity:
+        print("❌ Iceberg display quantity must be greater than 0 and less than the total quantity.")
+        sys.exit(1)
+
+    client = runtime.start(options, "limit_orders", create_client())
+    # Before validation, so the risk cache loads in the background meanwhile;
+    # only an iceberg lives long enough to need the clock sync and the stream
+    iceberg = display_qty is not None
+    runtime.setup(options, "limit_orders", client, follow=iceberg, sync_clock=iceberg)
+    with span("validate"):
+        symbol, side, quantity, price = validate_args(args)
+
+    if display_qty is None:
+        place_limit_order(symbol, side, quantity, price)
+    else:
+        place_iceberg_order(symbol, side, quantity, price, display_qty)
+    if options.paper:
+        client.hold()
@@ -0,0 +1,222 @@
+import sys
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+from client_factory import load_env, create_client
+from rate_limiter import WEIGHT_LIMITER
+from data_store import read_meta, append_rows
+from profiling import profile_flag, start_profiling, span
+
+# -----------------------------------------------------
+# Setup
+# -----------------------------------------------------
+# Built in __main__ once the arguments have been checked (see client_factory).
+# Market data endpoints are public; DATA_BASE_URL may point at mainnet while
+# orders go to the testnet (defaults to BASE_URL).
+client = None
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LOG_FILE = os.path.join(PROJECT_ROOT, "bot.log")
+
+logging.basicConfig(
+    filename=LOG_FILE,
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DAY_MS = 24 * 60 * 60 * 1000
+HOUR_MS = 60 * 60 * 1000
+KLINE_LIMIT = 1500        # weight 10 per page
+AGG_TRADE_LIMIT = 1000    # weight 20 per page
+MAX_WORKERS = 4
+INTERVAL_MS = {
+    "1s": 1000, "1m": 60000, "3m": 180000, "5m": 300000, "15m": 900000, "30m": 1800000,
+    "1h": HOUR_MS, "2h": 2 * HOUR_MS, "4h": 4 * HOUR_MS, "6h": 6 * HOUR_MS,
+    "8h": 8 * HOUR_MS, "12h": 12 * HOUR_MS, "1d": DAY_MS,
+}
+
+# -----------------------------------------------------
+# Helper: Day partitions
+# -----------------------------------------------------
+def day_range(start_day, end_day):
+    start = datetime.strptime(start_day, "%Y-%m-%d")
+    end = datetime.strptime(end_day, "%Y-%m-%d")
+    days = []
+    while start <= end:
+        days.append(start.strftime("%Y-%m-%d"))
+        start += timedelta(days=1)
+    return days
+
+
+def day_bounds(day):
+    start = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    start_ms = int(start.timestamp() * 1000)
+    return start_ms, start_ms + DAY_MS - 1
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+# -----------------------------------------------------
+# Paging: klines
+# -----------------------------------------------------
+def fetch_kline_day(symbol, interval, day, dataset):
+    """
+    Pages one UTC day of klines, resuming after the last stored bar. The
+    bar still in progress is not stored: it would keep its partial OHLCV,
+    since a resume starts after it. The next run fetches it once closed.
+    """
+    start_ms, end_ms = day_bounds(day)
+    meta = read_meta(dataset, symbol, day)
+    if meta["complete"]:
+        return 0
+    if meta["last_time"] is not None:
+        start_ms = meta["last_time"] + 1
+
+    written = 0
+    while start_ms <= end_ms:
+        WEIGHT_LIMITER.acquire(10)
+        fetched_at = now_ms()
+        bars = client.klines(symbol, interval, startTime=start_ms, endTime=end_ms, limit=KLINE_LIMIT)
+        rows = [
+            (int(b[0]), float(b[1]), float(b[2]), float(b[3]), float(b[4]), float(b[5]),
+             int(b[6]), float(b[7]), int(b[8]), float(b[9]), float(b[10]))
+            for b in bars if int(b[6]) < fetched_at
+        ]
+        if not rows:
+            break
+        written += append_rows(dataset, symbol, day, rows)
+        start_ms = rows[-1][0] + INTERVAL_MS.get(interval, 1)
+        if len(rows) < KLINE_LIMIT:
+            break
+    # A day that has fully elapsed will not change again
+    if end_ms < now_ms():
+        append_rows(dataset, symbol, day, [], complete=True)
+    return written
+
+# -----------------------------------------------------
+# Paging: aggTrades
+# -----------------------------------------------------
+def fetch_agg_trade_hour(symbol, start_ms, end_ms):
+    """
+    Returns all aggTrades in [start_ms, end_ms] (at most one hour, as the
+    endpoint requires), paging forward by trade id.
+    """
+    WEIGHT_LIMITER.acquire(20)
+    trades = client.agg_trades(symbol, startTime=start_ms, endTime=end_ms, limit=AGG_TRADE_LIMIT)
+    result = list(trades)
+    while len(trades) == AGG_TRADE_LIMIT:
+        WEIGHT_LIMITER.acquire(20)
+        trades = client.agg_trades(symbol, fromId=trades[-1]["a"] + 1, limit=AGG_TRADE_LIMIT)
+        trades = [t for t in trades if t["T"] <= end_ms]
+        result.extend(trades)
+    return [
+        (t["a"], float(t["p"]), float(t["q"]), t["f"], t["l"], t["T"], 1 if t["m"] else 0)
+        for t in result
+    ]
+
+
+def fetch_agg_trade_day(symbol, day, pool):
+    start_ms, end_ms = day_bounds(day)
+    meta = read_meta("aggtrades", symbol, day)
+    if meta["complete"]:
+        return 0
+    if meta.get("last_key") is not None:
+        # Refetch the last stored millisecond: trades in it that were not
+        # stored yet are kept, the rest are dropped by aggregate trade id
+        start_ms = meta["last_time"]
+    elif meta["last_time"] is not None:
+        start_ms = meta["last_time"] + 1
+    end_ms = min(end_ms, now_ms())
+
+    # Hours are fetched concurrently, then appended in order
+    windows = []
+    while start_ms <= end_ms:
+        windows.append((start_ms, min(start_ms + HOUR_MS - 1, end_ms)))
+        start_ms += HOUR_MS
+    jobs = [pool.submit(fetch_agg_trade_hour, symbol, a, b) for a, b in windows]
+
+    written = 0
+    for job in jobs:
+        written += append_rows("aggtrades", symbol, day, job.result())
+    if day_bounds(day)[1] < now_ms():
+        append_rows("aggtrades", symbol, day, [], complete=True)
+    return written
+
+# -----------------------------------------------------
+# Main logic
+# -----------------------------------------------------
+def download(kind, symbol, start_day, end_day, interval="1m"):
+    days = day_range(start_day, end_day)
+    print(f"🚀 Downloading {kind} for {symbol}: {start_day} → {end_day} ({len(days)} days)")
+    logging.info(f"Market data download started: {kind} {symbol} {start_day}-{end_day}")
+
+    total = 0
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        if kind == "klines":
+            # Days are paged concurrently; aggTrades parallelise by hour instead
+            dataset = f"klines_{interval}"
+            results = [(day, pool.submit(fetch_kline_day, symbol, interval, day, dataset)) for day in days]
+        else:
+            results = [(day, None) for day in days]
+
+        for day, job in results:
+            try:
+                written = job.result() if job else fetch_agg_trade_day(symbol, day, pool)
+                total += written
+                print(f"✅ {day}: {written} rows")
+            except Exception as e:
+                err = f"❌ Failed to download {kind} for {symbol} on {day}: {e}"
+                print(err)
+                logging.error(err)
+
+    print(f"\n🎯 Download finished: {total} new rows stored.")
+    logging.info(f"Market data download finished: {total} rows")
+
+# -----------------------------------------------------
+# Helper: Validate user input
+# -----------------------------------------------------
+def validate_args(args):
+    if len(args) < 5:
+        print("Usage: python market_data.py <klines|aggtrades> <symbol> <start YYYY-MM-DD> <end YYYY-MM-DD> [interval]")
+        sys.exit(1)
+
+    kind = args[1].lower()
+    symbol = args[2].upper()
+    interval = args[5] if len(args) > 5 else "1m"
+
+    if kind not in ("klines", "aggtrades"):
+        print("❌ Invalid data type. Use klines or aggtrades.")
+        sys.exit(1)
+
+    try:
+        days = day_range(args[3], args[4])
+    except ValueError:
+        print("❌ Dates must be in YYYY-MM-DD format.")
+        sys.exit(1)
+    if not days:
+        print("❌ Start date must not be after end date.")
+        sys.exit(1)
+
+    if kind == "klines" and interval not in INTERVAL_MS:
+        print(f"❌ Unsupported interval {interval}.")
+        sys.exit(1)
+
+    return kind, symbol, args[3], args[4], interval
+
+# -----------------------------------------------------
+# Entry point
+# -----------------------------------------------------
+if __name__ == "__main__":
+    args = sys.argv[:]
+    profile = profile_flag(args)
+    with span("validate"):
+        kind, symbol, start_day, end_day, interval = validate_args(args)
+    load_env()
+    client = create_client(base_url=os.getenv("DATA_BASE_URL"))
+    if profile:
+        start_profiling("market_data", client)
+    download(kind, symbol, start_day, end_day, interval)
@@ -1,19 +1,17 @@
 import sys
 import logging
-from binance.um_futures import UMFutures
-from dotenv import load_dotenv
-import os
+
+from client_factory import create_client
+from exchange_cache import get_symbol_filters
+from risk import start_risk
+from paper import PaperExchange, paper_flag
+from profiling import profile_flag, start_profiling, span
 
 # -----------------------------------------------------
 # Setup
 # -----------------------------------------------------
-load_dotenv()
-
-API_KEY = os.getenv("API_KEY")
-API_SECRET = os.getenv("API_SECRET")
-BASE_URL = os.getenv("BASE_URL", "https://testnet.binancefuture.com")
-
-client = UMFutures(key=API_KEY, secret=API_SECRET, base_url=BASE_URL)
+# Built in __main__ once the arguments have been checked (see client_factory)
+client = None
 
 # Setup logging
 logging.basicConfig(
@@ -30,9 +28,7 @@ def is_valid_symbol(symbol):
     Checks if the provided symbol exists on Binance Futures.
     """
     try:
-        info = client.exchange_info()
-        symbols = [s["symbol"] for s in info["symbols"]]
-        return symbol in symbols
+        return get_symbol_filters(client, symbol) is not None
     except Exception as e:
         print(f"⚠️ Could not verify symbol (network issue): {e}")
         return True  # Assume valid if network fails
@@ -40,14 +36,21 @@ def is_valid_symbol(symbol):
 # -----------------------------------------------------
 # Helper: Validate user input
 # -----------------------------------------------------
-def validate_args(args):
+def parse_args(args):
+    """
+    Local checks only, so a bad invocation exits before any network work.
+    """
     if len(args) < 4:
         print("Usage: python market_orders.py <symbol> <BUY/SELL> <quantity>")
         sys.exit(1)
 
     symbol = args[1].upper()
     side = args[2].upper()
-    quantity = float(args[3])
+    try:
+        quantity = float(args[3])
+    except ValueError:
+        print("❌ Quantity must be a number.")
+        sys.exit(1)
 
     # Validate side
     if side not in ["BUY", "SELL"]:
@@ -59,18 +62,26 @@ def validate_args(args):
         print("❌ Quantity must be greater than 0.")
         sys.exit(1)
 
+    return symbol, side, quantity
+
+
+def validate_args(args):
+    symbol, side, quantity = parse_args(args)
+
     # Validate symbol
     if not is_valid_symbol(symbol):
         print(f"❌ Invalid trading symbol: {symbol}")
         sys.exit(1)
 
-    # Validate notional value (quantity * price >= 100)
+    # Validate notional value (quantity * price >= min notional)
     try:
         ticker = client.ticker_price(symbol)
         price = float(ticker["price"])
         notional = price * quantity
-        if notional < 100:
-            print(f"❌ Order notional ({notional:.2f} USDT) is below the minimum required (100 USDT).")
+        filters = get_symbol_filters(client, symbol)
+        min_notional = filters["min_notional"] if filters else 100.0
+        if notional < min_notional:
+            print(f"❌ Order notional ({notional:.2f} USDT) is below the minimum required ({min_notional:.2f} USDT).")
             sys.exit(1)
     except Exception as e:
         print(f"⚠️ Could not fetch current price for notional check: {e}")
@@ -105,5 +116,16 @@ def place_market_order(symbol, side, quantity):
 # Entry point
 # -----------------------------------------------------
 if __name__ == "__main__":
-    symbol, side, quantity = validate_args(sys.argv)
+    args = sys.argv[:]
+    paper = paper_flag(args)
+    profile = profile_flag(args)
+    parse_args(args)
+    client = create_client()
+    if paper:
+        client = PaperExchange(client).start()
+    start_risk(client, follow=False)  # loads exposure in the background while we validate
+    if profile:
+        start_profiling("market_orders", client)
+    with span("validate"):
+        symbol, side, quantity = validate_args(args)
     place_market_order(symbol, side, quantity)
@@ -0,0 +1,167 @@
+import os
+import time
+import threading
+from collections import deque
+
+# -----------------------------------------------------
+# In-process metrics registry
+# -----------------------------------------------------
+# Strategies, the client and the feeds report into one registry that the
+# dashboard reads a few times a second. Writes on the order path are a
+# deque append or an attribute set; anything that can be read on demand
+# (rate-limit buckets, feed ages, sentiment inputs) is not pushed at all:
+# the object registers itself with watch() and is read at render time.
+LATENCY_WINDOW = int(os.getenv("METRICS_LATENCY_WINDOW", "1024"))   # samples kept per series
+EVENT_LINES = 500
+
+
+class StrategyStats:
+    """
+    Progress of one strategy run: done / target units (slices, levels),
+    orders sent, orders filled and filled quantity. Strategies update it
+    as they go; the dashboard only reads it.
+    """
+
+    def __init__(self, name, kind, symbol, target=0, unit=""):
+        self.name = name
+        self.kind = kind
+        self.symbol = symbol
+        self.target = target
+        self.unit = unit
+        self.done = 0
+        self.sent = 0
+        self.filled = 0
+        self.filled_qty = 0.0
+        self.status = "running"
+        self.started = time.time()
+        self.updated = self.started
+
+    def step(self, done=None, **fields):
+        if done is not None:
+            self.done = done
+        for key, value in fields.items():
+            setattr(self, key, value)
+        self.updated = time.time()
+
+    def on_order(self, order):
+        """
+        Counts an accepted order; market orders come back filled, resting
+        ones count as filled later through on_fill().
+        """
+        self.sent += 1
+        executed = float(order.get("executedQty") or 0) if order else 0.0
+        if executed > 0:
+            self.filled += 1
+            self.filled_qty += executed
+        self.updated = time.time()
+
+    def on_fill(self, qty=0.0, orders=1):
+        self.filled += orders
+        self.filled_qty += qty
+        self.updated = time.time()
+
+    def finish(self, status="done"):
+        self.step(status=status)
+
+    def fill_rate(self):
+        return self.filled / self.sent if self.sent else None
+
+
+class MetricsRegistry:
+    def __init__(self, latency_window=LATENCY_WINDOW):
+        self.latency_window = latency_window
+        self.started = time.time()
+        self.strategies = {}   # name -> StrategyStats
+        self.latencies = {}    # series -> deque of seconds
+        self.counters = {}
+        self.sources = {}      # kind -> [object read at render time]
+        self.events = deque(maxlen=EVENT_LINES)
+        self.lock = threading.Lock()
+
+    # -------------------------------------------------
+    # Writers
+    # -------------------------------------------------
+    def strategy(self, name, kind, symbol, target=0, unit=""):
+        """
+        Starts (or restarts) tracking a strategy run and returns its stats.
+        """
+        stats = StrategyStats(name, kind, symbol, target, unit)
+        self.strategies[name] = stats
+        return stats
+
+    def observe(self, series, seconds):
+        samples = self.latencies.get(series)
+        if samples is None:
+            samples = self.latencies.setdefault(series, deque(maxlen=self.latency_window))
+        samples.append(seconds)
+
+    def incr(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def event(self, line):
+        self.events.append((time.time(), line))
+
+    def watch(self, kind, source):
+        """
+        Registers an object the dashboard reads when it draws: "limiter"
+        (name, RateLimiter), "feed" (PriceFeed) or "sentiment" (SentimentEngine).
+        """
+        with self.lock:
+            self.sources.setdefault(kind, []).append(source)
+
+    def unwatch(self, kind, source):
+        with self.lock:
+            sources = self.sources.get(kind, [])
+            if source in sources:
+                sources.remove(source)
+
+    # -------------------------------------------------
+    # Readers
+    # -------------------------------------------------
+    def watched(self, kind):
+        with self.lock:
+            return list(self.sources.get(kind, ()))
+
+    def percentiles(self, series, points=(50, 90, 99)):
+        """
+        (count, {point: seconds}, max seconds) over the last latency_window
+        samples of series, or None if there are none.
+        """
+        samples = sorted(self.latencies.get(series, ()))
+        if not samples:
+            return None
+        last = len(samples) - 1
+        return len(samples), {p: samples[min(last, int(round(p / 100 * last)))] for p in points}, samples[-1]
+
+
+def time_client(client, registry=None):
+    """
+    Wraps the client's network methods so each call's latency is recorded
+    under its phase (submit, query, price_fetch, exchange_info), with
+    <phase>.calls and <phase>.errors counters.
+    """
+    from profiling import CLIENT_PHASES
+
+    registry = registry or METRICS
+    for method, phase in CLIENT_PHASES.items():
+        original = getattr(client, method, None)
+        if original is None:
+            continue
+
+        def timed(*args, _original=original, _phase=phase, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _original(*args, **kwargs)
+            except Exception:
+                registry.incr(_phase + ".errors")
+                raise
+            finally:
+                registry.observe(_phase, time.perf_counter() - start)
+                registry.incr(_phase + ".calls")
+
+        setattr(client, method, timed)
+    return client
+
+
+METRICS = MetricsRegistry()
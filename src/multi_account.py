@@ -0,0 +1,319 @@
+import sys
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from binance.um_futures import UMFutures
+from dotenv import load_dotenv
+import os
+
+from rate_limiter import RateLimiter
+from exchange_cache import get_symbol_filters, round_to_step
+from time_sync import TimeSync
+from risk import RiskManager
+from order_submit import submit_order, client_order_id, OrderUnknownError
+from paper import PaperExchange, paper_flag
+from profiling import profile_flag, start_profiling, instrument_client, span
+from shutdown import shutdown, flush_logs
+
+# -----------------------------------------------------
+# Setup
+# -----------------------------------------------------
+load_dotenv()
+
+BASE_URL = os.getenv("BASE_URL", "https://testnet.binancefuture.com")
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LOG_FILE = os.path.join(PROJECT_ROOT, "bot.log")
+
+logging.basicConfig(
+    filename=LOG_FILE,
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+POOL_SIZE = 4  # HTTP connections kept alive per account
+
+# -----------------------------------------------------
+# Account profiles
+# -----------------------------------------------------
+class Account:
+    """
+    One credential profile with its own pooled HTTP session and its own
+    order rate budget (Binance order limits are per account).
+    """
+
+    def __init__(self, name, key, secret, weight=1.0, base_url=BASE_URL):
+        self.name = name
+        self.weight = weight
+        self.client = UMFutures(key=key, secret=secret, base_url=base_url)
+        self._mount_pool(self.client.session)
+        self.limiter = RateLimiter(rate=18, burst=50)
+        self.risk = None
+
+    def start_risk(self):
+        # Limits apply per account, so each gets its own cache
+        self.risk = RiskManager(self.client).start().install()
+        return self
+
+    @staticmethod
+    def _mount_pool(session):
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    def new_order(self, client_id, **params):
+        self.limiter.acquire()
+        return submit_order(self.client, client_id, **params)
+
+
+def load_accounts():
+    """
+    Reads profiles from the environment:
+      ACCOUNTS=main,sub1
+      MAIN_API_KEY=...  MAIN_API_SECRET=...  MAIN_WEIGHT=2
+      SUB1_API_KEY=...  SUB1_API_SECRET=...  (weight defaults to 1)
+    Falls back to the single API_KEY/API_SECRET pair when ACCOUNTS is unset.
+    """
+    names = [n.strip() for n in os.getenv("ACCOUNTS", "").split(",") if n.strip()]
+    if not names:
+        return [Account("default", os.getenv("API_KEY"), os.getenv("API_SECRET"))]
+
+    accounts = []
+    for name in names:
+        prefix = name.upper()
+        key = os.getenv(f"{prefix}_API_KEY")
+        secret = os.getenv(f"{prefix}_API_SECRET")
+        if not key or not secret:
+            print(f"⚠️ Skipping account {name}: {prefix}_API_KEY / {prefix}_API_SECRET not set.")
+            continue
+        weight = float(os.getenv(f"{prefix}_WEIGHT", "1"))
+        if weight <= 0:
+            continue
+        accounts.append(Account(name, key, secret, weight))
+    return accounts
+
+
+def start_time_sync(accounts):
+    """
+    One clock estimate serves every account (same exchange clock); each
+    client gets the adaptive recvWindow and -1021 retry.
+    """
+    try:
+        sync = TimeSync(accounts[0].client).start()
+        for account in accounts:
+            sync.install(account.client)
+        return sync
+    except Exception as e:
+        print(f"⚠️ Could not start time sync: {e}")
+        return None
+
+# -----------------------------------------------------
+# Helper: Split an intent across accounts
+# -----------------------------------------------------
+def split_by_weight(total_qty, weights, step):
+    """
+    Splits total_qty into lot-step multiples proportional to weights.
+    Leftover steps go to the largest fractional remainders, so the parts
+    always add up to the (step-rounded) total.
+    """
+    units = int(round(round_to_step(total_qty, step) / step))
+    total_weight = sum(weights)
+    exact = [units * w / total_weight for w in weights]
+    parts = [int(e) for e in exact]
+    by_remainder = sorted(range(len(weights)), key=lambda i: exact[i] - parts[i], reverse=True)
+    for i in by_remainder[:units - sum(parts)]:
+        parts[i] += 1
+    return [round_to_step(p * step, step) for p in parts]
+
+# -----------------------------------------------------
+# Per-account execution
+# -----------------------------------------------------
+def run_market(account, symbol, side, quantity, run_id):
+    client_id = client_order_id("multi", run_id, account.name, symbol, side)
+    order = account.new_order(client_id, symbol=symbol, side=side, type="MARKET", quantity=quantity)
+    return [order]
+
+
+def run_limit(account, symbol, side, quantity, price, run_id):
+    client_id = client_order_id("multi", run_id, account.name, symbol, side)
+    order = account.new_order(client_id, symbol=symbol, side=side, type="LIMIT", timeInForce="GTC",
+                              quantity=quantity, price=price)
+    return [order]
+
+
+def run_twap(account, symbol, side, quantity, num_slices, interval, step, run_id):
+    """
+    Slices this account's share on a fixed clock; the last slice takes the
+    remainder so the account's total is exact. A failed slice is recorded
+    as {"slice", "error"} and the run carries on; its quantity rolls into
+    the last slice, unless the slice may have executed (status unknown).
+    A graceful shutdown stops it between slices.
+    """
+    chunk = round_to_step(quantity / num_slices, step)
+    orders = []
+    sent = 0.0
+    done = 0
+    start = time.time()
+    for i in range(1, num_slices + 1):
+        if shutdown.requested.is_set():
+            break
+        done = i
+        qty = round_to_step(quantity - sent, step) if i == num_slices else chunk
+        if qty > 0:
+            client_id = client_order_id("multi", run_id, account.name, symbol, side, i)
+            try:
+                orders.append(account.new_order(client_id, symbol=symbol, side=side, type="MARKET", quantity=qty))
+                sent = round_to_step(sent + qty, step)
+                msg = f"✅ [{account.name}] slice {i}/{num_slices}: {side} {qty} {symbol}"
+                print(msg)
+                logging.info(msg)
+            except Exception as e:
+                if isinstance(e, OrderUnknownError):
+                    sent = round_to_step(sent + qty, step)   # may have filled: never sent again
+                orders.append({"slice": i, "error": str(e)})
+                err = f"❌ [{account.name}] slice {i}/{num_slices} failed: {e}"
+                print(err)
+                logging.error(err)
+        if i < num_slices and shutdown.sleep(max(0.0, start + i * interval - time.time())):
+            break
+    if shutdown.requested.is_set() and (done < num_slices or sent < quantity):
+        # Market slices fill on arrival, so there is nothing working to cancel
+        msg = f"🛑 [{account.name}] TWAP stopped after {done}/{num_slices} slices: {sent:g} of {quantity:g} {symbol} sent."
+        print(msg)
+        logging.warning(msg)
+    return orders
+
+
+def execute(accounts, symbol, side, total_qty, strategy, params):
+    """
+    Fans one order intent out across accounts in parallel. Each account
+    runs on its own thread with its own client and limiter.
+    """
+    filters = get_symbol_filters(accounts[0].client, symbol)
+    step = filters["step_size"] if filters else 0.001
+    shares = split_by_weight(total_qty, [a.weight for a in accounts], step)
+
+    print(f"\n🚀 {strategy.upper()} {side} {total_qty} {symbol} across {len(accounts)} accounts")
+    for account, qty in zip(accounts, shares):
+        print(f"   {account.name}: {qty} (weight {account.weight})")
+    logging.info(f"Multi-account {strategy} {side} {total_qty} {symbol}: "
+                 + ", ".join(f"{a.name}={q}" for a, q in zip(accounts, shares)))
+
+    run_id = int(time.time() * 1000)
+
+    def run(account, qty):
+        if qty <= 0:
+            return []
+        if strategy == "market":
+            return run_market(account, symbol, side, qty, run_id)
+        if strategy == "limit":
+            return run_limit(account, symbol, side, qty, params["price"], run_id)
+        return run_twap(account, symbol, side, qty, params["slices"], params["interval"], step, run_id)
+
+    results = {}
+    failed_slices = 0
+    with ThreadPoolExecutor(max_workers=len(accounts)) as pool:
+        jobs = {account.name: pool.submit(run, account, qty) for account, qty in zip(accounts, shares)}
+        for name, job in jobs.items():
+            try:
+                results[name] = job.result()
+                failures = [r for r in results[name] if "error" in r]
+                failed_slices += len(failures)
+                if failures:
+                    err = (f"⚠️ [{name}] done: {len(results[name]) - len(failures)} orders, "
+                           f"{len(failures)} slices failed ({', '.join(str(f['slice']) for f in failures)})")
+                    print(err)
+                    logging.warning(err)
+                else:
+                    msg = f"✅ [{name}] done: {len(results[name])} orders"
+                    print(msg)
+                    logging.info(msg)
+            except Exception as e:
+                results[name] = e
+                err = f"❌ [{name}] failed: {e}"
+                print(err)
+                logging.error(err)
+
+    ok = sum(1 for r in results.values() if not isinstance(r, Exception) and not any("error" in o for o in r))
+    summary = f"{ok}/{len(accounts)} accounts succeeded"
+    if failed_slices:
+        summary += f", {failed_slices} slices failed"
+    if shutdown.requested.is_set():
+        summary += ", stopped early"
+    print(f"\n🎯 Multi-account execution finished: {summary}.")
+    logging.info(f"Multi-account execution finished: {summary}")
+    return results
+
+# -----------------------------------------------------
+# Helper: Validate user input
+# -----------------------------------------------------
+def validate_args(args):
+    usage = ("Usage: python multi_account.py <symbol> <BUY/SELL> <total_qty> market\n"
+             "       python multi_account.py <symbol> <BUY/SELL> <total_qty> limit <price>\n"
+             "       python multi_account.py <symbol> <BUY/SELL> <total_qty> twap <num_slices> <interval_sec>")
+    if len(args) < 5:
+        print(usage)
+        sys.exit(1)
+
+    symbol = args[1].upper()
+    side = args[2].upper()
+    strategy = args[4].lower()
+
+    if side not in ["BUY", "SELL"]:
+        print("❌ Invalid side. Use BUY or SELL.")
+        sys.exit(1)
+
+    try:
+        total_qty = float(args[3])
+        params = {}
+        if strategy == "limit":
+            params["price"] = float(args[5])
+        elif strategy == "twap":
+            params["slices"] = int(args[5])
+            params["interval"] = int(args[6])
+        elif strategy != "market":
+            print(usage)
+            sys.exit(1)
+    except (ValueError, IndexError):
+        print(usage)
+        sys.exit(1)
+
+    if total_qty <= 0 or params.get("price", 1) <= 0 or params.get("slices", 1) <= 0 or params.get("interval", 0) < 0:
+        print("❌ Quantity, price and slices must be greater than 0.")
+        sys.exit(1)
+
+    return symbol, side, total_qty, strategy, params
+
+# -----------------------------------------------------
+# Entry point
+# -----------------------------------------------------
+if __name__ == "__main__":
+    args = sys.argv[:]
+    paper = paper_flag(args)
+    profile = profile_flag(args)
+    if profile:
+        start_profiling("multi_account")
+    with span("validate"):
+        symbol, side, total_qty, strategy, params = validate_args(args)
+    accounts = load_accounts()
+    if not accounts:
+        print("❌ No account profiles configured.")
+        sys.exit(1)
+    if paper:
+        from price_feed import PriceFeed
+
+        feed = PriceFeed()
+        feed.start([symbol])
+        for account in accounts:
+            account.client = PaperExchange(account.client, feed).start()
+    else:
+        start_time_sync(accounts)
+    for account in accounts:
+        account.start_risk()
+        if profile:
+            instrument_client(account.client)
+    shutdown.install()
+    execute(accounts, symbol, side, total_qty, strategy, params)
+    flush_logs()
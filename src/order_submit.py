@@ -0,0 +1,152 @@
+import time
+import random
+import hashlib
+import logging
+
+from exchange_cache import note_rejection
+
+# -----------------------------------------------------
+# Idempotent order submission
+# -----------------------------------------------------
+# Every order carries a newClientOrderId derived from what it is (strategy
+# run, symbol, side, slice). The exchange only rejects a duplicate id while
+# the first order is still open, so after a failure whose outcome is
+# unknown the order is looked up by that id, and never resent until the
+# lookup succeeds and says it does not exist.
+MAX_ATTEMPTS = 4
+BASE_DELAY = 0.25   # seconds, doubled per attempt
+MAX_DELAY = 4.0
+
+RETRYABLE_CODES = {-1003, -1015, -1001}    # rate limited / disconnected: not executed, resend
+AMBIGUOUS_CODES = {-1007, -1006}           # backend timeout / unexpected response: status unknown
+DUPLICATE_ID_CODE = -4116                  # clientOrderId already used
+ORDER_NOT_FOUND_CODE = -2013
+MAX_LOOKUPS = 6     # attempts to learn an ambiguous order's fate before giving up
+
+
+class OrderUnknownError(Exception):
+    """
+    The order may or may not exist: it was sent, the response was lost and
+    the exchange could not be asked. It must not be resent blindly.
+    """
+
+    def __init__(self, client_id, error):
+        super().__init__(f"order {client_id} status unknown (lookup failed: {error})")
+        self.client_id = client_id
+        self.error = error
+
+
+def client_order_id(*parts):
+    """
+    Deterministic id (<= 36 chars, exchange charset) for the given parts,
+    e.g. client_order_id("twap", run_id, "BTCUSDT", "BUY", 3).
+    """
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:24]
+    return f"{str(parts[0])[:8]}-{digest}" if parts else digest
+
+
+def _backoff(attempt):
+    # Full jitter: spreads retries from many slices/accounts apart
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+
+
+def _classify(error):
+    """
+    Returns "retry" (request was not executed), "ambiguous" (it may have
+    been), "duplicate" or "fatal".
+    """
+    from binance.error import ClientError, ServerError
+
+    if isinstance(error, ServerError):
+        return "ambiguous"
+    if isinstance(error, ClientError):
+        if error.error_code == DUPLICATE_ID_CODE:
+            return "duplicate"
+        if error.error_code in AMBIGUOUS_CODES:
+            return "ambiguous"
+        if error.error_code in RETRYABLE_CODES or error.status_code in (418, 429):
+            return "retry"
+        return "fatal"
+    if isinstance(error, TimeoutError):
+        return "ambiguous"  # websocket request sent but unanswered
+    import requests
+
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return "retry"  # never reached the exchange
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return "ambiguous"
+    return "fatal"
+
+
+def is_ambiguous(error):
+    """
+    True if the request may have been executed although it failed.
+    """
+    return _classify(error) == "ambiguous"
+
+
+def find_order(client, symbol, client_id):
+    """
+    The order with this clientOrderId, or None if the exchange never saw it.
+    """
+    from binance.error import ClientError
+
+    try:
+        return client.query_order(symbol=symbol, origClientOrderId=client_id)
+    except ClientError as e:
+        if e.error_code == ORDER_NOT_FOUND_CODE:
+            return None
+        raise
+
+
+def lookup_order(client, symbol, client_id, attempts=MAX_LOOKUPS):
+    """
+    find_order() retried with jittered backoff. Raises OrderUnknownError
+    when every attempt fails, since only a successful lookup can say the
+    order does not exist.
+    """
+    error = None
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(_backoff(attempt))
+        try:
+            return find_order(client, symbol, client_id)
+        except Exception as e:
+            error = e
+            logging.warning(f"Could not look up order {client_id} (attempt {attempt + 1}/{attempts}): {e}")
+    raise OrderUnknownError(client_id, error)
+
+
+def submit_order(client, client_id, max_attempts=MAX_ATTEMPTS, **params):
+    """
+    Sends new_order with newClientOrderId=client_id, retrying with bounded
+    jittered backoff. After an ambiguous failure (timeout, 5xx) the order is
+    looked up by client_id, and resent only once a lookup has found it
+    missing: the exchange only rejects ids that are still open, so a filled
+    slice resent under the same id would fill twice. Raises
+    OrderUnknownError if the lookups fail, otherwise the last error when
+    attempts run out or the exchange rejects the order outright.
+    """
+    params["newClientOrderId"] = client_id
+    last_error = None
+    for attempt in range(max_attempts):
+        if last_error is not None:
+            time.sleep(_backoff(attempt))
+        try:
+            return client.new_order(**params)
+        except Exception as e:
+            kind = _classify(e)
+            last_error = e
+            if kind == "fatal":
+                note_rejection(getattr(e, "error_code", None))
+                raise
+            logging.warning(f"Order {client_id} attempt {attempt + 1} failed ({kind}): {e}")
+            if kind == "retry":
+                continue
+
+        # Duplicate or ambiguous: the order may exist, look before resending
+        existing = lookup_order(client, params["symbol"], client_id)
+        if existing is not None:
+            logging.info(f"Order {client_id} was accepted despite the error; not resending.")
+            return existing
+    raise last_error
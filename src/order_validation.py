@@ -0,0 +1,188 @@
+import logging
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+
+from exchange_cache import get_exchange_info, get_symbol_filters, round_to_step
+
+# -----------------------------------------------------
+# Batch pre-trade validation
+# -----------------------------------------------------
+# Orders are plain dicts, the same shape the scripts pass to new_order():
+#   {"symbol": "BTCUSDT", "side": "BUY", "type": "LIMIT", "quantity": 0.002, "price": 105000}
+# Supported types: MARKET, LIMIT, STOP (stop-limit, needs stopPrice), STOP_MARKET
+# and OCO (needs takeProfit / stopLoss).
+MAX_WORKERS = 8
+
+
+def _is_multiple(value, step):
+    return Decimal(str(value)) % Decimal(str(step)) == 0
+
+
+def fetch_market_data(client, symbols):
+    """
+    Fetches exchange filters, last prices and mark prices for all symbols
+    concurrently, once per batch. Returns {"filters", "prices", "marks"}.
+    """
+    def last_price(symbol):
+        return symbol, float(client.ticker_price(symbol)["price"])
+
+    def mark_price(symbol):
+        return symbol, float(client.mark_price(symbol)["markPrice"])
+
+    prices, marks = {}, {}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        info_job = pool.submit(get_exchange_info, client)
+        price_jobs = [pool.submit(last_price, s) for s in symbols]
+        mark_jobs = [pool.submit(mark_price, s) for s in symbols]
+
+        for jobs, target, label in ((price_jobs, prices, "price"), (mark_jobs, marks, "mark price")):
+            for job in jobs:
+                try:
+                    symbol, value = job.result()
+                    target[symbol] = value
+                except Exception as e:
+                    print(f"⚠️ Could not fetch {label}: {e}")
+        try:
+            info_job.result()
+        except Exception as e:
+            print(f"⚠️ Could not fetch exchange info: {e}")
+
+    filters = {}
+    for symbol in symbols:
+        try:
+            filters[symbol] = get_symbol_filters(client, symbol)
+        except Exception:
+            pass  # exchange info unavailable: skip filter checks, as the scripts do
+    return {"filters": filters, "prices": prices, "marks": marks}
+
+
+def _check_order(order, filters, price_now, mark):
+    """
+    Returns a list of (check, message) violations for a single order.
+    """
+    problems = []
+    side = order.get("side")
+    kind = order.get("type", "MARKET")
+    quantity = float(order.get("quantity", 0))
+    price = order.get("price")
+    stop_price = order.get("stopPrice")
+
+    if side not in ("BUY", "SELL"):
+        problems.append(("side", f"Invalid side {side}. Use BUY or SELL."))
+    if quantity <= 0:
+        problems.append(("quantity", "Quantity must be greater than 0."))
+        return problems
+
+    # Step size / lot limits
+    if filters:
+        if not _is_multiple(quantity, filters["step_size"]):
+            problems.append(("step", f"Quantity {quantity} is not a multiple of step size {filters['step_size']}."))
+        if quantity < filters["min_qty"]:
+            problems.append(("step", f"Quantity {quantity} is below minimum {filters['min_qty']}."))
+        if filters["max_qty"] and quantity > filters["max_qty"]:
+            problems.append(("step", f"Quantity {quantity} is above maximum {filters['max_qty']}."))
+
+    # Tick size / price band for every price the order carries
+    order_prices = [p for p in (price, stop_price, order.get("takeProfit"), order.get("stopLoss")) if p is not None]
+    for p in order_prices:
+        p = float(p)
+        if p <= 0:
+            problems.append(("price", "Prices must be greater than 0."))
+            continue
+        if filters and not _is_multiple(p, filters["tick_size"]):
+            problems.append(("tick", f"Price {p} is not a multiple of tick size {filters['tick_size']}."))
+
+    if price is not None and mark and filters and filters["multiplier_up"]:
+        upper = mark * filters["multiplier_up"]
+        lower = mark * filters["multiplier_down"]
+        if float(price) > upper:
+            problems.append(("price_band", f"Limit price {price} is above the allowed band ({upper:.2f})."))
+        if float(price) < lower:
+            problems.append(("price_band", f"Limit price {price} is below the allowed band ({lower:.2f})."))
+
+    # Notional
+    ref_price = float(price) if price is not None else price_now
+    if ref_price and filters:
+        notional = ref_price * quantity
+        if notional < filters["min_notional"]:
+            problems.append(("notional", f"Order notional ({notional:.2f}) is below the minimum required ({filters['min_notional']:.2f} USDT)."))
+
+    # Side / price relationships against the current market
+    if price_now:
+        if kind == "LIMIT" and price is not None:
+            if side == "BUY" and float(price) >= price_now:
+                problems.append(("side_price", f"BUY limit {price} must be BELOW current price ({price_now:.2f})."))
+            if side == "SELL" and float(price) <= price_now:
+                problems.append(("side_price", f"SELL limit {price} must be ABOVE current price ({price_now:.2f})."))
+        elif kind in ("STOP", "STOP_MARKET") and stop_price is not None:
+            stop_price = float(stop_price)
+            if side == "BUY" and stop_price <= price_now:
+                problems.append(("side_price", f"BUY stop {stop_price} must be ABOVE current price ({price_now:.2f})."))
+            if side == "SELL" and stop_price >= price_now:
+                problems.append(("side_price", f"SELL stop {stop_price} must be BELOW current price ({price_now:.2f})."))
+            if kind == "STOP" and price is not None:
+                if side == "BUY" and float(price) < stop_price:
+                    problems.append(("side_price", "For BUY stop-limit, limit price should be >= stop price."))
+                if side == "SELL" and float(price) > stop_price:
+                    problems.append(("side_price", "For SELL stop-limit, limit price should be <= stop price."))
+        elif kind == "OCO":
+            take_profit = float(order["takeProfit"])
+            stop_loss = float(order["stopLoss"])
+            if side == "SELL" and not take_profit > price_now > stop_loss:
+                problems.append(("side_price", f"For SELL OCO, expected takeProfit > {price_now:.2f} > stopLoss."))
+            if side == "BUY" and not take_profit < price_now < stop_loss:
+                problems.append(("side_price", f"For BUY OCO, expected takeProfit < {price_now:.2f} < stopLoss."))
+
+    return problems
+
+
+def validate_orders(client, orders, market=None):
+    """
+    Validates a whole batch of proposed orders (a grid ladder, all TWAP
+    slices, a bulk file) in one pass. Market data is fetched concurrently
+    once per batch; every violation is returned instead of stopping at the
+    first one.
+
+    Pass market (from fetch_market_data) to reuse data already fetched.
+    Returns a list of {"index", "symbol", "check", "message"} dicts,
+    empty when every order passes.
+    """
+    if market is None:
+        market = fetch_market_data(client, sorted({o["symbol"] for o in orders}))
+    filters, prices, marks = market["filters"], market["prices"], market["marks"]
+
+    violations = []
+    for index, order in enumerate(orders):
+        symbol = order["symbol"]
+        symbol_filters = filters.get(symbol)
+        if symbol_filters is None and symbol in filters:
+            violations.append({"index": index, "symbol": symbol, "check": "symbol", "message": f"Invalid trading symbol: {symbol}"})
+            continue
+        for check, message in _check_order(order, symbol_filters, prices.get(symbol), marks.get(symbol)):
+            violations.append({"index": index, "symbol": symbol, "check": check, "message": message})
+
+    if violations:
+        logging.warning(f"Pre-trade validation found {len(violations)} violations in {len(orders)} orders")
+    return violations
+
+
+def twap_slices(symbol, side, total_qty, num_slices, filters):
+    """
+    The market slices a TWAP sends: equal lot-step chunks, with the last
+    slice taking the remainder so the total is exact. Validate these, not
+    the unrounded chunk, since the remainder slice can be the one that
+    falls below the minimum notional.
+    """
+    step = filters["step_size"] if filters else 0.000001
+    chunk = round_to_step(round(total_qty / num_slices, 10), step)
+    quantities = [chunk] * (num_slices - 1)
+    quantities.append(round_to_step(round(total_qty - chunk * (num_slices - 1), 10), step))
+    return [{"symbol": symbol, "side": side, "type": "MARKET", "quantity": q} for q in quantities]
+
+
+def print_violations(violations, limit=20):
+    print(f"❌ {len(violations)} pre-trade violations found:")
+    for v in violations[:limit]:
+        print(f"   [{v['index'] + 1}] {v['symbol']} {v['check']}: {v['message']}")
+    if len(violations) > limit:
+        print(f"   ... and {len(violations) - limit} more.")
@@ -0,0 +1,441 @@
+import os
+import time
+import heapq
+import atexit
+import logging
+import threading
+
+from records import OrderRecord, FillHistory
+from shutdown import shutdown
+
+# -----------------------------------------------------
+# Paper trading: in-process matching engine
+# -----------------------------------------------------
+# PaperExchange stands in for UMFutures. Order endpoints are served by a
+# local engine; everything else (exchange_info, klines, ...) is delegated to
+# the real client, whose public endpoints need no keys.
+#
+# Resting orders sit in per-symbol heaps, so matching is price-time
+# priority: bids by (-price, seq), asks by (price, seq), buy stops by
+# (stopPrice, seq), sell stops by (-stopPrice, seq). Every price tick
+# triggers stops, then fills resting limits the price has crossed, at
+# the limit price. Fills are all-or-nothing; the engine has no depth.
+MAKER_FEE = float(os.getenv("PAPER_MAKER_FEE", "0.0002"))
+TAKER_FEE = float(os.getenv("PAPER_TAKER_FEE", "0.0005"))
+SUPPORTED_TYPES = ("MARKET", "LIMIT", "STOP", "STOP_MARKET")
+FINAL_STATUSES = ("FILLED", "CANCELED", "EXPIRED")
+
+
+def _error(code, message):
+    from binance.error import ClientError
+
+    return ClientError(400, code, message, {})
+
+
+class SymbolBook:
+    def __init__(self):
+        self.bids = []
+        self.asks = []
+        self.buy_stops = []
+        self.sell_stops = []
+
+
+class Position:
+    def __init__(self):
+        self.qty = 0.0
+        self.entry = 0.0
+        self.realized = 0.0
+        self.fees = 0.0
+
+    def apply(self, side, qty, price):
+        signed = qty if side == "BUY" else -qty
+        realized = 0.0
+        if self.qty and (self.qty > 0) != (signed > 0):
+            closed = min(abs(self.qty), qty)
+            realized = closed * (price - self.entry) * (1 if self.qty > 0 else -1)
+            self.realized += realized
+        new_qty = round(self.qty + signed, 10)
+        if new_qty == 0:
+            self.entry = 0.0
+        elif self.qty == 0 or (self.qty > 0) != (new_qty > 0):
+            self.entry = price                   # opened, or flipped through zero
+        elif (self.qty > 0) == (signed > 0):
+            self.entry = (self.entry * abs(self.qty) + price * qty) / abs(new_qty)
+        self.qty = new_qty
+        return realized
+
+
+class PaperExchange:
+    """
+    Drop-in replacement for the UMFutures client in --paper mode:
+      client = PaperExchange(client).start()
+    Prices come from a live PriceFeed (subscribed per symbol on first use),
+    or from replay() / on_price() for deterministic runs.
+    """
+
+    def __init__(self, client, feed=None):
+        self.client = client
+        self.feed = feed
+        self.books = {}
+        self.orders = {}          # orderId -> order dict while open, OrderRecord once final
+        self.by_client_id = {}
+        self.positions = {}
+        self.trades = FillHistory()
+        self.prices = {}
+        self.seq = 0
+        self.next_id = 1
+        self.streams = []          # started PaperUserStreams
+        self.lock = threading.RLock()
+
+    def __getattr__(self, name):
+        # Market-data endpoints go to the real exchange
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def start(self, symbols=(), live=True):
+        if live and self.feed is None:
+            from price_feed import PriceFeed
+
+            self.feed = PriceFeed()
+            self.feed.start(symbols)
+        if self.feed is not None:
+            self.feed.add_listener(self.on_price)
+        atexit.register(self.print_summary)
+        print("🧪 Paper trading: orders are matched locally, nothing is sent to the exchange.")
+        logging.info("Paper trading mode enabled")
+        return self
+
+    def stop(self):
+        if self.feed is not None:
+            self.feed.stop()
+
+    def hold(self):
+        """
+        Keeps the process alive so resting paper orders can fill against
+        the live feed, until Ctrl-C.
+        """
+        if not any(o["status"] not in FINAL_STATUSES for o in self.orders.values()):
+            return
+        print("🧪 Holding paper orders against the live price feed (Ctrl-C to stop)...")
+        try:
+            while not shutdown.sleep(1):
+                pass
+        except KeyboardInterrupt:
+            pass
+
+    # -------------------------------------------------
+    # Prices
+    # -------------------------------------------------
+    def last_price(self, symbol):
+        price = self.prices.get(symbol)
+        if price is None:
+            if self.feed is not None and self.feed.ws is not None:
+                self.feed.subscribe([symbol])
+            price = float(self.client.ticker_price(symbol)["price"])
+            self.prices[symbol] = price
+        return price
+
+    def ticker_price(self, symbol=None, **kwargs):
+        if symbol is None:
+            return self.client.ticker_price(**kwargs)
+        return {"symbol": symbol, "price": str(self.last_price(symbol)), "time": int(time.time() * 1000)}
+
+    def replay(self, symbol, days, speed=0.0):
+        """
+        Feeds stored aggTrades (see market_data.py) through the engine in
+        event order. speed=0 replays as fast as possible, 1.0 in real time.
+        """
+        from data_store import load_range
+
+        cols = load_range("aggtrades", symbol, days)
+        prev = None
+        for price, ts in zip(cols["price"], cols["time"]):
+            if speed and prev is not None:
+                time.sleep(max(0.0, (ts - prev) / 1000 / speed))
+            prev = ts
+            self.on_price(symbol, float(price), int(ts))
+
+    # -------------------------------------------------
+    # Matching
+    # -------------------------------------------------
+    def _book(self, symbol):
+        if symbol not in self.books:
+            self.books[symbol] = SymbolBook()
+        return self.books[symbol]
+
+    def _is_open(self, order_id):
+        order = self.orders.get(order_id)
+        return order is not None and order["status"] not in FINAL_STATUSES
+
+    def on_price(self, symbol, price, event_time=None):
+        with self.lock:
+            self.prices[symbol] = price
+            book = self.books.get(symbol)
+            if book is None:
+                return
+            while book.buy_stops and (not self._is_open(book.buy_stops[0][2]) or book.buy_stops[0][0] <= price):
+                _, _, oid = heapq.heappop(book.buy_stops)
+                if self._is_open(oid):
+                    self._trigger(self.orders[oid], price)
+            while book.sell_stops and (not self._is_open(book.sell_stops[0][2]) or -book.sell_stops[0][0] >= price):
+                _, _, oid = heapq.heappop(book.sell_stops)
+                if self._is_open(oid):
+                    self._trigger(self.orders[oid], price)
+            while book.bids and (not self._is_open(book.bids[0][2]) or -book.bids[0][0] >= price):
+                key, _, oid = heapq.heappop(book.bids)
+                if self._is_open(oid):
+                    self._fill(self.orders[oid], -key, maker=True)
+            while book.asks and (not self._is_open(book.asks[0][2]) or book.asks[0][0] <= price):
+                key, _, oid = heapq.heappop(book.asks)
+                if self._is_open(oid):
+                    self._fill(self.orders[oid], key, maker=True)
+
+    def _archive(self, order, last_qty=0.0, last_price=0.0):
+        # Final orders never change again: keep them as compact records
+        record = OrderRecord.from_dict(order)
+        self.orders[order["orderId"]] = record
+        self.by_client_id[order["clientOrderId"]] = record
+        self._emit_order(order, last_qty, last_price)
+
+    # -------------------------------------------------
+    # User-data events
+    # -------------------------------------------------
+    def user_stream(self):
+        """
+        A PaperUserStream: the engine's order and position events in the
+        shape of the exchange's user-data stream.
+        """
+        return PaperUserStream(self)
+
+    def _emit(self, event):
+        for stream in list(self.streams):
+            stream.dispatch(event)
+
+    def _emit_order(self, order, last_qty=0.0, last_price=0.0):
+        if not self.streams:
+            return
+        self._emit({"e": "ORDER_TRADE_UPDATE", "E": int(time.time() * 1000), "o": {
+            "s": order["symbol"], "c": order["clientOrderId"], "S": order["side"], "o": order["type"],
+            "q": order["origQty"], "p": order["price"], "ap": order["avgPrice"], "sp": order["stopPrice"],
+            "X": order["status"], "i": order["orderId"], "l": str(last_qty), "z": order["executedQty"],
+            "L": str(last_price), "R": order["reduceOnly"],
+        }})
+
+    def _trigger(self, order, price):
+        if order["type"] == "STOP_MARKET":
+            self._fill(order, price, maker=False)
+        else:
+            self._rest_or_fill(order, price)
+
+    def _rest_or_fill(self, order, market_price):
+        limit = float(order["price"])
+        book = self._book(order["symbol"])
+        self.seq += 1
+        if order["side"] == "BUY":
+            if limit >= market_price:
+                self._fill(order, market_price, maker=False)
+            else:
+                heapq.heappush(book.bids, (-limit, self.seq, order["orderId"]))
+        else:
+            if limit <= market_price:
+                self._fill(order, market_price, maker=False)
+            else:
+                heapq.heappush(book.asks, (limit, self.seq, order["orderId"]))
+
+    def _fill(self, order, price, maker):
+        qty = float(order["origQty"])
+        symbol, side = order["symbol"], order["side"]
+        position = self.positions.setdefault(symbol, Position())
+        if order.get("reduceOnly"):
+            qty = min(qty, abs(position.qty)) if position.qty and (position.qty > 0) != (side == "BUY") else 0.0
+            if qty == 0:
+                order["status"] = "EXPIRED"
+                self._archive(order)
+                return
+        fee = qty * price * (MAKER_FEE if maker else TAKER_FEE)
+        realized = position.apply(side, qty, price)
+        position.fees += fee
+        now = int(time.time() * 1000)
+        order.update(status="FILLED", executedQty=str(qty), avgPrice=str(price),
+                     cumQuote=str(qty * price), updateTime=now)
+        self._archive(order, qty, price)
+        if self.streams:
+            self._emit({"e": "ACCOUNT_UPDATE", "E": now, "a": {"P": [{"s": symbol, "pa": str(position.qty)}]}})
+        self.trades.append({
+            "id": len(self.trades) + 1, "orderId": order["orderId"], "symbol": symbol, "side": side,
+            "price": str(price), "qty": str(qty), "quoteQty": str(qty * price), "realizedPnl": str(realized),
+            "commission": str(fee), "commissionAsset": "USDT", "time": now, "maker": maker,
+        })
+        logging.info(f"🧪 Paper fill: {side} {qty} {symbol} @ {price} ({'maker' if maker else 'taker'})")
+
+    # -------------------------------------------------
+    # Order endpoints
+    # -------------------------------------------------
+    def new_order(self, symbol, side, type, **kwargs):
+        if type not in SUPPORTED_TYPES:
+            raise _error(-1116, f"Paper trading does not support order type {type}.")
+        client_id = kwargs.get("newClientOrderId") or f"paper{self.next_id}"
+        price = self.last_price(symbol)
+        with self.lock:
+            if client_id in self.by_client_id:
+                raise _error(-4116, "ClientOrderId is duplicated.")
+            order = {
+                "orderId": self.next_id, "clientOrderId": client_id, "symbol": symbol, "side": side,
+                "type": type, "origType": type, "status": "NEW", "timeInForce": kwargs.get("timeInForce", "GTC"),
+                "price": str(kwargs.get("price", 0)), "stopPrice": str(kwargs.get("stopPrice", 0)),
+                "origQty": str(kwargs.get("quantity", 0)), "executedQty": "0", "avgPrice": "0",
+                "cumQuote": "0", "reduceOnly": str(kwargs.get("reduceOnly", "")).lower() == "true",
+                "updateTime": int(time.time() * 1000),
+            }
+            self.next_id += 1
+            self.orders[order["orderId"]] = order
+            self.by_client_id[client_id] = order
+
+            book = self._book(symbol)
+            if type == "MARKET":
+                self._fill(order, price, maker=False)
+            elif type == "LIMIT":
+                self._rest_or_fill(order, price)
+            else:
+                stop = float(kwargs["stopPrice"])
+                self.seq += 1
+                if side == "BUY" and stop > price:
+                    heapq.heappush(book.buy_stops, (stop, self.seq, order["orderId"]))
+                elif side == "SELL" and stop < price:
+                    heapq.heappush(book.sell_stops, (-stop, self.seq, order["orderId"]))
+                else:
+                    self.orders.pop(order["orderId"])
+                    self.by_client_id.pop(client_id)
+                    raise _error(-2021, "Order would immediately trigger.")
+            if order["status"] == "NEW":
+                self._emit_order(order)
+            return dict(order)
+
+    def new_batch_order(self, batchOrders):
+        results = []
+        for params in batchOrders:
+            params = dict(params)
+            try:
+                results.append(self.new_order(params.pop("symbol"), params.pop("side"), params.pop("type"), **params))
+            except Exception as e:
+                results.append({"code": getattr(e, "error_code", -1), "msg": getattr(e, "error_message", str(e))})
+        return results
+
+    def _find(self, orderId=None, origClientOrderId=None):
+        order = self.orders.get(int(orderId)) if orderId is not None else self.by_client_id.get(origClientOrderId)
+        if order is None:
+            raise _error(-2013, "Order does not exist.")
+        return order
+
+    def query_order(self, symbol, orderId=None, origClientOrderId=None, **kwargs):
+        with self.lock:
+            return dict(self._find(orderId, origClientOrderId))
+
+    def cancel_order(self, symbol, orderId=None, origClientOrderId=None, **kwargs):
+        with self.lock:
+            order = self._find(orderId, origClientOrderId)
+            if order["status"] in FINAL_STATUSES:
+                raise _error(-2011, "Unknown order sent.")
+            order["status"] = "CANCELED"   # heap entries are dropped lazily
+            self._archive(order)
+            return dict(order)
+
+    def cancel_batch_order(self, symbol, orderIdList=None, origClientOrderIdList=None, **kwargs):
+        results = []
+        for oid in orderIdList or []:
+            try:
+                results.append(self.cancel_order(symbol, orderId=oid))
+            except Exception as e:
+                results.append({"code": e.error_code, "msg": e.error_message})
+        return results
+
+    def cancel_open_orders(self, symbol, **kwargs):
+        with self.lock:
+            for order in list(self.orders.values()):
+                if order["symbol"] == symbol and order["status"] not in FINAL_STATUSES:
+                    order["status"] = "CANCELED"
+                    self._archive(order)
+        return {"code": 200, "msg": "The operation of cancel all open order is done."}
+
+    def get_orders(self, symbol=None, **kwargs):
+        with self.lock:
+            return [dict(o) for o in self.orders.values()
+                    if o["status"] not in FINAL_STATUSES and (symbol is None or o["symbol"] == symbol)]
+
+    def get_position_risk(self, symbol=None, **kwargs):
+        with self.lock:
+            return [{
+                "symbol": s, "positionAmt": str(p.qty), "entryPrice": str(p.entry),
+                "markPrice": str(self.prices.get(s, p.entry)),
+                "unRealizedProfit": str(p.qty * (self.prices.get(s, p.entry) - p.entry)),
+            } for s, p in self.positions.items() if symbol is None or s == symbol]
+
+    def get_account_trades(self, symbol, startTime=None, endTime=None, fromId=None, limit=500, **kwargs):
+        with self.lock:
+            return self.trades.select(symbol, startTime, endTime, fromId, limit)
+
+    # -------------------------------------------------
+    # Reporting
+    # -------------------------------------------------
+    def pnl(self):
+        """
+        {symbol: {position, entry, realized, unrealized, fees}}
+        """
+        with self.lock:
+            return {s: {
+                "position": p.qty, "entry": p.entry, "realized": p.realized, "fees": p.fees,
+                "unrealized": p.qty * (self.prices.get(s, p.entry) - p.entry),
+            } for s, p in self.positions.items()}
+
+    def print_summary(self):
+        pnl = self.pnl()
+        open_orders = sum(1 for o in self.orders.values() if o["status"] not in FINAL_STATUSES)
+        print(f"\n🧪 Paper trading summary: {len(self.trades)} fills, {open_orders} open orders")
+        for symbol, p in pnl.items():
+            net = p["realized"] + p["unrealized"] - p["fees"]
+            print(f"   {symbol}: position {p['position']} @ {p['entry']:.2f}, realized {p['realized']:.4f}, "
+                  f"unrealized {p['unrealized']:.4f}, fees {p['fees']:.4f}, net {net:.4f} USDT")
+        logging.info(f"Paper trading summary: {pnl}")
+
+
+class PaperUserStream:
+    """
+    Stands in for UserDataStream in --paper mode (see user_stream.open_user_stream):
+    listeners get the engine's ORDER_TRADE_UPDATE and ACCOUNT_UPDATE events
+    synchronously, as orders rest, fill, expire or are cancelled.
+    """
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.listeners = []
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def start(self):
+        with self.exchange.lock:
+            self.exchange.streams.append(self)
+        return self
+
+    def stop(self):
+        with self.exchange.lock:
+            if self in self.exchange.streams:
+                self.exchange.streams.remove(self)
+
+    def dispatch(self, event):
+        for callback in self.listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                logging.error(f"❌ Paper user stream listener failed: {e}")
+
+
+def paper_flag(args):
+    """
+    Removes --paper from args in place; returns True if it was given.
+    """
+    if "--paper" in args:
+        args.remove("--paper")
+        return True
+    return False
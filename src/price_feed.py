@@ -0,0 +1,114 @@
+import time
+import logging
+import threading
+
+from user_stream import STREAM_URL
+from json_codec import decode_event
+from metrics import METRICS
+
+# -----------------------------------------------------
+# Local price stream
+# -----------------------------------------------------
+class PriceFeed:
+    """
+    Keeps the latest price per symbol from the market websocket so that
+    strategies can react to every tick without calling ticker_price().
+    channel: "aggTrade" (last trade), "markPrice" or "bookTicker" (mid).
+    """
+
+    def __init__(self, stream_url=STREAM_URL, channel="aggTrade"):
+        self.stream_url = stream_url
+        self.channel = channel
+        self.prices = {}
+        self.updated = {}
+        self.funding = {}        # symbol -> mark/index/rate/next_funding (markPrice channel)
+        self.listeners = []
+        self.symbols = set()
+        self.lock = threading.Lock()
+        self.ws = None
+
+    def add_listener(self, callback):
+        """
+        callback(symbol, price, event_time_ms) is called on every tick.
+        """
+        self.listeners.append(callback)
+
+    def start(self, symbols=()):
+        from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClient
+
+        self.ws = UMFuturesWebsocketClient(stream_url=self.stream_url, on_message=self._on_message)
+        self.subscribe(symbols)
+        METRICS.watch("feed", self)
+        logging.info(f"Price feed started ({self.channel}) for {len(self.symbols)} symbols.")
+
+    def stop(self):
+        METRICS.unwatch("feed", self)
+        if self.ws:
+            self.ws.stop()
+
+    def subscribe(self, symbols):
+        for symbol in symbols:
+            if symbol in self.symbols:
+                continue
+            self.symbols.add(symbol)
+            if self.channel == "markPrice":
+                self.ws.mark_price(symbol=symbol, speed=1)
+            elif self.channel == "bookTicker":
+                self.ws.book_ticker(symbol=symbol)
+            else:
+                self.ws.agg_trade(symbol=symbol)
+
+    def last_price(self, symbol):
+        return self.prices.get(symbol)
+
+    def funding_info(self, symbol):
+        """
+        Latest {"mark", "index", "rate", "next_funding"} for symbol from the
+        markPrice channel, or None if none seen yet.
+        """
+        return self.funding.get(symbol)
+
+    def on_funding(self, symbol, mark, index, rate, next_funding):
+        """
+        Caches the premium index fields of a markPriceUpdate (or a
+        premiumIndex REST response, to seed the cache).
+        """
+        self.funding[symbol] = {"mark": mark, "index": index, "rate": rate, "next_funding": next_funding}
+
+    def age(self, symbol):
+        """
+        Seconds since the last tick for symbol (inf if none seen yet).
+        """
+        updated = self.updated.get(symbol)
+        return time.time() - updated if updated else float("inf")
+
+    def on_price(self, symbol, price, event_time=None):
+        """
+        Feeds a tick into the cache and listeners. Used by the websocket
+        handler and by replay / paper trading.
+        """
+        with self.lock:
+            self.prices[symbol] = price
+            self.updated[symbol] = time.time()
+        for callback in self.listeners:
+            try:
+                callback(symbol, price, event_time)
+            except Exception as e:
+                logging.error(f"❌ Price listener failed: {e}")
+
+    def _on_message(self, _, message):
+        try:
+            msg = decode_event(message)
+        except ValueError:
+            return
+        kind = msg.get("e")
+        if kind == "markPriceUpdate":
+            price = float(msg["p"])
+            self.on_funding(msg["s"], price, float(msg["i"]), float(msg["r"]), int(msg["T"]))
+        elif kind == "aggTrade":
+            price = float(msg["p"])
+        elif kind == "bookTicker":
+            price = (float(msg["b"]) + float(msg["a"])) / 2
+        else:
+            return
+        self.on_price(msg["s"], price, msg.get("E"))
@@ -0,0 +1,175 @@
+import os
+import sys
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+
+# -----------------------------------------------------
+# Run profiling (--profile)
+# -----------------------------------------------------
+# A sampling profiler takes the stack of every thread every SAMPLE_INTERVAL
+# and writes them in folded format ("frame;frame;frame count"), which
+# flamegraph.pl, speedscope and inferno read directly. The phase a thread is
+# in (validate, price_fetch, submit, log, ...) is pushed as the root frame,
+# so the flame graph splits by phase first. PROFILE_MODE=cprofile records a
+# deterministic cProfile .prof of the main thread instead.
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(PROJECT_ROOT, "profiles"))
+SAMPLE_INTERVAL = 0.005  # seconds
+CLIENT_PHASES = {
+    "ticker_price": "price_fetch",
+    "mark_price": "price_fetch",
+    "klines": "price_fetch",
+    "exchange_info": "exchange_info",
+    "new_order": "submit",
+    "new_batch_order": "submit",
+    "cancel_order": "submit",
+    "cancel_batch_order": "submit",
+    "query_order": "query",
+    "get_orders": "query",
+    "get_position_risk": "query",
+}
+
+_spans = {}        # thread id -> [phase, ...]
+_totals = {}       # phase -> [calls, seconds, max seconds]
+_lock = threading.Lock()
+
+
+@contextmanager
+def span(name):
+    """
+    Marks a phase of the run. Nested spans are recorded separately, so
+    times are inclusive.
+    """
+    stack = _spans.setdefault(threading.get_ident(), [])
+    stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+        with _lock:
+            total = _totals.setdefault(name, [0, 0.0, 0.0])
+            total[0] += 1
+            total[1] += elapsed
+            total[2] = max(total[2], elapsed)
+
+
+def instrument_client(client):
+    """
+    Wraps the client's network methods in phase spans.
+    """
+    for method, phase in CLIENT_PHASES.items():
+        original = getattr(client, method, None)
+        if original is None:
+            continue
+
+        def timed(*args, _original=original, _phase=phase, **kwargs):
+            with span(_phase):
+                return _original(*args, **kwargs)
+
+        setattr(client, method, timed)
+    return client
+
+
+def _instrument_logging():
+    for handler in logging.root.handlers:
+        emit = handler.emit
+
+        def timed(record, _emit=emit):
+            with span("log"):
+                _emit(record)
+
+        handler.emit = timed
+
+
+class Profiler:
+    def __init__(self, name, mode=None):
+        self.name = name
+        self.mode = mode or os.getenv("PROFILE_MODE", "sample")
+        self.samples = {}
+        self.running = False
+        self.thread = None
+        self.started = None
+        self.cprofile = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        _instrument_logging()
+        if self.mode == "cprofile":
+            import cProfile
+
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        else:
+            self.running = True
+            self.thread = threading.Thread(target=self._sample_loop, daemon=True)
+            self.thread.start()
+        atexit.register(self.finish)
+        return self
+
+    def _sample_loop(self):
+        me = threading.get_ident()
+        while self.running:
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    if code.co_filename != __file__:  # skip the span wrappers
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                phases = _spans.get(tid) or ["other"]
+                key = ";".join(phases + stack[::-1])
+                self.samples[key] = self.samples.get(key, 0) + 1
+            time.sleep(SAMPLE_INTERVAL)
+
+    def finish(self):
+        wall = time.perf_counter() - self.started
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}")
+
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            output = base + ".prof"
+            self.cprofile.dump_stats(output)
+        else:
+            # The sampler must be done writing before the samples are read
+            self.running = False
+            self.thread.join()
+            output = base + ".folded"
+            with open(output, "w") as f:
+                for stack, count in sorted(self.samples.items()):
+                    f.write(f"{stack} {count}\n")
+
+        lines = [f"Profile of {self.name}: {wall:.3f}s wall", f"{'phase':<16}{'calls':>8}{'total s':>10}{'share':>8}{'max ms':>10}"]
+        with _lock:
+            phases = sorted(_totals.items(), key=lambda item: item[1][1], reverse=True)
+        for phase, (calls, total, longest) in phases:
+            lines.append(f"{phase:<16}{calls:>8}{total:>10.3f}{total / wall * 100 if wall else 0:>7.1f}%{longest * 1000:>10.1f}")
+        with open(base + "-phases.txt", "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+        print("\n⏱️ " + "\n   ".join(lines))
+        print(f"   Flame graph data: {output}")
+
+
+def profile_flag(args):
+    """
+    Removes --profile from args in place; returns True if it was given.
+    """
+    if "--profile" in args:
+        args.remove("--profile")
+        return True
+    return False
+
+
+def start_profiling(name, client=None):
+    profiler = Profiler(name).start()
+    if client is not None:
+        instrument_client(client)
+    return profiler
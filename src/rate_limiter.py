@@ -0,0 +1,61 @@
+import time
+import threading
+
+# -----------------------------------------------------
+# Token bucket rate limiter
+# -----------------------------------------------------
+class RateLimiter:
+    """
+    Thread-safe token bucket. Every code path that sends orders shares one
+    instance so that many concurrent strategies stay inside the exchange limits.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)              # tokens added per second
+        self.capacity = float(burst or rate)  # bucket size
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waited = 0.0                    # seconds callers spent blocked in acquire()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens=1):
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1):
+        """
+        Blocks until the requested number of tokens is available.
+        """
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+                self.waited += wait
+            time.sleep(wait)
+
+    def in_use(self):
+        """
+        Share of the bucket currently spent: 0 when idle, 1 when callers
+        are being held back.
+        """
+        with self.lock:
+            self._refill()
+            return 1 - self.tokens / self.capacity
+
+
+# Binance USDⓈ-M futures: 300 orders / 10s and 1200 orders / min per account,
+# 2400 request weight / min per IP. Stay a little under both.
+ORDER_LIMITER = RateLimiter(rate=18, burst=50)
+WEIGHT_LIMITER = RateLimiter(rate=36, burst=200)
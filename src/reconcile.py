@@ -0,0 +1,193 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from rate_limiter import RateLimiter
+from metrics import METRICS
+from records import OrderRecord
+
+# -----------------------------------------------------
+# Order-state reconciliation
+# -----------------------------------------------------
+# Strategies keep their own picture of what is working on the exchange.
+# Manual cancels, liquidations and expiries change the exchange side
+# without telling them, so a background worker periodically fetches the
+# real open orders and positions and reports only what differs.
+RECONCILE_INTERVAL = int(os.getenv("RECONCILE_INTERVAL", "30"))   # seconds between passes
+# Request weight per minute the worker may use. The IP limit is 2400/min;
+# this keeps reconciliation to a tenth of it so order entry is never starved.
+WEIGHT_BUDGET = int(os.getenv("RECONCILE_WEIGHT_BUDGET", "240"))
+ORDERS_WEIGHT = 1        # GET /fapi/v1/openOrders with a symbol
+POSITIONS_WEIGHT = 5     # GET /fapi/v2/positionRisk
+MAX_WORKERS = 8
+QTY_TOLERANCE = 1e-9
+
+
+def fingerprint(side, price, qty):
+    """
+    The comparable state of one order: (side, price, remaining qty).
+    """
+    return side, round(float(price), 8), round(float(qty), 8)
+
+
+class Watch:
+    """
+    One strategy's expectations for one symbol.
+    expected_orders() -> {orderId: fingerprint(...)}
+    expected_position() -> signed qty, or None to skip the position check
+    prefix: clientOrderId prefix of the strategy's orders, so open orders it
+    does not know about can be reported too.
+    """
+
+    def __init__(self, name, symbol, callback, expected_orders, expected_position=None, prefix=None):
+        self.name = name
+        self.symbol = symbol
+        self.callback = callback
+        self.expected_orders = expected_orders
+        self.expected_position = expected_position
+        self.prefix = prefix
+        self.reported = set()   # discrepancies already sent, so each is reported once
+
+
+class Reconciler:
+    """
+    Fetches open orders (one request per symbol, in parallel) and positions
+    (one request) under a weight budget, diffs them against every Watch and
+    calls watch.callback(event) for each new discrepancy:
+
+        {"type": "missing", ...}     tracked order is no longer open
+        {"type": "changed", ...}     tracked order differs (e.g. partly filled)
+        {"type": "unexpected", ...}  open order with the watch's prefix not tracked
+        {"type": "position", ...}    position differs from the expected one
+
+    Both sides are dicts keyed by orderId, so a pass is a few set
+    operations per watch however many orders are open. Each discrepancy is
+    reported once, not on every pass while it persists.
+    """
+
+    def __init__(self, client, interval=RECONCILE_INTERVAL, weight_budget=WEIGHT_BUDGET):
+        self.client = client
+        self.interval = interval
+        self.budget = RateLimiter(rate=weight_budget / 60, burst=max(POSITIONS_WEIGHT, weight_budget / 4))
+        self.watches = []
+        self.lock = threading.Lock()
+        self.running = False
+        self.passes = 0
+        self.source = ("reconcile", self.budget)   # as shown on the dashboard
+
+    def watch(self, name, symbol, callback, expected_orders, expected_position=None, prefix=None):
+        with self.lock:
+            self.watches.append(Watch(name, symbol, callback, expected_orders, expected_position, prefix))
+        return self
+
+    def unwatch(self, name):
+        with self.lock:
+            self.watches = [w for w in self.watches if w.name != name]
+
+    def start(self):
+        self.running = True
+        METRICS.watch("limiter", self.source)
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        METRICS.unwatch("limiter", self.source)
+
+    def _run(self):
+        while self.running:
+            time.sleep(self.interval)
+            try:
+                self.reconcile()
+            except Exception as e:
+                logging.warning(f"Reconciliation pass failed: {e}")
+
+    # -------------------------------------------------
+    # Fetching (budgeted)
+    # -------------------------------------------------
+    def _open_orders(self, symbol):
+        self.budget.acquire(ORDERS_WEIGHT)
+        orders = map(OrderRecord.from_dict, self.client.get_orders(symbol=symbol))
+        return symbol, {
+            o.order_id: (o.get("clientOrderId", ""), fingerprint(o.side, o.price, o.remaining))
+            for o in orders
+        }
+
+    def _positions(self):
+        self.budget.acquire(POSITIONS_WEIGHT)
+        positions = {}
+        for p in self.client.get_position_risk():  # hedge mode lists LONG and SHORT separately
+            positions[p["symbol"]] = positions.get(p["symbol"], 0.0) + float(p["positionAmt"])
+        return positions
+
+    def fetch(self, symbols, positions=False):
+        """
+        Returns ({symbol: {orderId: (clientOrderId, fingerprint)}}, positions or None).
+        """
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            position_job = pool.submit(self._positions) if positions else None
+            orders = dict(pool.map(self._open_orders, symbols))
+        return orders, position_job.result() if position_job else None
+
+    # -------------------------------------------------
+    # Diffing
+    # -------------------------------------------------
+    @staticmethod
+    def diff(watch, local, remote, position=None, current=None):
+        """
+        Discrepancies between local {orderId: fingerprint}, taken before the
+        fetch, and remote {orderId: (clientOrderId, fingerprint)}, as event
+        dicts. current is the local state after the fetch: an order placed
+        in between is not reported as unexpected.
+        """
+        events = []
+        base = {"strategy": watch.name, "symbol": watch.symbol}
+        mine = {oid: fp for oid, (cid, fp) in remote.items()
+                if oid in local or (watch.prefix and cid.startswith(watch.prefix))}
+        if mine != local:
+            for oid in local.keys() - mine.keys():
+                events.append(dict(base, type="missing", orderId=oid, local=local[oid], exchange=None))
+            for oid in mine.keys() - local.keys() - (current or {}).keys():
+                events.append(dict(base, type="unexpected", orderId=oid, local=None, exchange=mine[oid]))
+            for oid in local.keys() & mine.keys():
+                if local[oid] != mine[oid]:
+                    events.append(dict(base, type="changed", orderId=oid, local=local[oid], exchange=mine[oid]))
+        if position is not None and watch.expected_position is not None:
+            expected = watch.expected_position()
+            if expected is not None and abs(expected - position) > QTY_TOLERANCE:
+                events.append(dict(base, type="position", orderId=None, local=expected, exchange=position))
+        return events
+
+    def reconcile(self):
+        """
+        Runs one pass; returns the number of new discrepancies reported.
+        """
+        with self.lock:
+            watches = list(self.watches)
+        if not watches:
+            return 0
+        symbols = sorted({w.symbol for w in watches})
+        need_positions = any(w.expected_position is not None for w in watches)
+        local = [w.expected_orders() for w in watches]
+        remote, positions = self.fetch(symbols, need_positions)
+
+        reported = 0
+        for w, before in zip(watches, local):
+            position = positions.get(w.symbol, 0.0) if positions is not None else None
+            events = self.diff(w, before, remote[w.symbol], position, w.expected_orders())
+            keys = [(e["type"], e["orderId"], e["exchange"]) for e in events]
+            for event, key in zip(events, keys):
+                if key in w.reported:
+                    continue
+                logging.info(f"Reconciliation [{w.name}] {event['type']} {w.symbol} order {event['orderId']}: "
+                             f"local={event['local']} exchange={event['exchange']}")
+                try:
+                    w.callback(event)
+                except Exception as e:
+                    logging.error(f"❌ Reconciliation listener failed: {e}")
+                reported += 1
+            w.reported = set(keys)
+        self.passes += 1
+        return reported
@@ -0,0 +1,439 @@
+import sys
+import time
+import logging
+import threading
+import os
+
+from rate_limiter import RateLimiter
+from records import OrderRecord
+
+# -----------------------------------------------------
+# Pre-trade risk limits and kill switch
+# -----------------------------------------------------
+# Limits come from the environment (0 disables a limit). Notionals are in USDT.
+MAX_ORDER_NOTIONAL = float(os.getenv("MAX_ORDER_NOTIONAL", "10000"))
+MAX_SYMBOL_NOTIONAL = float(os.getenv("MAX_SYMBOL_NOTIONAL", "50000"))
+MAX_ACCOUNT_NOTIONAL = float(os.getenv("MAX_ACCOUNT_NOTIONAL", "100000"))
+# Sized like ORDER_LIMITER: callers wait for a token rather than being refused
+MAX_ORDERS_PER_SEC = float(os.getenv("MAX_ORDERS_PER_SEC", "18"))
+MAX_ORDER_BURST = float(os.getenv("MAX_ORDER_BURST", "50"))
+MAX_OPEN_ORDERS = int(os.getenv("MAX_OPEN_ORDERS", "100"))
+RESYNC_INTERVAL = 60  # seconds between background REST refreshes of the cache
+LOAD_TIMEOUT = 10     # seconds the first order waits for the initial load
+# `risk.py kill` creates this file; every running process sees it within
+# HALT_POLL seconds and refuses new orders until `risk.py resume` removes it
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HALT_FILE = os.getenv("RISK_HALT_FILE", os.path.join(PROJECT_ROOT, "data", "HALT"))
+HALT_POLL = 1
+
+
+class RiskError(Exception):
+    pass
+
+
+class RiskManager:
+    """
+    Checks every order against in-memory exposure before it is sent, so a
+    check is a few dict lookups and never a network round trip.
+
+    The cache holds, per symbol, the signed position, the open orders and
+    the last known price. It is loaded once over REST, updated locally from
+    each accepted or cancelled order, corrected from user-data events, and
+    resynced in the background.
+
+    Resting BUY and SELL orders do not offset each other: either side may
+    fill alone, so a symbol's exposure is the worse of the position plus
+    every open BUY and the position minus every open SELL.
+    """
+
+    def __init__(self, client, max_order_notional=MAX_ORDER_NOTIONAL, max_symbol_notional=MAX_SYMBOL_NOTIONAL,
+                 max_account_notional=MAX_ACCOUNT_NOTIONAL, max_orders_per_sec=MAX_ORDERS_PER_SEC,
+                 max_open_orders=MAX_OPEN_ORDERS, max_order_burst=MAX_ORDER_BURST):
+        self.client = client
+        self.max_order_notional = max_order_notional
+        self.max_symbol_notional = max_symbol_notional
+        self.max_account_notional = max_account_notional
+        self.max_open_orders = max_open_orders
+        self.order_rate = RateLimiter(rate=max_orders_per_sec, burst=max(max_order_burst, max_orders_per_sec)) if max_orders_per_sec else None
+        self.positions = {}     # symbol -> signed position qty
+        self.open_orders = {}   # orderId -> (symbol, signed qty, price)
+        self.prices = {}        # symbol -> last known price
+        self.exposure = {}      # symbol -> (position, open BUY qty, open SELL qty), kept aggregated for check()
+        self.halted = is_halted()
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.running = False
+        self.stream = None
+
+    # -------------------------------------------------
+    # Cache maintenance (off the order path)
+    # -------------------------------------------------
+    def load(self):
+        positions = self.client.get_position_risk()
+        orders = self.client.get_orders()
+        tickers = self.client.ticker_price()
+        with self.lock:
+            # Every symbol gets a price here, so check() never has to fetch one
+            for t in tickers if isinstance(tickers, list) else [tickers]:
+                if t.get("symbol") and float(t.get("price", 0)):
+                    self.prices[t["symbol"]] = float(t["price"])
+            self.positions = {p["symbol"]: float(p["positionAmt"]) for p in positions if float(p["positionAmt"])}
+            for p in positions:
+                if float(p.get("markPrice", 0)):
+                    self.prices[p["symbol"]] = float(p["markPrice"])
+            self.open_orders = {
+                o.order_id: (o.symbol, self._signed(o.side, o.remaining), o.limit_price)
+                for o in map(OrderRecord.from_dict, orders)
+            }
+            self._rebuild()
+        return self
+
+    def start(self, stream=None, follow=True):
+        """
+        Loads the cache in the background (overlapping the caller's own
+        start-up requests), then keeps it in sync. The first check() waits
+        for the load. Fills and cancels are applied as they happen from
+        stream (a started user-data stream), or from one this opens after
+        the load when follow is set; one-shot scripts pass follow=False.
+        """
+        if stream is not None:
+            stream.add_listener(self.on_event)
+        self.running = True
+        threading.Thread(target=self._run, args=(follow and stream is None,), daemon=True).start()
+        threading.Thread(target=self._watch_halt, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.stream is not None:
+            self.stream.stop()
+
+    def _follow(self):
+        from user_stream import open_user_stream
+
+        try:
+            stream = open_user_stream(self.client)
+            stream.add_listener(self.on_event)
+            stream.start()
+            self.stream = stream
+        except Exception as e:
+            logging.warning(f"Risk cache has no user-data stream, relying on resync: {e}")
+
+    def _watch_halt(self):
+        while self.running:
+            time.sleep(HALT_POLL)
+            halted = is_halted()
+            if halted != self.halted:
+                self.halted = halted
+                msg = "🛑 Kill switch engaged: new orders are refused." if halted else "✅ Kill switch released: trading resumed."
+                print(msg)
+                logging.warning(msg)
+
+    def _run(self, follow):
+        try:
+            self.load()
+        except Exception as e:
+            print(f"⚠️ Could not load positions for risk checks: {e}")
+            logging.warning(f"Risk cache load failed: {e}")
+        self.ready.set()
+        if follow:
+            self._follow()
+        while self.running:
+            time.sleep(RESYNC_INTERVAL)
+            try:
+                self.load()
+            except Exception as e:
+                logging.warning(f"Risk cache resync failed: {e}")
+
+    def on_event(self, event):
+        if event.get("e") == "ORDER_TRADE_UPDATE":
+            o = event["o"]
+            with self.lock:
+                if float(o.get("L", 0)):
+                    self.prices[o["s"]] = float(o["L"])
+                if o["X"] in ("FILLED", "CANCELED", "EXPIRED", "REJECTED"):
+                    self.open_orders.pop(o["i"], None)
+                elif o["i"] in self.open_orders:
+                    remaining = float(o["q"]) - float(o["z"])
+                    self.open_orders[o["i"]] = (o["s"], self._signed(o["S"], remaining), float(o["p"]))
+                self._rebuild()
+        elif event.get("e") == "ACCOUNT_UPDATE":
+            with self.lock:
+                for p in event["a"].get("P", []):
+                    self.positions[p["s"]] = float(p["pa"])
+                self._rebuild()
+
+    def _rebuild(self):
+        # Called under self.lock whenever positions or open orders change
+        exposure = {s: [q, 0.0, 0.0] for s, q in self.positions.items()}
+        for s, q, _ in self.open_orders.values():
+            entry = exposure.setdefault(s, [0.0, 0.0, 0.0])
+            if q > 0:
+                entry[1] += q
+            else:
+                entry[2] -= q
+        self.exposure = {s: tuple(e) for s, e in exposure.items()}
+
+    @staticmethod
+    def _worst(entry):
+        position, buys, sells = entry
+        return max(abs(position + buys), abs(position - sells))
+
+    @staticmethod
+    def _signed(side, qty):
+        return qty if side == "BUY" else -qty
+
+    # -------------------------------------------------
+    # Pre-trade check (hot path)
+    # -------------------------------------------------
+    def _price(self, symbol, price):
+        if price:
+            return float(price)
+        cached = self.prices.get(symbol)
+        if not cached:
+            # load() prices every listed symbol; fetching one here would put
+            # a round trip on the order path
+            raise RiskError(f"no known price for {symbol}, cannot check its notional")
+        return cached
+
+    def check(self, symbol, side, quantity, price=None, reduce_only=False):
+        """
+        Raises RiskError if the order would breach a limit. Reduce-only
+        orders can only shrink exposure and skip the notional checks.
+        Waits for an order-rate token once the order has passed.
+        """
+        self.check_batch([(symbol, side, quantity, price, reduce_only)])
+
+    def check_batch(self, orders):
+        """
+        Checks orders [(symbol, side, quantity, price, reduce_only)] as one
+        unit, each against the exposure the ones before it would add, and
+        raises RiskError before any rate token is spent if one fails. Then
+        waits for a token per order.
+        """
+        if not self.ready.is_set():
+            self.ready.wait(LOAD_TIMEOUT)
+        if self.halted:
+            raise RiskError("kill switch engaged, trading halted")
+        if self.max_open_orders and len(self.open_orders) + len(orders) > self.max_open_orders:
+            raise RiskError(f"open order limit reached ({self.max_open_orders})")
+
+        exposure = dict(self.exposure)
+        for symbol, side, quantity, price, reduce_only in orders:
+            if not reduce_only:
+                self._check_notional(exposure, symbol, side, float(quantity), self._price(symbol, price))
+
+        if self.order_rate:
+            for _ in orders:
+                self.order_rate.acquire()
+
+    def _check_notional(self, exposure, symbol, side, qty, px):
+        notional = qty * px
+        if self.max_order_notional and notional > self.max_order_notional:
+            raise RiskError(f"order notional {notional:.2f} exceeds {self.max_order_notional:.2f}")
+
+        position, buys, sells = exposure.get(symbol, (0.0, 0.0, 0.0))
+        after = (position, buys + qty, sells) if side == "BUY" else (position, buys, sells + qty)
+        symbol_notional = self._worst(after) * px
+        if self.max_symbol_notional and symbol_notional > self.max_symbol_notional:
+            raise RiskError(f"{symbol} exposure {symbol_notional:.2f} would exceed {self.max_symbol_notional:.2f}")
+        if self.max_account_notional:
+            total = symbol_notional + sum(self._worst(e) * self.prices.get(s, 0.0) for s, e in exposure.items() if s != symbol)
+            if total > self.max_account_notional:
+                raise RiskError(f"account exposure {total:.2f} would exceed {self.max_account_notional:.2f}")
+        exposure[symbol] = after
+
+    def on_cancelled(self, symbol, order_ids=None):
+        """
+        Drops cancelled orders (every order on symbol when order_ids is
+        None) without waiting for the stream or the next resync.
+        """
+        with self.lock:
+            for oid, (s, _, _) in list(self.open_orders.items()):
+                if s == symbol and (order_ids is None or oid in order_ids):
+                    del self.open_orders[oid]
+            self._rebuild()
+
+    def on_accepted(self, params, response):
+        """
+        Applies an accepted order to the cache until the stream or the next
+        resync confirms it.
+        """
+        symbol, side = params["symbol"], params["side"]
+        qty = float(params.get("quantity") or 0)
+        with self.lock:
+            if response.get("status") == "FILLED" or params.get("type") == "MARKET":
+                self.positions[symbol] = self.positions.get(symbol, 0.0) + self._signed(side, qty)
+            elif "orderId" in response:
+                self.open_orders[response["orderId"]] = (symbol, self._signed(side, qty), float(params.get("price") or 0))
+            self._rebuild()
+
+    # -------------------------------------------------
+    # Wiring
+    # -------------------------------------------------
+    def install(self, client=None):
+        """
+        Wraps client.new_order and client.new_batch_order so every order
+        from every strategy goes through check() first, and the cancel
+        endpoints so cancelled orders leave the open-order count at once.
+        """
+        client = client or self.client
+        new_order = client.new_order
+        new_batch_order = client.new_batch_order
+        cancel_order = client.cancel_order
+        cancel_batch_order = client.cancel_batch_order
+        cancel_open_orders = client.cancel_open_orders
+
+        def _is_reduce(params):
+            return str(params.get("reduceOnly", "")).lower() == "true" or str(params.get("closePosition", "")).lower() == "true"
+
+        def checked_new_order(symbol, side, type, **kwargs):
+            params = dict(kwargs, symbol=symbol, side=side, type=type)
+            self.check(symbol, side, kwargs.get("quantity", 0), kwargs.get("price") or kwargs.get("stopPrice"), _is_reduce(params))
+            response = new_order(symbol=symbol, side=side, type=type, **kwargs)
+            self.on_accepted(params, response)
+            return response
+
+        def checked_new_batch_order(batchOrders):
+            self.check_batch([(o["symbol"], o["side"], o.get("quantity", 0), o.get("price") or o.get("stopPrice"),
+                               _is_reduce(o)) for o in batchOrders])
+            responses = new_batch_order(batchOrders)
+            for o, r in zip(batchOrders, responses):
+                if "orderId" in r:
+                    self.on_accepted(o, r)
+            return responses
+
+        def tracked_cancel_order(symbol, **kwargs):
+            response = cancel_order(symbol=symbol, **kwargs)
+            self.on_cancelled(symbol, {response.get("orderId")})
+            return response
+
+        def tracked_cancel_batch_order(symbol, orderIdList=None, origClientOrderIdList=None, **kwargs):
+            responses = cancel_batch_order(symbol=symbol, orderIdList=orderIdList,
+                                           origClientOrderIdList=origClientOrderIdList, **kwargs)
+            self.on_cancelled(symbol, {r["orderId"] for r in responses if "orderId" in r})
+            return responses
+
+        def tracked_cancel_open_orders(symbol, **kwargs):
+            response = cancel_open_orders(symbol=symbol, **kwargs)
+            self.on_cancelled(symbol)
+            return response
+
+        client.new_order = checked_new_order
+        client.new_batch_order = checked_new_batch_order
+        client.cancel_order = tracked_cancel_order
+        client.cancel_batch_order = tracked_cancel_batch_order
+        client.cancel_open_orders = tracked_cancel_open_orders
+        return self
+
+    # -------------------------------------------------
+    # Kill switch
+    # -------------------------------------------------
+    def kill(self):
+        """
+        Halts new orders in every process and cancels every open order on
+        every symbol.
+        """
+        self.halted = True
+        set_halt(True)
+        return kill_switch(self.client)
+
+
+def is_halted():
+    return os.path.exists(HALT_FILE)
+
+
+def set_halt(halted):
+    """
+    Engages (creates HALT_FILE) or releases (removes it) the kill switch
+    for every process using this project directory.
+    """
+    if halted:
+        os.makedirs(os.path.dirname(HALT_FILE), exist_ok=True)
+        with open(HALT_FILE, "w") as f:
+            f.write(time.strftime("%Y-%m-%d %H:%M:%S\n"))
+    elif os.path.exists(HALT_FILE):
+        os.remove(HALT_FILE)
+
+
+def kill_switch(client):
+    """
+    Cancels all open orders on every symbol that has any, one
+    cancel_open_orders call per symbol, all in parallel.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    symbols = sorted({o["symbol"] for o in client.get_orders()})
+    if not symbols:
+        print("✅ No open orders to cancel.")
+        return {}
+
+    def cancel(symbol):
+        try:
+            client.cancel_open_orders(symbol=symbol)
+            return True
+        except Exception as e:
+            logging.error(f"❌ Kill switch failed to cancel {symbol}: {e}")
+            return e
+
+    with ThreadPoolExecutor(max_workers=min(16, len(symbols))) as pool:
+        results = dict(zip(symbols, pool.map(cancel, symbols)))
+
+    ok = [s for s, r in results.items() if r is True]
+    msg = f"🛑 Kill switch: cancelled open orders on {len(ok)}/{len(symbols)} symbols ({', '.join(ok)})"
+    print(msg)
+    logging.warning(msg)
+    return results
+
+
+def start_risk(client, stream=None, follow=True, **limits):
+    """
+    Loads the risk cache for client, follows its user-data stream (unless
+    follow=False) and installs pre-trade checks. limits override the
+    RiskManager defaults, e.g. max_open_orders=500.
+    """
+    return RiskManager(client, **limits).start(stream, follow).install()
+
+# -----------------------------------------------------
+# Entry point: python src/risk.py kill | resume | status
+# -----------------------------------------------------
+if __name__ == "__main__":
+    from profiling import profile_flag, start_profiling
+
+    args = sys.argv[:]
+    profile = profile_flag(args)
+    if len(args) < 2 or args[1] not in ("kill", "resume", "status"):
+        print("Usage: python risk.py <kill|resume|status> [--profile]")
+        sys.exit(1)
+    if args[1] == "resume":
+        set_halt(False)
+        print("✅ Kill switch released: running processes resume trading.")
+        sys.exit(0)
+
+    from binance.um_futures import UMFutures
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    client = UMFutures(key=os.getenv("API_KEY"), secret=os.getenv("API_SECRET"),
+                       base_url=os.getenv("BASE_URL", "https://testnet.binancefuture.com"))
+    logging.basicConfig(
+        filename=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bot.log"),
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    if profile:
+        start_profiling(f"risk_{args[1]}", client)
+
+    try:
+        if args[1] == "kill":
+            set_halt(True)   # first, so running strategies stop re-placing what is cancelled
+            print("🛑 Kill switch engaged: running processes refuse new orders (python risk.py resume to release).")
+            kill_switch(client)
+        else:
+            risk = RiskManager(client).load()
+            print(f"📊 Positions: {risk.positions or 'none'}")
+            print(f"📋 Open orders: {len(risk.open_orders)} (limit {risk.max_open_orders})")
+            print(f"🛑 Kill switch: {'engaged' if is_halted() else 'off'}")
+    except Exception as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -0,0 +1,84 @@
+from paper import PaperExchange, paper_flag
+from profiling import profile_flag, start_profiling, instrument_client
+from shutdown import shutdown
+
+# -----------------------------------------------------
+# Shared start-up of the long-running scripts
+# -----------------------------------------------------
+# Every strategy wires the same services around its client, and the order
+# matters: the websocket and risk layers replace the order methods (risk
+# must wrap the websocket ones, not be replaced by them), profiling wraps
+# whatever is installed last, and the dashboard takes over the terminal
+# once everything else is up. The scripts go through these helpers so
+# that order is fixed in one place:
+#
+#   options = runtime.flags(args)
+#   client = runtime.start(options, "twap", client)   # paper client, profiler
+#   ... validate_args(args) ...
+#   runtime.setup(options, "twap", client)            # clock, ws, risk, signals, dashboard
+#
+# The services are imported where they start, so one-shot entry points
+# (limit_orders) do not pay for the websocket and dashboard modules.
+
+
+class Options:
+    """
+    The shared command-line flags: --paper, --profile, --ws and --dashboard.
+    """
+
+    def __init__(self, paper=False, profile=False, ws=False, dashboard=False):
+        self.paper = paper
+        self.profile = profile
+        self.ws = ws
+        self.dashboard = dashboard
+
+
+def flags(args):
+    """
+    Removes the shared flags from args in place and returns them as Options.
+    """
+    from ws_orders import ws_flag
+    from dashboard import dashboard_flag
+
+    return Options(paper_flag(args), profile_flag(args), ws_flag(args), dashboard_flag(args))
+
+
+def start(options, name, client):
+    """
+    Swaps in the paper engine and starts the profiler, before validation.
+    Returns the client the script should use from here on.
+    """
+    if options.paper:
+        client = PaperExchange(client).start()
+    if options.profile:
+        start_profiling(name)
+    return client
+
+
+def setup(options, name, client, risk=True, follow=True, sync_clock=True):
+    """
+    Starts the services around client in a fixed order: clock sync and
+    websocket orders (live only), the risk layer (follow as in start_risk),
+    client profiling, the shutdown handler, then the dashboard.
+    """
+    if not options.paper:
+        if sync_clock:
+            from time_sync import start_time_sync
+
+            start_time_sync(client)
+        if options.ws:
+            from ws_orders import start_ws_orders
+
+            start_ws_orders(client)
+    if risk:
+        from risk import start_risk
+
+        start_risk(client, follow=follow)
+    if options.profile:
+        instrument_client(client)   # after the ws/risk installs, which replace the order methods
+    shutdown.install()
+    if options.dashboard:
+        from dashboard import start_dashboard
+
+        start_dashboard(name, client)
+    return client
@@ -0,0 +1,383 @@
+import os
+import sys
+import json
+import time
+import heapq
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from client_factory import create_client
+from exchange_cache import get_exchange_info, get_symbol_filters, round_to_step
+from order_validation import fetch_market_data, validate_orders, print_violations
+from batch_orders import place_batch, cancel_batch, is_error
+from grid_layout import build_ladder
+from order_submit import submit_order, client_order_id
+from risk import start_risk
+from paper import PaperExchange, paper_flag
+from shutdown import shutdown, flush_logs
+from metrics import METRICS
+from dashboard import dashboard_flag, start_dashboard
+from profiling import profile_flag, start_profiling
+
+# -----------------------------------------------------
+# Setup
+# -----------------------------------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LOG_FILE = os.path.join(PROJECT_ROOT, "bot.log")
+STATE_FILE = os.getenv("SCHEDULER_STATE_FILE", os.path.join(PROJECT_ROOT, "data", "scheduler_state.json"))
+
+logging.basicConfig(
+    filename=LOG_FILE,
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+MAX_WORKERS = 4   # jobs that may run at the same time (a TWAP job runs for minutes)
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# -----------------------------------------------------
+# Job timing
+# -----------------------------------------------------
+def parse_every(value):
+    """
+    Seconds for 90, "90s", "15m", "6h" or "1d".
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip().lower()
+    if value[-1] in UNITS:
+        return float(value[:-1]) * UNITS[value[-1]]
+    return float(value)
+
+
+def next_run(job, after):
+    """
+    First run time strictly after `after`. Jobs with "at": "HH:MM" (UTC)
+    are anchored to that time of day and repeat every "every" from it;
+    others simply repeat every "every".
+    """
+    every = job["every_s"]
+    if not job.get("at"):
+        return after + every
+    hour, minute = (int(x) for x in job["at"].split(":"))
+    day = datetime.fromtimestamp(after, timezone.utc)
+    anchor = day.replace(hour=hour, minute=minute, second=0, microsecond=0).timestamp()
+    steps = (after - anchor) // every + 1
+    return anchor + steps * every
+
+
+def load_jobs(path):
+    """
+    Reads {"jobs": [...]} from a JSON config. Every job needs a unique
+    "name", a "type" (dca, twap or grid), a "symbol" and an "every".
+    """
+    with open(path) as f:
+        jobs = json.load(f)["jobs"]
+    names = set()
+    for job in jobs:
+        missing = [k for k in ("name", "type", "symbol", "every") if k not in job]
+        if missing:
+            raise ValueError(f"Job {job.get('name', '?')} is missing {', '.join(missing)}")
+        if job["type"] not in RUNNERS:
+            raise ValueError(f"Job {job['name']}: unknown type {job['type']} (use {', '.join(RUNNERS)})")
+        if job["name"] in names:
+            raise ValueError(f"Duplicate job name {job['name']}")
+        names.add(job["name"])
+        job["symbol"] = job["symbol"].upper()
+        job["side"] = job.get("side", "BUY").upper()
+        job["every_s"] = parse_every(job["every"])
+    return jobs
+
+# -----------------------------------------------------
+# Job runners (all share one warm client)
+# -----------------------------------------------------
+def run_dca(client, job, run_id, stopping):
+    """
+    One market order for a fixed "quantity", or for "quote" USDT at the
+    current price.
+    """
+    symbol, side = job["symbol"], job["side"]
+    filters = get_symbol_filters(client, symbol)
+    step = filters["step_size"] if filters else 0.001
+    price = float(client.ticker_price(symbol)["price"])
+    qty = job.get("quantity") or job["quote"] / price
+    qty = round_to_step(qty, step)
+    if filters and (qty < filters["min_qty"] or qty * price < filters["min_notional"]):
+        raise ValueError(f"{qty} {symbol} (~{qty * price:.2f} USDT) is below the exchange minimum")
+    stats = METRICS.strategy(job["name"], "dca", symbol, 1, "orders")
+    order = submit_order(client, client_order_id("dca", job["name"], run_id),
+                         symbol=symbol, side=side, type="MARKET", quantity=qty)
+    stats.on_order(order)
+    stats.step(1)
+    return f"{side} {qty} {symbol} at ~{price:.2f} (order {order.get('orderId')})"
+
+
+def run_twap(client, job, run_id, stopping):
+    """
+    "quantity" split into "slices" market orders "interval" seconds apart.
+    The last slice takes the remainder so the total is exact.
+    """
+    symbol, side = job["symbol"], job["side"]
+    quantity, num_slices, interval = job["quantity"], int(job["slices"]), parse_every(job["interval"])
+    filters = get_symbol_filters(client, symbol)
+    step = filters["step_size"] if filters else 0.001
+    chunk = round_to_step(quantity / num_slices, step)
+    stats = METRICS.strategy(job["name"], "twap", symbol, num_slices, "slices")
+    sent = 0.0
+    start = time.time()
+    for i in range(1, num_slices + 1):
+        qty = round_to_step(quantity - sent, step) if i == num_slices else chunk
+        if qty > 0:
+            order = submit_order(client, client_order_id("twapjob", job["name"], run_id, i),
+                                 symbol=symbol, side=side, type="MARKET", quantity=qty)
+            stats.on_order(order)
+            sent += qty
+            logging.info(f"Job {job['name']}: slice {i}/{num_slices} {side} {qty} {symbol}")
+        stats.step(i)
+        if i < num_slices and stopping.wait(max(0.0, start + i * interval - time.time())):
+            return f"stopped after {i}/{num_slices} slices, {sent} {symbol} sent"
+    return f"{side} {sent} {symbol} in {num_slices} slices"
+
+
+def grid_prefix(job):
+    # Stable per job, so a rebuild can find the previous run's orders
+    return "g" + hashlib.sha1(job["name"].encode()).hexdigest()[:10] + "-"
+
+
+def run_grid(client, job, run_id, stopping):
+    """
+    Cancels the job's previous ladder and lays a new one of "grids" levels
+    within ±"range_pct" % of the current price.
+    """
+    symbol, quantity = job["symbol"], job["quantity"]
+    prefix = grid_prefix(job)
+    old = [o["orderId"] for o in client.get_orders(symbol=symbol) if o["clientOrderId"].startswith(prefix)]
+    cancelled = sum(1 for r in cancel_batch(client, symbol, old) if not is_error(r))
+
+    market = fetch_market_data(client, [symbol])
+    mid = market["prices"][symbol]
+    filters = market["filters"].get(symbol)
+    tick_size = filters["tick_size"] if filters else 0.01
+    pct = job.get("range_pct", 5) / 100
+    buys, sells = build_ladder(mid * (1 - pct), mid * (1 + pct), int(job["grids"]), job.get("mode", "arithmetic"),
+                               tick_size, mid)
+    ladder = [{"symbol": symbol, "side": "BUY", "type": "LIMIT", "quantity": quantity, "price": p} for p in buys]
+    ladder += [{"symbol": symbol, "side": "SELL", "type": "LIMIT", "quantity": quantity, "price": p} for p in sells]
+    violations = validate_orders(client, ladder, market=market)
+    if violations:
+        print_violations(violations)
+        raise ValueError(f"grid rejected by pre-trade validation ({len(violations)} violations)")
+    for i, order in enumerate(ladder):
+        order.update(timeInForce="GTC", newClientOrderId=f"{prefix}{run_id}-{i}")
+    stats = METRICS.strategy(job["name"], "grid", symbol, len(ladder), "levels")
+    placed = 0
+    for result in place_batch(client, ladder):
+        if not is_error(result):
+            stats.on_order(result)
+            placed += 1
+    stats.step(placed)
+    return f"cancelled {cancelled}, placed {placed}/{len(ladder)} levels around {mid:.2f}"
+
+
+RUNNERS = {"dca": run_dca, "twap": run_twap, "grid": run_grid}
+
+# -----------------------------------------------------
+# Scheduler
+# -----------------------------------------------------
+class Scheduler:
+    """
+    Runs recurring jobs from one process. Due times sit in a heap, so the
+    loop sleeps exactly until the earliest one; each run goes to a worker
+    thread and the job's next time is pushed at dispatch, keeping the
+    schedule fixed however long a run takes. A job that is still running
+    when it comes due again skips that occurrence.
+
+    Job state (last run, next run, outcome) is saved after every change, so
+    a restart resumes the schedule: a run missed while the process was down
+    happens once on start-up, not once per missed occurrence. Client order
+    ids derive from the job name and scheduled time, so order submission
+    retries stay idempotent.
+    """
+
+    def __init__(self, client, jobs, state_file=STATE_FILE, max_workers=MAX_WORKERS):
+        self.client = client
+        self.jobs = {job["name"]: job for job in jobs}
+        self.state_file = state_file
+        self.state = self._load_state()
+        self.heap = []
+        self.seq = 0
+        self.running = set()
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = threading.Event()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+
+        now = time.time()
+        for name, job in self.jobs.items():
+            self._push(self.state.get(name, {}).get("next_run") or next_run(job, now), name)
+            next_due = _fmt(self.state[name]["next_run"], "%H:%M:%S")
+            METRICS.strategy(name, job["type"], job["symbol"]).step(status=f"next {next_due}")
+
+    # -------------------------------------------------
+    # State
+    # -------------------------------------------------
+    def _load_state(self):
+        try:
+            with open(self.state_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        # Called under self.lock
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            tmp = self.state_file + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.state, f, indent=1)
+            os.replace(tmp, self.state_file)
+        except OSError as e:
+            logging.warning(f"Could not save scheduler state: {e}")
+
+    def _push(self, due, name):
+        self.seq += 1
+        heapq.heappush(self.heap, (due, self.seq, name))
+        self.state.setdefault(name, {})["next_run"] = due
+
+    # -------------------------------------------------
+    # Loop
+    # -------------------------------------------------
+    def run(self):
+        while not self.stopping.is_set():
+            with self.lock:
+                due, _, name = self.heap[0]
+                delay = due - time.time()
+                if delay <= 0:
+                    heapq.heappop(self.heap)
+                    job = self.jobs[name]
+                    self._push(next_run(job, max(due, time.time())), name)
+                    if name in self.running:
+                        msg = f"⏭️ {name}: previous run still going, skipping the {_fmt(due)} run"
+                        print(msg)
+                        logging.warning(msg)
+                    else:
+                        self.running.add(name)
+                        self.pool.submit(self._run_job, job, due)
+                    self._save_state()
+                    continue
+            self.wake.wait(delay)
+            self.wake.clear()
+
+    def _run_job(self, job, due):
+        name = job["name"]
+        started = time.time()
+        logging.info(f"Job {name} started ({(started - due) * 1000:.0f} ms after schedule)")
+        try:
+            result = RUNNERS[job["type"]](self.client, job, int(due), self.stopping)
+            status, detail = "ok", result
+            msg = f"✅ {name}: {result}"
+        except Exception as e:
+            status, detail = "error", str(e)
+            msg = f"❌ {name} failed: {e}"
+        print(msg)
+        if status == "ok":
+            logging.info(msg)
+        else:
+            logging.error(msg)
+        with self.lock:
+            self.running.discard(name)
+            state = self.state.setdefault(name, {})
+            state.update(last_run=due, last_status=status, last_detail=detail,
+                         runs=state.get("runs", 0) + 1, duration=round(time.time() - started, 3))
+            self._save_state()
+            stats = METRICS.strategies.get(name)
+            if stats is not None:
+                stats.finish(f"{status}, next {_fmt(state['next_run'], '%H:%M:%S')}")
+
+    def stop(self):
+        self.stopping.set()
+        self.wake.set()
+        self.pool.shutdown(wait=True)
+        with self.lock:
+            self._save_state()
+
+    def print_schedule(self):
+        print(f"{'job':<20}{'type':<6}{'symbol':<12}{'next run (UTC)':<22}{'last':<8}runs")
+        for due, _, name in sorted(self.heap):
+            job, state = self.jobs[name], self.state.get(name, {})
+            print(f"{name:<20}{job['type']:<6}{job['symbol']:<12}{_fmt(due):<22}"
+                  f"{state.get('last_status', '-'):<8}{state.get('runs', 0)}")
+
+
+def _fmt(ts, spec="%Y-%m-%d %H:%M:%S"):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime(spec)
+
+# -----------------------------------------------------
+# Helper: Validate user input
+# -----------------------------------------------------
+def validate_args(args):
+    if len(args) < 2:
+        print("Usage: python scheduler.py <schedule.json> [--list] [--paper] [--dashboard] [--profile]")
+        sys.exit(1)
+    try:
+        jobs = load_jobs(args[1])
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Invalid schedule file: {e}")
+        sys.exit(1)
+    if not jobs:
+        print("❌ The schedule file has no jobs.")
+        sys.exit(1)
+    return jobs
+
+# -----------------------------------------------------
+# Entry point
+# -----------------------------------------------------
+if __name__ == "__main__":
+    args = sys.argv[:]
+    paper = paper_flag(args)
+    profile = profile_flag(args)
+    dashboard = dashboard_flag(args)
+    list_only = "--list" in args
+    if list_only:
+        args.remove("--list")
+    jobs = validate_args(args)
+
+    client = create_client()
+    if paper:
+        client = PaperExchange(client).start(symbols=sorted({j["symbol"] for j in jobs}))
+    scheduler = Scheduler(client, jobs)
+    scheduler.print_schedule()
+    if list_only:
+        sys.exit(0)
+
+    if not paper:
+        from time_sync import start_time_sync
+
+        start_time_sync(client)
+    start_risk(client)
+    if profile:
+        start_profiling("scheduler", client)
+    get_exchange_info(client)  # warm the filter cache once for every job
+    # Shutdown stops dispatching and tells running jobs to wind down; grid
+    # ladders are left working, as they are between scheduled runs
+    shutdown.install()
+    shutdown.add_callback(scheduler.stopping.set)
+    shutdown.add_callback(scheduler.wake.set)
+    if dashboard:
+        start_dashboard("scheduler", client)
+    print(f"\n⏰ Scheduler running {len(jobs)} jobs (Ctrl-C to stop)...")
+    logging.info(f"Scheduler started with {len(jobs)} jobs")
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        print("\n⏹️ Stopping scheduler...")
+    finally:
+        interrupted = sorted(scheduler.running)
+        scheduler.stop()
+        if interrupted:
+            print(f"🛑 Stopped early: {', '.join(interrupted)}")
+        logging.info("Scheduler stopped.")
+        flush_logs()
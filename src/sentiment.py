@@ -0,0 +1,289 @@
+import abc
+import math
+import time
+import heapq
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import METRICS
+
+# -----------------------------------------------------
+# Multi-source sentiment engine
+# -----------------------------------------------------
+# Every feed turns its raw value into a signal in [-1, 1]
+# (-1 = extreme fear / bearish crowding, +1 = extreme greed / bullish crowding).
+# The engine blends the EWMA-smoothed signals by weight and keeps the result
+# precomputed, so strategies can read it on every slice in O(1).
+FEAR_THRESHOLD = 25    # index_value() at or below this is "Extreme Fear"
+GREED_THRESHOLD = 75   # index_value() at or above this is "Extreme Greed"
+# Feed z-scores are squashed with tanh(z / SIGNAL_SCALE). Blending four feeds
+# averages their extremes away: in simulation, at 2 the composite reached the
+# thresholds above on 2-10% of readings, at 1 (one std reads ±0.76) on 9-23%,
+# depending on how correlated the feeds are.
+SIGNAL_SCALE = 1.0
+SIGNAL_ALPHA = 0.3   # EWMA weight of a feed's newest signal
+
+
+class RollingStats:
+    """
+    Incremental EWMA plus rolling mean / std over the last `window` values.
+    """
+
+    def __init__(self, window=50, alpha=0.3):
+        self.window = window
+        self.alpha = alpha
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.ewma = None
+
+    def update(self, x):
+        self.values.append(x)
+        self.total += x
+        self.total_sq += x * x
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+        self.ewma = x if self.ewma is None else self.alpha * x + (1 - self.alpha) * self.ewma
+
+    def zscore(self, x):
+        n = len(self.values)
+        if n < 2:
+            return 0.0
+        mean = self.total / n
+        var = max(self.total_sq / n - mean * mean, 0.0)
+        std = math.sqrt(var)
+        return (x - mean) / std if std > 0 else 0.0
+
+
+class SentimentFeed(abc.ABC):
+    """
+    Base class for a sentiment input. Subclasses implement fetch() (latest
+    raw value) and optionally history() (raw values to seed the statistics).
+    The default signal is the rolling z-score squashed into [-1, 1].
+    """
+
+    name = "feed"
+    interval = 60
+
+    def __init__(self, weight=1.0, interval=None):
+        self.weight = weight
+        self.interval = interval or self.interval
+        self.stats = RollingStats()
+        self.seeded = False   # history() pushed into stats, once
+        self.raw = None
+        self.signal = None
+        self.updated = 0.0
+
+    @abc.abstractmethod
+    def fetch(self):
+        """Latest raw value."""
+
+    def history(self):
+        return []
+
+    def to_signal(self, raw):
+        return math.tanh(self.stats.zscore(raw) / SIGNAL_SCALE)
+
+    def refresh(self):
+        if not self.seeded:
+            # A failing fetch() below must not seed the history again on retry
+            for value in self.history():
+                self.stats.update(value)
+            self.seeded = True
+        raw = self.fetch()
+        self.stats.update(raw)
+        self.raw = raw
+        signal = max(-1.0, min(1.0, self.to_signal(raw)))
+        self.signal = signal if self.signal is None else SIGNAL_ALPHA * signal + (1 - SIGNAL_ALPHA) * self.signal
+        self.updated = time.time()
+
+
+class FearGreedFeed(SentimentFeed):
+    """
+    alternative.me Fear & Greed index (updates daily).
+    """
+
+    name = "fear_greed"
+    interval = 3600
+    URL = "https://api.alternative.me/fng/?limit=1"
+
+    def fetch(self):
+        import requests
+
+        response = requests.get(self.URL, timeout=10)
+        response.raise_for_status()
+        data = response.json()["data"][0]
+        self.classification = data["value_classification"]
+        return int(data["value"])
+
+    def to_signal(self, raw):
+        return (raw - 50) / 50
+
+
+class FundingRateFeed(SentimentFeed):
+    """
+    Current funding rate from the premium index; high positive funding means
+    crowded longs.
+    """
+
+    name = "funding_rate"
+    interval = 60
+
+    def __init__(self, client, symbol, **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+        self.symbol = symbol
+
+    def history(self):
+        return [float(r["fundingRate"]) for r in self.client.funding_rate(symbol=self.symbol, limit=50)]
+
+    def fetch(self):
+        return float(self.client.mark_price(self.symbol)["lastFundingRate"])
+
+
+class OpenInterestFeed(SentimentFeed):
+    """
+    Percentage change of open interest over the last 5 minutes; fast
+    leverage build-up reads as greed.
+    """
+
+    name = "open_interest"
+    interval = 300
+
+    def __init__(self, client, symbol, **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+        self.symbol = symbol
+
+    def _changes(self, limit):
+        rows = self.client.open_interest_hist(symbol=self.symbol, period="5m", limit=limit)
+        values = [float(r["sumOpenInterest"]) for r in rows]
+        return [(b - a) / a * 100 for a, b in zip(values, values[1:]) if a > 0]
+
+    def history(self):
+        return self._changes(50)[:-1]
+
+    def fetch(self):
+        changes = self._changes(2)
+        return changes[-1] if changes else 0.0
+
+
+class LongShortRatioFeed(SentimentFeed):
+    """
+    Global long/short account ratio; more accounts long reads as greed.
+    """
+
+    name = "long_short_ratio"
+    interval = 300
+
+    def __init__(self, client, symbol, **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+        self.symbol = symbol
+
+    def history(self):
+        rows = self.client.long_short_account_ratio(symbol=self.symbol, period="5m", limit=50)
+        return [float(r["longShortRatio"]) for r in rows][:-1]
+
+    def fetch(self):
+        rows = self.client.long_short_account_ratio(symbol=self.symbol, period="5m", limit=1)
+        return float(rows[-1]["longShortRatio"])
+
+
+class SentimentEngine:
+    """
+    Refreshes each feed on its own cadence in a background thread and keeps
+    the weighted composite ready for O(1) reads via score(), index_value()
+    and classification().
+    """
+
+    def __init__(self, feeds):
+        self.feeds = list(feeds)
+        self.lock = threading.Lock()
+        self._score = 0.0
+        self.running = False
+
+    @classmethod
+    def default(cls, client, symbol):
+        return cls([
+            FearGreedFeed(weight=1.0),
+            FundingRateFeed(client, symbol, weight=1.0),
+            OpenInterestFeed(client, symbol, weight=0.5),
+            LongShortRatioFeed(client, symbol, weight=0.5),
+        ])
+
+    def start(self):
+        """
+        Refreshes every feed once (concurrently), then keeps them fresh in
+        the background.
+        """
+        with ThreadPoolExecutor(max_workers=len(self.feeds) or 1) as pool:
+            list(pool.map(self._refresh, self.feeds))
+        self.running = True
+        METRICS.watch("sentiment", self)
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        METRICS.unwatch("sentiment", self)
+
+    def _refresh(self, feed):
+        try:
+            feed.refresh()
+        except Exception as e:
+            print(f"⚠️ Could not refresh sentiment feed {feed.name}: {e}")
+            logging.warning(f"Sentiment feed {feed.name} failed: {e}")
+        self._recompute()
+
+    def _recompute(self):
+        live = [(f.weight, f.signal) for f in self.feeds if f.signal is not None]
+        total = sum(w for w, _ in live)
+        with self.lock:
+            self._score = sum(w * s for w, s in live) / total if total else 0.0
+
+    def _run(self):
+        due = [(time.time() + f.interval, i) for i, f in enumerate(self.feeds)]
+        heapq.heapify(due)
+        while self.running and due:
+            next_time, i = heapq.heappop(due)
+            time.sleep(max(0.0, next_time - time.time()))
+            if not self.running:
+                break
+            self._refresh(self.feeds[i])
+            heapq.heappush(due, (time.time() + self.feeds[i].interval, i))
+
+    # -------------------------------------------------
+    # O(1) readers
+    # -------------------------------------------------
+    def score(self):
+        return self._score
+
+    def index_value(self):
+        """
+        Composite on the familiar 0–100 Fear & Greed scale.
+        """
+        return int(round(50 + 50 * self._score))
+
+    def classification(self):
+        value = self.index_value()
+        if value <= FEAR_THRESHOLD:
+            return "Extreme Fear"
+        if value < 45:
+            return "Fear"
+        if value <= 55:
+            return "Neutral"
+        if value < GREED_THRESHOLD:
+            return "Greed"
+        return "Extreme Greed"
+
+    def snapshot(self):
+        return {
+            "score": self._score,
+            "index": self.index_value(),
+            "feeds": {f.name: {"raw": f.raw, "signal": f.signal, "updated": f.updated} for f in self.feeds},
+        }
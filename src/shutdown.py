@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+import signal
+import logging
+import threading
+
+# -----------------------------------------------------
+# Graceful shutdown
+# -----------------------------------------------------
+# The first Ctrl-C / SIGTERM only sets `requested`: strategy loops check it
+# between slices or levels, so no order is ever cut off mid-request, then
+# cancel what they have working and print a summary. Teardown is bounded:
+# if the process is still alive SHUTDOWN_DEADLINE seconds later, logs are
+# flushed and it exits anyway. A second Ctrl-C exits at once.
+SHUTDOWN_DEADLINE = float(os.getenv("SHUTDOWN_DEADLINE", "10"))
+
+
+class GracefulShutdown:
+    def __init__(self, deadline=SHUTDOWN_DEADLINE):
+        self.deadline = deadline
+        self.requested = threading.Event()
+        self.requested_at = None
+        self.callbacks = []
+        self.exit_hooks = []
+
+    def install(self):
+        """
+        Routes SIGINT and SIGTERM here. Must be called from the main thread.
+        """
+        signal.signal(signal.SIGINT, self._handle)
+        signal.signal(signal.SIGTERM, self._handle)
+        return self
+
+    def add_callback(self, callback):
+        """
+        callback() runs as soon as shutdown is requested; keep it quick
+        (set an event, close a socket).
+        """
+        self.callbacks.append(callback)
+
+    def add_exit_hook(self, callback):
+        """
+        callback() runs just before a forced exit at the deadline, when
+        atexit handlers are skipped (e.g. to restore the terminal).
+        """
+        self.exit_hooks.append(callback)
+
+    def _handle(self, signum, frame):
+        if self.requested.is_set():
+            raise KeyboardInterrupt
+        self.request(signal.Signals(signum).name)
+
+    def request(self, reason="requested"):
+        if self.requested.is_set():
+            return
+        self.requested_at = time.time()
+        self.requested.set()
+        print(f"\n🛑 Shutdown {reason}: finishing up within {self.deadline:.0f}s (Ctrl-C again to exit now)...")
+        logging.warning(f"Shutdown {reason}")
+        threading.Thread(target=self._watchdog, daemon=True).start()
+        for callback in self.callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"❌ Shutdown callback failed: {e}")
+
+    def _watchdog(self):
+        time.sleep(self.deadline)
+        for callback in self.exit_hooks:
+            try:
+                callback()
+            except Exception:
+                pass
+        print(f"⚠️ Shutdown deadline of {self.deadline:.0f}s passed, exiting now.")
+        logging.error("Shutdown deadline passed; exiting without finishing cleanup.")
+        flush_logs()
+        os._exit(1)
+
+    def sleep(self, seconds):
+        """
+        Sleeps up to `seconds`; returns True (early) if shutdown was requested.
+        """
+        return self.requested.wait(max(0.0, seconds))
+
+    def remaining(self):
+        """
+        Seconds left before the deadline (the full deadline if not requested).
+        """
+        if self.requested_at is None:
+            return self.deadline
+        return max(0.0, self.deadline - (time.time() - self.requested_at))
+
+
+def cancel_working(client, symbol, order_ids=None):
+    """
+    Cancels a strategy's working orders in as few requests as possible:
+    the given ids through batch cancels, or every open order on symbol
+    through one cancel_open_orders call. Returns how many were cancelled
+    (None when cancel_open_orders does not say).
+    """
+    from batch_orders import cancel_batch, is_error
+
+    try:
+        if order_ids is None:
+            client.cancel_open_orders(symbol=symbol)
+            return None
+        return sum(1 for r in cancel_batch(client, symbol, order_ids) if not is_error(r))
+    except Exception as e:
+        err = f"❌ Could not cancel working {symbol} orders: {e}"
+        print(err)
+        logging.error(err)
+        return 0
+
+
+def flush_logs():
+    for handler in logging.root.handlers:
+        try:
+            handler.flush()
+        except Exception:
+            pass
+    sys.stdout.flush()
+
+
+shutdown = GracefulShutdown()
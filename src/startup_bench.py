@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import subprocess
+
+# -----------------------------------------------------
+# CLI start-up benchmark
+# -----------------------------------------------------
+# Guards the lazy-import structure of the order entry points: importing a
+# script must stay under IMPORT_BUDGET_MS and must not load the connector
+# (binance, requests, urllib3, dotenv) before arguments are checked.
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+# Paths relative to src/, without .py
+ENTRY_POINTS = ["market_orders", "limit_orders", "market_data", "advanced/oco", "advanced/stop_limit_orders"]
+HEAVY_MODULES = ("binance", "requests", "urllib3", "dotenv")
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "60"))
+RUNS = 5
+
+
+def _locate(entry):
+    # "advanced/oco" -> (src/advanced, "oco")
+    directory, module = os.path.split(entry)
+    return os.path.join(SRC_DIR, directory), module
+
+
+def import_profile(entry):
+    """
+    Runs `python -X importtime -c "import <module>"` and returns
+    {imported module: cumulative microseconds}. entry=None profiles bare
+    interpreter start-up (site, .pth hooks) as a baseline.
+    """
+    cwd, module = _locate(entry) if entry else (SRC_DIR, None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}" if module else "pass"],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def usage_exit_ms(entry):
+    """
+    Wall time of running the script with no arguments (usage error path),
+    i.e. the cost a bad scripted invocation pays.
+    """
+    cwd, module = _locate(entry)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, f"{module}.py"], cwd=cwd, capture_output=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(entry, baseline=()):
+    module = _locate(entry)[1]
+    profiles = [import_profile(entry) for _ in range(RUNS)]
+    import_ms = sorted(p.get(module, 0) for p in profiles)[RUNS // 2] / 1000
+    heavy = sorted({name for name in profiles[0] if name.split(".")[0] in HEAVY_MODULES})
+    exit_ms = sorted(usage_exit_ms(entry) for _ in range(RUNS))[RUNS // 2]
+    slowest = sorted(((us, name) for name, us in profiles[0].items() if name != module and name not in baseline), reverse=True)[:5]
+    return import_ms, exit_ms, heavy, slowest
+
+
+if __name__ == "__main__":
+    failed = False
+    baseline = set(import_profile(None))
+    for module in sys.argv[1:] or ENTRY_POINTS:
+        import_ms, exit_ms, heavy, slowest = bench(module, baseline)
+        ok = import_ms <= IMPORT_BUDGET_MS and not heavy
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} {module}: import {import_ms:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms), "
+              f"usage exit {exit_ms:.0f} ms")
+        for us, name in slowest:
+            print(f"     {us / 1000:7.1f} ms  {name}")
+        if heavy:
+            print(f"     heavy modules loaded at import: {', '.join(heavy)}")
+    sys.exit(1 if failed else 0)
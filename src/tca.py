@@ -0,0 +1,209 @@
+import sys
+import json
+import time
+import logging
+import os
+
+from records import FillHistory
+
+# -----------------------------------------------------
+# Transaction cost analysis (TCA)
+# -----------------------------------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+REPORT_DIR = os.getenv("REPORT_DIR", os.path.join(PROJECT_ROOT, "reports"))
+TRADE_LIMIT = 1000
+FILL_GRACE_MS = 5000  # fills can land a little after the last order was sent
+
+
+class ExecutionRecorder:
+    """
+    Collects what a strategy intended and when it acted, so fills can be
+    matched back to the parent order afterwards:
+      recorder = ExecutionRecorder(client, "BTCUSDT", "BUY", 0.05, arrival_price)
+      recorder.record(scheduled_ts, sent_ts, order)   # once per child order
+      recorder.finish()                              # fetch fills, write report
+    """
+
+    def __init__(self, client, symbol, side, target_qty, arrival_price, strategy="twap"):
+        self.client = client
+        self.symbol = symbol
+        self.side = side
+        self.target_qty = target_qty
+        self.arrival_price = arrival_price
+        self.strategy = strategy
+        self.start_ms = int(time.time() * 1000)
+        self.order_ids = set()
+        self.drifts_ms = []
+
+    def record(self, scheduled, sent, order=None):
+        """
+        scheduled / sent are time.time() values for one child order.
+        """
+        self.drifts_ms.append((sent - scheduled) * 1000)
+        if order and "orderId" in order:
+            self.order_ids.add(order["orderId"])
+
+    def add_order(self, order_id):
+        self.order_ids.add(order_id)
+
+    def finish(self, write=True):
+        try:
+            end_ms = int(time.time() * 1000)
+            fills = fetch_fills(self.client, self.symbol, self.start_ms, end_ms + FILL_GRACE_MS, self.order_ids)
+            volume = market_volume(self.client, self.symbol, self.start_ms, end_ms)
+            report = build_report(self.symbol, self.side, self.target_qty, self.arrival_price, fills,
+                                  volume, self.drifts_ms, self.start_ms, end_ms, self.strategy)
+        except Exception as e:
+            err = f"❌ Could not build TCA report: {e}"
+            print(err)
+            logging.error(err)
+            return None
+        print_report(report)
+        if write:
+            write_report(report)
+        return report
+
+# -----------------------------------------------------
+# Data collection
+# -----------------------------------------------------
+def fetch_fills(client, symbol, start_ms, end_ms, order_ids=None):
+    """
+    Account trades in [start_ms, end_ms], optionally restricted to the
+    child orders of one parent. Pages forward by trade id; the pages are
+    kept in a FillHistory, not as trade dicts, until the window is read.
+    """
+    history = FillHistory()
+    trades = client.get_account_trades(symbol=symbol, startTime=start_ms, endTime=end_ms, limit=TRADE_LIMIT)
+    for t in trades:
+        history.append(t)
+    while len(trades) == TRADE_LIMIT:
+        trades = client.get_account_trades(symbol=symbol, fromId=trades[-1]["id"] + 1, limit=TRADE_LIMIT)
+        trades = [t for t in trades if t["time"] <= end_ms]
+        for t in trades:
+            history.append(t)
+    return [{
+        "order_id": t["orderId"], "side": t["side"], "price": float(t["price"]), "qty": float(t["qty"]),
+        "fee": float(t["commission"]), "fee_asset": t["commissionAsset"], "time": t["time"],
+    } for t in history if not order_ids or t["orderId"] in order_ids]
+
+
+def market_volume(client, symbol, start_ms, end_ms):
+    """
+    Traded base volume over the execution window from 1m klines.
+    """
+    bars = client.klines(symbol, "1m", startTime=start_ms, endTime=end_ms, limit=1500)
+    return sum(float(b[5]) for b in bars)
+
+# -----------------------------------------------------
+# Metrics
+# -----------------------------------------------------
+def build_report(symbol, side, target_qty, arrival_price, fills, volume, drifts_ms, start_ms, end_ms, strategy="twap"):
+    """
+    arrival price    mid/last price when the parent order started
+    vwap             volume-weighted average fill price
+    shortfall_bps    signed cost vs arrival (positive = worse than arrival),
+                     BUY fills pay price - arrival, SELL fills arrival - price
+    participation    our filled qty / market volume over the window
+    drift            how late each child order went out vs its schedule
+    """
+    filled = sum(f["qty"] for f in fills)
+    notional = sum(f["price"] * f["qty"] for f in fills)
+    vwap = notional / filled if filled else None
+    cost = sum((1 if f["side"] == "BUY" else -1) * (f["price"] - arrival_price) * f["qty"] for f in fills) if arrival_price else 0.0
+    shortfall_bps = cost / (arrival_price * filled) * 1e4 if filled and arrival_price else None
+
+    return {
+        "strategy": strategy,
+        "symbol": symbol,
+        "side": side,
+        "start_ms": start_ms,
+        "end_ms": end_ms,
+        "target_qty": target_qty,
+        "filled_qty": filled,
+        "fill_ratio": filled / target_qty if target_qty else None,
+        "child_orders": len({f["order_id"] for f in fills}),
+        "fills": len(fills),
+        "arrival_price": arrival_price,
+        "vwap": vwap,
+        "shortfall_bps": shortfall_bps,
+        "shortfall_quote": cost,
+        "fees": sum(f["fee"] for f in fills),
+        "participation": filled / volume if volume else None,
+        "market_volume": volume,
+        "drift_avg_ms": sum(drifts_ms) / len(drifts_ms) if drifts_ms else None,
+        "drift_max_ms": max(drifts_ms) if drifts_ms else None,
+    }
+
+
+def print_report(report):
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else "n/a"
+
+    print(f"\n📈 TCA {report['strategy']} {report['side']} {report['symbol']}")
+    print(f"   Filled:        {report['filled_qty']} / {report['target_qty']} in {report['fills']} fills")
+    print(f"   Arrival price: {fmt(report['arrival_price'], '.2f')}")
+    print(f"   VWAP:          {fmt(report['vwap'], '.2f')}")
+    print(f"   Shortfall:     {fmt(report['shortfall_bps'], '.2f')} bps ({report['shortfall_quote']:.4f} quote)")
+    print(f"   Participation: {fmt(report['participation'] and report['participation'] * 100, '.3f')}% of market volume")
+    print(f"   Slice drift:   avg {fmt(report['drift_avg_ms'], '.0f')} ms, max {fmt(report['drift_max_ms'], '.0f')} ms")
+
+
+def write_report(report, report_dir=REPORT_DIR):
+    """
+    One JSON line per run in <REPORT_DIR>/tca.jsonl, so runs with different
+    intervals or slicing can be compared side by side.
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    path = os.path.join(report_dir, "tca.jsonl")
+    with open(path, "a") as f:
+        f.write(json.dumps(report, separators=(",", ":")) + "\n")
+    logging.info(f"TCA report written to {path}: {report}")
+    return path
+
+# -----------------------------------------------------
+# Helper: Validate user input
+# -----------------------------------------------------
+def validate_args(args):
+    if len(args) < 3:
+        print("Usage: python tca.py <symbol> <minutes_back>")
+        sys.exit(1)
+    try:
+        minutes = float(args[2])
+    except ValueError:
+        minutes = 0
+    if minutes <= 0:
+        print("❌ minutes_back must be a positive number.")
+        sys.exit(1)
+    return args[1].upper(), minutes
+
+# -----------------------------------------------------
+# Entry point: report on every fill in a recent window (e.g. a grid run)
+# -----------------------------------------------------
+if __name__ == "__main__":
+    symbol, minutes = validate_args(sys.argv)
+
+    from binance.um_futures import UMFutures
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    client = UMFutures(key=os.getenv("API_KEY"), secret=os.getenv("API_SECRET"),
+                       base_url=os.getenv("BASE_URL", "https://testnet.binancefuture.com"))
+    logging.basicConfig(
+        filename=os.path.join(PROJECT_ROOT, "bot.log"),
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    end_ms = int(time.time() * 1000)
+    start_ms = end_ms - int(minutes * 60000)
+    try:
+        first_bar = client.klines(symbol, "1m", startTime=start_ms, limit=1)
+        arrival = float(first_bar[0][1]) if first_bar else None
+        fills = fetch_fills(client, symbol, start_ms, end_ms)
+        volume = market_volume(client, symbol, start_ms, end_ms)
+    except Exception as e:
+        print(f"❌ Could not fetch trades: {e}")
+        sys.exit(1)
+    report = build_report(symbol, "MIXED", None, arrival, fills, volume, [], start_ms, end_ms, "window")
+    print_report(report)
+    print(f"\n📝 Report appended to {write_report(report)}")
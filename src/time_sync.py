@@ -0,0 +1,135 @@
+import time
+import logging
+import threading
+from statistics import median
+
+from metrics import METRICS
+
+# -----------------------------------------------------
+# Server time synchronisation
+# -----------------------------------------------------
+SYNC_INTERVAL = 60       # seconds between background samples
+WINDOW = 15              # samples kept for the estimate
+MIN_RECV_WINDOW = 5000   # ms, exchange default
+MAX_RECV_WINDOW = 60000  # ms, exchange maximum
+
+
+class TimeSync:
+    """
+    Keeps an estimate of (server time - local time) so signed requests are
+    not rejected with -1021. Each sample is offset = server - midpoint of the
+    request; only the lowest-RTT half of recent samples is trusted, since
+    slow round trips give the least precise midpoint.
+
+    install(client) corrects the timestamp on every signed request in the
+    process, adds a recvWindow sized from observed RTT jitter, and resyncs
+    once and retries if the exchange still answers -1021.
+    """
+
+    def __init__(self, client, interval=SYNC_INTERVAL):
+        self.client = client
+        self.interval = interval
+        self.samples = []          # (rtt_ms, offset_ms)
+        self.offset_ms = 0.0
+        self.rtt_ms = 0.0
+        self.recv_window = MIN_RECV_WINDOW
+        self.lock = threading.Lock()
+        self.running = False
+
+    # -------------------------------------------------
+    # Sampling
+    # -------------------------------------------------
+    def sample(self):
+        t0 = time.time() * 1000
+        server = self.client.time()["serverTime"]
+        t1 = time.time() * 1000
+        rtt = t1 - t0
+        offset = server - (t0 + t1) / 2
+
+        with self.lock:
+            self.samples.append((rtt, offset))
+            self.samples = self.samples[-WINDOW:]
+            trusted = sorted(self.samples)[:max(1, len(self.samples) // 2)]
+            self.offset_ms = median(o for _, o in trusted)
+            self.rtt_ms = median(r for r, _ in trusted)
+            worst_rtt = max(r for r, _ in self.samples)
+            spread = max(o for _, o in trusted) - min(o for _, o in trusted)
+            self.recv_window = int(min(MAX_RECV_WINDOW, max(MIN_RECV_WINDOW, 2 * worst_rtt + spread + 1000)))
+        return offset
+
+    def resync(self, samples=3):
+        for _ in range(samples):
+            try:
+                self.sample()
+            except Exception as e:
+                logging.error(f"❌ Time sync sample failed: {e}")
+        logging.info(f"Time sync: offset {self.offset_ms:.1f} ms, rtt {self.rtt_ms:.1f} ms, recvWindow {self.recv_window} ms")
+
+    def start(self):
+        self.resync(samples=1)
+        self.running = True
+        METRICS.watch("time_sync", self)
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        METRICS.unwatch("time_sync", self)
+
+    def _run(self):
+        while self.running:
+            time.sleep(self.interval)
+            try:
+                self.sample()
+            except Exception as e:
+                logging.error(f"❌ Time sync sample failed: {e}")
+
+    # -------------------------------------------------
+    # Applying the correction
+    # -------------------------------------------------
+    def timestamp(self):
+        return int(time.time() * 1000 + self.offset_ms)
+
+    def metrics(self):
+        with self.lock:
+            return {"offset_ms": self.offset_ms, "rtt_ms": self.rtt_ms, "recv_window": self.recv_window,
+                    "samples": len(self.samples)}
+
+    def install(self, client=None):
+        """
+        Patches the connector so every signed request uses the corrected
+        timestamp and an adaptive recvWindow.
+        """
+        import binance.api
+        from binance.error import ClientError
+
+        client = client or self.client
+        binance.api.get_timestamp = self.timestamp
+        sign_request = client.sign_request
+
+        def synced_sign_request(http_method, url_path, payload=None, special=False):
+            payload = dict(payload or {})
+            payload.setdefault("recvWindow", self.recv_window)
+            try:
+                return sign_request(http_method, url_path, dict(payload), special)
+            except ClientError as e:
+                if e.error_code != -1021:
+                    raise
+                logging.warning("Timestamp rejected (-1021), resyncing clock and retrying once.")
+                self.resync()
+                payload["recvWindow"] = self.recv_window
+                return sign_request(http_method, url_path, dict(payload), special)
+
+        client.sign_request = synced_sign_request
+        return self
+
+
+def start_time_sync(client):
+    """
+    Starts background sync for client and installs the correction.
+    """
+    try:
+        return TimeSync(client).start().install()
+    except Exception as e:
+        print(f"⚠️ Could not start time sync: {e}")
+        return None
@@ -0,0 +1,96 @@
+import os
+import time
+import logging
+import threading
+
+STREAM_URL = os.getenv("STREAM_URL", "wss://stream.binancefuture.com")
+KEEPALIVE_SECONDS = 30 * 60  # listen keys expire after 60 minutes
+CONNECT_TIMEOUT = 5
+PING_INTERVAL = 60
+
+# -----------------------------------------------------
+# User-data stream (order / fill events)
+# -----------------------------------------------------
+def open_user_stream(client):
+    """
+    An unstarted user-data stream for client: the paper engine's own
+    events in --paper mode, the exchange websocket otherwise.
+    """
+    paper_stream = getattr(client, "user_stream", None)
+    if paper_stream is not None:
+        return paper_stream()
+    return UserDataStream(client)
+
+
+class UserDataStream:
+    """
+    Opens one user-data websocket per process and fans every event out to
+    registered listeners, e.g. listener(event) with event["e"] == "ORDER_TRADE_UPDATE".
+    """
+
+    def __init__(self, client, stream_url=STREAM_URL):
+        self.client = client
+        self.stream_url = stream_url
+        self.listeners = []
+        self.listen_key = None
+        self.ws = None
+        self.running = False
+        self.connected = threading.Event()
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def start(self):
+        import websocket
+
+        self.listen_key = self.client.new_listen_key()["listenKey"]
+        self.ws = websocket.WebSocketApp(f"{self.stream_url}/ws/{self.listen_key}", on_open=self._on_open,
+                                         on_message=self._on_message)
+        # Daemon thread: a stream nobody stops (e.g. the risk cache's) never
+        # keeps a finished script alive
+        threading.Thread(target=self.ws.run_forever, kwargs={"ping_interval": PING_INTERVAL, "reconnect": 5},
+                         daemon=True).start()
+        if not self.connected.wait(CONNECT_TIMEOUT):
+            self.ws.close()
+            raise ConnectionError(f"Could not connect to {self.stream_url}")
+        self.running = True
+        threading.Thread(target=self._keepalive, daemon=True).start()
+        logging.info("User data stream started.")
+
+    def stop(self):
+        self.running = False
+        if self.ws:
+            self.ws.close()
+        if self.listen_key:
+            try:
+                self.client.close_listen_key(self.listen_key)
+            except Exception as e:
+                logging.error(f"❌ Failed to close listen key: {e}")
+
+    def _keepalive(self):
+        while self.running:
+            time.sleep(KEEPALIVE_SECONDS)
+            if not self.running:
+                break
+            try:
+                self.client.renew_listen_key(self.listen_key)
+            except Exception as e:
+                logging.error(f"❌ Failed to renew listen key: {e}")
+
+    def _on_open(self, _):
+        self.connected.set()
+
+    def _on_message(self, _, message):
+        from json_codec import loads
+
+        try:
+            event = loads(message)
+        except ValueError:
+            return
+        if "e" not in event:
+            return  # subscription acks
+        for callback in self.listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                logging.error(f"❌ User stream listener failed: {e}")
@@ -0,0 +1,232 @@
+import os
+import hmac
+import json
+import hashlib
+import logging
+import threading
+from urllib.parse import urlencode
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from json_codec import loads
+
+WS_API_URL = os.getenv("WS_API_URL", "wss://testnet.binancefuture.com/ws-fapi/v1")
+REQUEST_TIMEOUT = 10   # seconds to wait for a response before it is ambiguous
+CONNECT_TIMEOUT = 5
+PING_INTERVAL = 60
+
+# -----------------------------------------------------
+# Websocket order entry (ws-fapi)
+# -----------------------------------------------------
+class WsOrderSession:
+    """
+    One persistent connection to the websocket trading API. Requests are
+    tagged with an id and written without waiting; a reader thread resolves
+    the matching Future when the response arrives, so many orders can be in
+    flight at once on the same socket.
+
+    HMAC keys cannot use session.logon, so each request is signed, with the
+    same (clock-synced) timestamp source as REST.
+    """
+
+    def __init__(self, key, secret, url=WS_API_URL):
+        self.key = key
+        self.secret = secret
+        self.url = url
+        self.ws = None
+        self.pending = {}        # id -> Future
+        self.next_id = 0
+        self.lock = threading.Lock()
+        self.connected = threading.Event()
+
+    @classmethod
+    def from_client(cls, client, url=WS_API_URL):
+        return cls(client.key, client.secret, url)
+
+    def start(self):
+        import websocket
+
+        self.ws = websocket.WebSocketApp(
+            self.url, on_open=self._on_open, on_message=self._on_message,
+            on_close=self._on_close, on_error=self._on_error,
+        )
+        threading.Thread(target=self.ws.run_forever, kwargs={"ping_interval": PING_INTERVAL, "reconnect": 5},
+                         daemon=True).start()
+        if not self.connected.wait(CONNECT_TIMEOUT):
+            raise ConnectionError(f"Could not connect to {self.url}")
+        logging.info(f"Websocket order session connected: {self.url}")
+        return self
+
+    def stop(self):
+        if self.ws:
+            self.ws.close()
+
+    # -------------------------------------------------
+    # Socket callbacks
+    # -------------------------------------------------
+    def _on_open(self, _):
+        self.connected.set()
+
+    def _on_close(self, _, code=None, message=None):
+        self.connected.clear()
+        self._fail_pending(TimeoutError(f"Websocket closed ({code}) with request in flight"))
+
+    def _on_error(self, _, error):
+        logging.warning(f"Websocket order session error: {error}")
+
+    def _on_message(self, _, message):
+        try:
+            msg = loads(message)
+        except ValueError:
+            return
+        with self.lock:
+            future = self.pending.pop(msg.get("id"), None)
+        if future is None:
+            return
+        if msg.get("status") == 200:
+            future.set_result(msg["result"])
+        else:
+            from binance.error import ClientError
+
+            error = msg.get("error", {})
+            future.set_exception(ClientError(msg.get("status"), error.get("code"), error.get("msg"), {}))
+
+    def _fail_pending(self, error):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for future in pending.values():
+            future.set_exception(error)
+
+    # -------------------------------------------------
+    # Requests
+    # -------------------------------------------------
+    def _sign(self, params):
+        import binance.api
+
+        params = {k: (str(v).lower() if isinstance(v, bool) else v) for k, v in params.items() if v is not None}
+        params["apiKey"] = self.key
+        params["timestamp"] = binance.api.get_timestamp()
+        payload = urlencode(sorted(params.items()))
+        params["signature"] = hmac.new(self.secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+        return params
+
+    def request(self, method, params):
+        """
+        Sends a signed request and returns a Future for its result. Raises
+        ConnectionError at once if the socket is down (nothing was sent).
+        """
+        if not self.connected.is_set():
+            raise ConnectionError("Websocket order session is not connected")
+        future = Future()
+        with self.lock:
+            self.next_id += 1
+            request_id = str(self.next_id)
+            self.pending[request_id] = future
+        future.request_id = request_id
+        try:
+            self.ws.send(json.dumps({"id": request_id, "method": method, "params": self._sign(params)}))
+        except Exception as e:
+            with self.lock:
+                self.pending.pop(request_id, None)
+            raise ConnectionError(f"Websocket send failed: {e}")
+        return future
+
+    def call(self, method, params, timeout=REQUEST_TIMEOUT):
+        future = self.request(method, params)
+        try:
+            return future.result(timeout)
+        except (FutureTimeoutError, TimeoutError):
+            # Future.result() raises its own TimeoutError before Python 3.11
+            with self.lock:
+                self.pending.pop(future.request_id, None)
+            # Sent but unanswered: the caller must treat the outcome as unknown
+            raise TimeoutError(f"No response to {method} within {timeout}s")
+
+
+def install(client, session):
+    """
+    Routes client.new_order / new_batch_order / cancel_order / query_order
+    over the websocket session. If the socket is down the original REST
+    method is used instead, since nothing was sent; a request that was sent
+    but got no answer raises TimeoutError (order_submit then looks the order
+    up before resending); in a batch it comes back as an unknown entry,
+    which place_batch looks up the same way.
+    """
+    rest = {name: getattr(client, name) for name in ("new_order", "new_batch_order", "cancel_order", "query_order")}
+
+    def with_fallback(name, method, params):
+        try:
+            return session.call(method, params)
+        except ConnectionError as e:
+            logging.warning(f"Websocket {method} unavailable ({e}); falling back to REST.")
+            return rest[name](**params)
+
+    def ws_new_order(**params):
+        return with_fallback("new_order", "order.place", params)
+
+    def ws_cancel_order(**params):
+        return with_fallback("cancel_order", "order.cancel", params)
+
+    def ws_query_order(**params):
+        return with_fallback("query_order", "order.status", params)
+
+    def ws_new_batch_order(batchOrders):
+        from batch_orders import unknown_result
+
+        # No batch method on the websocket API: send every order at once and
+        # collect the responses, which is what multiplexing buys us. Orders
+        # that could not be sent go over REST in one batch.
+        futures = []
+        for o in batchOrders:
+            try:
+                futures.append(session.request("order.place", dict(o)))
+            except ConnectionError:
+                futures.append(None)
+        unsent = [o for o, f in zip(batchOrders, futures) if f is None]
+        if unsent:
+            logging.warning(f"Websocket unavailable for {len(unsent)} batch orders; falling back to REST.")
+        rest_results = iter(rest["new_batch_order"](unsent) if unsent else [])
+
+        results = []
+        for future in futures:
+            if future is None:
+                results.append(next(rest_results))
+                continue
+            try:
+                results.append(future.result(REQUEST_TIMEOUT))
+            except (FutureTimeoutError, TimeoutError) as e:
+                with session.lock:
+                    session.pending.pop(future.request_id, None)
+                # Sent but unanswered (or the socket closed): it may be live
+                results.append(unknown_result(str(e) or f"No response to order.place within {REQUEST_TIMEOUT}s"))
+            except Exception as e:
+                results.append({"code": getattr(e, "error_code", -1), "msg": getattr(e, "error_message", None) or str(e)})
+        return results
+
+    client.new_order = ws_new_order
+    client.new_batch_order = ws_new_batch_order
+    client.cancel_order = ws_cancel_order
+    client.query_order = ws_query_order
+    return session
+
+
+def start_ws_orders(client):
+    """
+    Opens the websocket order session for client and routes orders over it.
+    Returns None (REST stays in place) if the session cannot be opened.
+    """
+    try:
+        return install(client, WsOrderSession.from_client(client).start())
+    except Exception as e:
+        print(f"⚠️ Websocket order entry unavailable, using REST: {e}")
+        return None
+
+
+def ws_flag(args):
+    """
+    Removes --ws from args in place; returns True if it was given or
+    ORDER_TRANSPORT=ws is set.
+    """
+    if "--ws" in args:
+        args.remove("--ws")
+        return True
+    return os.getenv("ORDER_TRANSPORT", "rest").lower() == "ws"
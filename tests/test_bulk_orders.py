@@ -0,0 +1,108 @@
+import os
+import sys
+import csv
+import logging
+import itertools
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# bulk_orders logs to bot.log on import unless logging is already set up
+logging.getLogger().addHandler(logging.NullHandler())
+
+import risk
+import exchange_cache
+import bulk_orders
+from rate_limiter import ORDER_LIMITER
+
+ROWS = 2000
+PRICE = 2000.0
+QUANTITY = "0.003"   # ~6 USDT a row: 2,000 rows rest ~6,000 USDT per side
+
+
+def symbol_info(symbol):
+    return {"symbol": symbol, "status": "TRADING", "filters": [
+        {"filterType": "PRICE_FILTER", "minPrice": "0.1", "maxPrice": "1000000", "tickSize": "0.1"},
+        {"filterType": "LOT_SIZE", "minQty": "0.001", "maxQty": "1000", "stepSize": "0.001"},
+        {"filterType": "MIN_NOTIONAL", "notional": "5"},
+        {"filterType": "PERCENT_PRICE", "multiplierUp": "1.05", "multiplierDown": "0.95", "multiplierDecimal": "4"},
+    ]}
+
+
+class StubClient:
+    """
+    Accepts every order; just enough of UMFutures for validation, the risk
+    cache and batch placement.
+    """
+
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.placed = []
+
+    def exchange_info(self):
+        return {"symbols": [symbol_info("BTCUSDT")]}
+
+    def ticker_price(self, symbol=None, **kwargs):
+        if symbol is None:
+            return [{"symbol": "BTCUSDT", "price": str(PRICE)}]
+        return {"symbol": symbol, "price": str(PRICE)}
+
+    def mark_price(self, symbol=None, **kwargs):
+        return {"symbol": symbol, "markPrice": str(PRICE)}
+
+    def get_position_risk(self, **kwargs):
+        return []
+
+    def get_orders(self, **kwargs):
+        return []
+
+    def new_order(self, **params):
+        return self.new_batch_order([params])[0]
+
+    def new_batch_order(self, batchOrders):
+        with self.lock:
+            self.placed.extend(batchOrders)
+            return [{"orderId": next(self.ids), "status": "NEW", **o} for o in batchOrders]
+
+    def cancel_order(self, **kwargs):
+        return {}
+
+    def cancel_batch_order(self, **kwargs):
+        return []
+
+    def cancel_open_orders(self, **kwargs):
+        return {}
+
+
+def unthrottle(monkeypatch, limiter):
+    # The test checks that no row is refused, not the pacing
+    for name in ("rate", "capacity", "tokens"):
+        monkeypatch.setattr(limiter, name, 1e9)
+
+
+def test_bulk_run_places_2000_limit_orders_under_default_risk(tmp_path, monkeypatch):
+    monkeypatch.setattr(exchange_cache, "DISK_CACHE_FILE", str(tmp_path / "filters.json"))
+    monkeypatch.setattr(risk, "HALT_FILE", str(tmp_path / "HALT"))
+    path = tmp_path / "orders.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["symbol", "side", "type", "quantity", "price"])
+        for i in range(ROWS):
+            # Both sides; each side alone stays inside the notional limits
+            side, price = ("BUY", PRICE * 0.99) if i % 2 else ("SELL", PRICE * 1.01)
+            writer.writerow(["BTCUSDT", side, "LIMIT", QUANTITY, price])
+
+    client = StubClient()
+    manager = risk.start_risk(client, follow=False, max_open_orders=bulk_orders.BULK_MAX_OPEN_ORDERS)
+    unthrottle(monkeypatch, ORDER_LIMITER)
+    unthrottle(monkeypatch, manager.order_rate)
+    results_path = tmp_path / "orders.results.csv"
+    counts = bulk_orders.run_bulk(client, str(path), str(results_path))
+    manager.stop()
+
+    assert counts == {"placed": ROWS}
+    assert len(client.placed) == ROWS
+    assert len(manager.open_orders) == ROWS
+    with open(results_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [int(r["row"]) for r in rows] == list(range(1, ROWS + 1))
@@ -0,0 +1,51 @@
+import os
+import sys
+import logging
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+logging.getLogger().addHandler(logging.NullHandler())
+
+from data_store import append_rows, load_range, ChainedColumn
+
+DAYS = ["2025-01-01", "2025-01-02", "2025-01-03"]
+
+
+def trade(agg_id):
+    return (agg_id, 100.0 + agg_id, 0.001, agg_id, agg_id, 1000 * agg_id, agg_id % 2)
+
+
+@pytest.fixture
+def store(tmp_path):
+    # Three days of 4, 0 and 3 trades: the empty day must not break indexing
+    append_rows("aggtrades", "BTCUSDT", DAYS[0], [trade(i) for i in range(1, 5)], root=str(tmp_path))
+    append_rows("aggtrades", "BTCUSDT", DAYS[2], [trade(i) for i in range(5, 8)], root=str(tmp_path))
+    return str(tmp_path)
+
+
+def test_range_is_a_chained_view_over_the_days(store):
+    cols = load_range("aggtrades", "BTCUSDT", DAYS, root=store)
+    ids = cols["agg_id"]
+    assert isinstance(ids, ChainedColumn)
+    assert len(ids.parts) == 2
+    assert len(ids) == 7
+    assert list(ids) == list(range(1, 8))
+    assert [ids[0], ids[4], ids[-1]] == [1, 5, 7]
+    with pytest.raises(IndexError):
+        ids[7]
+
+
+def test_slices_cross_partitions_without_copying(store):
+    prices = load_range("aggtrades", "BTCUSDT", DAYS, root=store)["price"]
+    tail = prices[-4:]
+    assert isinstance(tail, ChainedColumn)
+    assert list(tail) == [104.0, 105.0, 106.0, 107.0]
+    assert list(prices[2:5]) == [103.0, 104.0, 105.0]
+    assert list(prices[::3]) == [101.0, 104.0, 107.0]
+
+
+def test_missing_days_load_empty(tmp_path):
+    cols = load_range("aggtrades", "BTCUSDT", DAYS, root=str(tmp_path))
+    assert len(cols["time"]) == 0
+    assert list(cols["time"][-3:]) == []
@@ -0,0 +1,40 @@
+import os
+import sys
+import logging
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+logging.getLogger().addHandler(logging.NullHandler())
+
+from grid_layout import build_ladder
+
+
+def test_arithmetic_ladder_splits_around_the_mid():
+    buys, sells = build_ladder(90, 110, 5, "arithmetic", 0.1, mid_price=100)
+    assert buys == [95.0, 90.0]
+    assert sells == [105.0, 110.0]
+
+
+def test_levels_are_rounded_away_from_the_mid():
+    buys, sells = build_ladder(90.05, 110.05, 3, "arithmetic", 0.1, mid_price=100)
+    assert buys == [90.0]
+    assert sells == [100.1, 110.1]
+
+
+def test_geometric_ladder_has_equal_ratios():
+    buys, sells = build_ladder(100, 1600, 5, "geometric", 0.01, mid_price=500)
+    assert buys == [400.0, 200.0, 100.0]
+    assert sells == [800.0, 1600.0]
+
+
+def test_atr_ladder_is_centred_and_clipped_to_the_range():
+    buys, sells = build_ladder(95, 120, 7, "atr", 0.1, mid_price=100, atr=2, atr_mult=2.5)
+    assert buys == [95.0]
+    assert sells == [105.0, 110.0, 115.0]
+
+
+def test_levels_on_the_same_tick_merge():
+    buys, sells = build_ladder(99.9, 100.1, 9, "arithmetic", 0.1, mid_price=100)
+    assert buys == [99.9]
+    assert sells == [100.1]
@@ -0,0 +1,26 @@
+import os
+import sys
+import logging
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+logging.getLogger().addHandler(logging.NullHandler())
+
+from multi_account import split_by_weight
+
+
+@pytest.mark.parametrize("total, weights, expected", [
+    (1.0, [1, 1], [0.5, 0.5]),
+    (0.01, [2, 1, 1], [0.005, 0.003, 0.002]),   # the odd step goes to the largest remainder
+    (0.0105, [1, 1], [0.005, 0.005]),           # total is rounded down to the step first
+    (0.002, [1, 1, 1], [0.001, 0.001, 0.0]),
+])
+def test_split_by_weight(total, weights, expected):
+    assert split_by_weight(total, weights, 0.001) == expected
+
+
+def test_parts_always_add_up_to_the_total():
+    for units in range(1, 200):
+        parts = split_by_weight(units * 0.001, [3, 5, 7], 0.001)
+        assert round(sum(parts), 10) == round(units * 0.001, 10)
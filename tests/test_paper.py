@@ -0,0 +1,116 @@
+import os
+import sys
+import logging
+
+import pytest
+from binance.error import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+logging.getLogger().addHandler(logging.NullHandler())
+
+from paper import PaperExchange, MAKER_FEE, TAKER_FEE
+from records import OrderRecord
+
+PRICE = 100.0
+
+
+class StubClient:
+    """
+    The market-data side of UMFutures: one fixed price for every symbol.
+    """
+
+    def ticker_price(self, symbol=None, **kwargs):
+        return {"symbol": symbol, "price": str(PRICE)}
+
+
+@pytest.fixture
+def exchange():
+    paper = PaperExchange(StubClient())
+    paper.on_price("BTCUSDT", PRICE)
+    return paper
+
+
+def limit(exchange, side, price, qty="1", **kwargs):
+    return exchange.new_order("BTCUSDT", side, "LIMIT", timeInForce="GTC", quantity=qty, price=price, **kwargs)
+
+
+def fills(exchange):
+    return [(t["orderId"], t["side"], float(t["price"]), float(t["qty"])) for t in exchange.trades]
+
+
+def test_market_order_fills_completely_at_the_last_price(exchange):
+    order = exchange.new_order("BTCUSDT", "BUY", "MARKET", quantity="0.5")
+    assert order["status"] == "FILLED"
+    assert order["executedQty"] == "0.5"
+    assert fills(exchange) == [(order["orderId"], "BUY", PRICE, 0.5)]
+    assert exchange.pnl()["BTCUSDT"]["fees"] == pytest.approx(0.5 * PRICE * TAKER_FEE)
+
+
+def test_crossing_limit_fills_as_taker_at_the_market_price(exchange):
+    order = limit(exchange, "BUY", 105)
+    assert order["status"] == "FILLED"
+    assert order["avgPrice"] == str(PRICE)
+
+
+def test_resting_bids_fill_best_price_first_then_oldest(exchange):
+    first = limit(exchange, "BUY", 98)["orderId"]
+    second = limit(exchange, "BUY", 99)["orderId"]
+    third = limit(exchange, "BUY", 98)["orderId"]
+    assert len(exchange.get_orders("BTCUSDT")) == 3
+
+    exchange.on_price("BTCUSDT", 99)
+    assert [f[0] for f in fills(exchange)] == [second]
+    exchange.on_price("BTCUSDT", 97)
+    assert [f[0] for f in fills(exchange)] == [second, first, third]
+    # Resting orders fill at their own limit, as makers
+    assert [f[2] for f in fills(exchange)] == [99, 98, 98]
+    assert exchange.pnl()["BTCUSDT"]["fees"] == pytest.approx((99 + 98 + 98) * MAKER_FEE)
+    assert exchange.get_orders("BTCUSDT") == []
+
+
+def test_resting_asks_fill_lowest_price_first(exchange):
+    high = limit(exchange, "SELL", 103)["orderId"]
+    low = limit(exchange, "SELL", 101)["orderId"]
+    exchange.on_price("BTCUSDT", 102)
+    assert [f[0] for f in fills(exchange)] == [low]
+    exchange.on_price("BTCUSDT", 103)
+    assert [f[0] for f in fills(exchange)] == [low, high]
+
+
+def test_cancelled_order_never_fills(exchange):
+    order = limit(exchange, "BUY", 99)
+    exchange.cancel_order("BTCUSDT", orderId=order["orderId"])
+    exchange.on_price("BTCUSDT", 90)
+    assert fills(exchange) == []
+    assert exchange.query_order("BTCUSDT", orderId=order["orderId"])["status"] == "CANCELED"
+
+
+def test_reduce_only_fills_partially_up_to_the_position(exchange):
+    exchange.new_order("BTCUSDT", "BUY", "MARKET", quantity="0.3")
+    order = exchange.new_order("BTCUSDT", "SELL", "MARKET", quantity="1", reduceOnly="true")
+    assert order["status"] == "FILLED"
+    assert float(order["executedQty"]) == pytest.approx(0.3)
+    assert exchange.pnl()["BTCUSDT"]["position"] == 0
+    # Nothing left to reduce: the next one expires unfilled
+    order = exchange.new_order("BTCUSDT", "SELL", "MARKET", quantity="1", reduceOnly="true")
+    assert order["status"] == "EXPIRED"
+
+
+def test_stop_market_triggers_through_the_stop_price(exchange):
+    exchange.new_order("BTCUSDT", "BUY", "MARKET", quantity="1")
+    stop = exchange.new_order("BTCUSDT", "SELL", "STOP_MARKET", quantity="1", stopPrice=95, reduceOnly="true")
+    exchange.on_price("BTCUSDT", 96)
+    assert exchange.query_order("BTCUSDT", orderId=stop["orderId"])["status"] == "NEW"
+    exchange.on_price("BTCUSDT", 94)
+    assert exchange.query_order("BTCUSDT", orderId=stop["orderId"])["status"] == "FILLED"
+    assert exchange.pnl()["BTCUSDT"]["realized"] == pytest.approx(-6)
+
+
+def test_final_orders_are_archived_as_records(exchange):
+    order = limit(exchange, "BUY", 99, newClientOrderId="grid-1")
+    exchange.on_price("BTCUSDT", 99)
+    stored = exchange.orders[order["orderId"]]
+    assert isinstance(stored, OrderRecord)
+    assert exchange.query_order("BTCUSDT", origClientOrderId="grid-1") == stored.to_dict()
+    with pytest.raises(ClientError):
+        limit(exchange, "BUY", 99, newClientOrderId="grid-1")
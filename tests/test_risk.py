@@ -0,0 +1,147 @@
+import os
+import sys
+import logging
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+logging.getLogger().addHandler(logging.NullHandler())
+
+import risk
+from risk import RiskManager, RiskError
+
+PRICE = 100000.0
+
+
+class StubClient:
+    """
+    The REST calls RiskManager.load() makes, with a fixed position book.
+    Counts ticker_price calls so tests can check the order path never
+    makes one.
+    """
+
+    def __init__(self, positions=(), orders=()):
+        self.positions = list(positions)
+        self.orders = list(orders)
+        self.ticker_calls = 0
+
+    def get_position_risk(self, **kwargs):
+        return self.positions
+
+    def get_orders(self, **kwargs):
+        return self.orders
+
+    def ticker_price(self, symbol=None, **kwargs):
+        self.ticker_calls += 1
+        return [{"symbol": "BTCUSDT", "price": str(PRICE)}, {"symbol": "ETHUSDT", "price": "4000"}]
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(risk, "HALT_FILE", str(tmp_path / "HALT"))
+
+    def make(client=None, **limits):
+        limits.setdefault("max_orders_per_sec", 0)
+        limits.setdefault("max_open_orders", 0)
+        limits.setdefault("max_order_notional", 0)
+        m = RiskManager(client or StubClient(), **limits).load()
+        m.ready.set()
+        return m
+    return make
+
+
+def rest(m, order_id, symbol, side, qty, price=PRICE):
+    m.on_accepted({"symbol": symbol, "side": side, "type": "LIMIT", "quantity": qty, "price": price},
+                  {"orderId": order_id, "status": "NEW"})
+
+
+def test_opposite_sides_do_not_offset(manager):
+    # 0.05 BTC at 100k is 5,000 USDT; 50,000 allows ten orders per side
+    m = manager(max_symbol_notional=50000, max_account_notional=0)
+    accepted = 0
+    with pytest.raises(RiskError, match="BTCUSDT exposure"):
+        for i in range(1000):
+            side = "BUY" if i % 2 == 0 else "SELL"
+            m.check("BTCUSDT", side, 0.05, PRICE)
+            rest(m, i, "BTCUSDT", side, 0.05)
+            accepted += 1
+    # Ten BUYs and ten SELLs rest; the 21st order would be the 11th BUY
+    assert accepted == 20
+
+
+def test_worst_side_includes_the_position(manager):
+    client = StubClient(positions=[{"symbol": "BTCUSDT", "positionAmt": "0.3", "markPrice": str(PRICE)}])
+    m = manager(client, max_symbol_notional=50000, max_account_notional=0)
+    # Long 0.3: resting SELLs reduce exposure first, then open a short
+    m.check("BTCUSDT", "SELL", 0.08, PRICE)
+    rest(m, 1, "BTCUSDT", "SELL", 0.08)
+    m.check("BTCUSDT", "BUY", 0.1, PRICE)      # long side: 0.4 BTC = 40,000
+    rest(m, 2, "BTCUSDT", "BUY", 0.1)
+    with pytest.raises(RiskError):
+        m.check("BTCUSDT", "BUY", 0.15, PRICE)  # long side would be 0.55 BTC
+    m.check("BTCUSDT", "SELL", 0.08, PRICE)    # both SELLs filling leaves +0.14
+
+
+def test_account_limit_sums_worst_sides(manager):
+    m = manager(max_symbol_notional=0, max_account_notional=30000)
+    rest(m, 1, "ETHUSDT", "BUY", 2.5, 4000)    # 10,000
+    rest(m, 2, "ETHUSDT", "SELL", 2.5, 4000)   # does not offset the BUY
+    m.check("BTCUSDT", "SELL", 0.1, PRICE)     # 10,000 + 10,000
+    with pytest.raises(RiskError, match="account exposure"):
+        m.check("BTCUSDT", "SELL", 0.25, PRICE)
+
+
+def test_batch_is_checked_cumulatively(manager):
+    m = manager(max_symbol_notional=20000, max_account_notional=0)
+    with pytest.raises(RiskError):
+        m.check_batch([("BTCUSDT", "BUY", 0.1, PRICE, False)] * 3)
+    m.check_batch([("BTCUSDT", "BUY", 0.1, PRICE, False), ("BTCUSDT", "SELL", 0.1, PRICE, False)] * 2)
+
+
+def test_market_order_uses_price_seeded_by_load(manager):
+    client = StubClient()
+    m = manager(client, max_order_notional=10000)
+    calls = client.ticker_calls
+    m.check("ETHUSDT", "BUY", 2, None)
+    with pytest.raises(RiskError, match="order notional"):
+        m.check("BTCUSDT", "BUY", 0.2, None)
+    with pytest.raises(RiskError, match="no known price"):
+        m.check("NEWUSDT", "BUY", 1, None)
+    assert client.ticker_calls == calls
+
+
+def test_reduce_only_skips_notional_checks(manager):
+    m = manager(max_order_notional=1000)
+    m.check("BTCUSDT", "SELL", 1, PRICE, reduce_only=True)
+
+
+def test_open_order_limit_counts_the_whole_batch(manager):
+    m = manager(max_open_orders=3)
+    rest(m, 1, "BTCUSDT", "BUY", 0.01)
+    m.check_batch([("BTCUSDT", "BUY", 0.01, PRICE, False)] * 2)
+    with pytest.raises(RiskError, match="open order limit"):
+        m.check_batch([("BTCUSDT", "BUY", 0.01, PRICE, False)] * 3)
+
+
+def test_halted_manager_refuses_every_order(manager):
+    m = manager()
+    m.halted = True
+    with pytest.raises(RiskError, match="kill switch"):
+        m.check("BTCUSDT", "SELL", 0.001, PRICE, reduce_only=True)
+
+
+def test_cancel_and_fill_events_release_exposure(manager):
+    m = manager(max_symbol_notional=20000, max_account_notional=0)
+    rest(m, 1, "BTCUSDT", "BUY", 0.1)
+    rest(m, 2, "BTCUSDT", "BUY", 0.1)
+    with pytest.raises(RiskError):
+        m.check("BTCUSDT", "BUY", 0.1, PRICE)
+    m.on_cancelled("BTCUSDT", [1])
+    m.check("BTCUSDT", "BUY", 0.1, PRICE)
+    # Order 2 fills: it leaves the book and becomes a 0.1 position
+    m.on_event({"e": "ORDER_TRADE_UPDATE", "o": {"s": "BTCUSDT", "S": "BUY", "X": "FILLED", "i": 2,
+                                                  "q": "0.1", "z": "0.1", "p": str(PRICE), "L": str(PRICE)}})
+    m.on_event({"e": "ACCOUNT_UPDATE", "a": {"P": [{"s": "BTCUSDT", "pa": "0.1"}]}})
+    assert m.exposure["BTCUSDT"] == (0.1, 0.0, 0.0)
+    with pytest.raises(RiskError):
+        m.check("BTCUSDT", "BUY", 0.15, PRICE)
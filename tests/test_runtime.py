@@ -0,0 +1,50 @@
+import os
+import sys
+import logging
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+logging.getLogger().addHandler(logging.NullHandler())
+
+import risk
+import runtime
+import dashboard
+import time_sync
+import ws_orders
+from shutdown import shutdown
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    seen = []
+
+    def record(name):
+        return lambda *args, **kwargs: seen.append(name)
+
+    monkeypatch.setattr(time_sync, "start_time_sync", record("time_sync"))
+    monkeypatch.setattr(ws_orders, "start_ws_orders", record("ws"))
+    monkeypatch.setattr(risk, "start_risk", record("risk"))
+    monkeypatch.setattr(runtime, "instrument_client", record("profile"))
+    monkeypatch.setattr(shutdown, "install", record("shutdown"))
+    monkeypatch.setattr(dashboard, "start_dashboard", record("dashboard"))
+    return seen
+
+
+def test_flags_are_removed_from_args(monkeypatch):
+    monkeypatch.delenv("ORDER_TRANSPORT", raising=False)
+    args = ["twap.py", "BTCUSDT", "--paper", "BUY", "--dashboard", "--ws"]
+    options = runtime.flags(args)
+    assert args == ["twap.py", "BTCUSDT", "BUY"]
+    assert (options.paper, options.profile, options.ws, options.dashboard) == (True, False, True, True)
+
+
+def test_services_start_in_a_fixed_order(calls):
+    runtime.setup(runtime.Options(profile=True, ws=True, dashboard=True), "twap", object())
+    # Risk wraps the websocket order methods, profiling wraps both
+    assert calls == ["time_sync", "ws", "risk", "profile", "shutdown", "dashboard"]
+
+
+def test_paper_runs_skip_the_exchange_services(calls):
+    runtime.setup(runtime.Options(paper=True, ws=True), "grid_orders", object(), risk=False)
+    assert calls == ["shutdown"]
@@ -0,0 +1,35 @@
+import os
+import sys
+import logging
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+logging.getLogger().addHandler(logging.NullHandler())
+
+from scheduler import next_run, parse_every
+
+
+def utc(text):
+    return datetime.strptime(text, "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc).timestamp()
+
+
+@pytest.mark.parametrize("value, seconds", [(90, 90), ("90s", 90), ("15m", 900), ("6h", 21600), ("1d", 86400)])
+def test_parse_every(value, seconds):
+    assert parse_every(value) == seconds
+
+
+def test_unanchored_job_repeats_from_the_last_run():
+    assert next_run({"every_s": 900}, 1000.0) == 1900.0
+
+
+@pytest.mark.parametrize("after, expected", [
+    ("2025-03-01 08:59", "2025-03-01 09:00"),
+    ("2025-03-01 09:00", "2025-03-01 15:00"),   # strictly after
+    ("2025-03-01 21:30", "2025-03-02 03:00"),
+    ("2025-03-01 02:00", "2025-03-01 03:00"),   # before the anchor: runs on the 6h grid through it
+])
+def test_anchored_job_stays_on_its_grid(after, expected):
+    job = {"every_s": 6 * 3600, "at": "09:00"}
+    assert next_run(job, utc(after)) == utc(expected)
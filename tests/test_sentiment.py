@@ -0,0 +1,52 @@
+import os
+import sys
+import logging
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+logging.getLogger().addHandler(logging.NullHandler())
+
+from sentiment import SentimentFeed, SIGNAL_ALPHA
+
+
+class FlakyFeed(SentimentFeed):
+    """
+    Seeds three history values; fetch() fails `failures` times, then
+    returns the values given.
+    """
+
+    def __init__(self, values, failures=0):
+        super().__init__()
+        self.values = list(values)
+        self.failures = failures
+
+    def history(self):
+        return [1.0, 2.0, 3.0]
+
+    def fetch(self):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("feed down")
+        return self.values.pop(0)
+
+    def to_signal(self, raw):
+        return raw
+
+
+def test_failed_fetches_do_not_seed_history_again():
+    feed = FlakyFeed([4.0], failures=2)
+    for _ in range(3):
+        try:
+            feed.refresh()
+        except RuntimeError:
+            pass
+    assert list(feed.stats.values) == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_signal_is_clipped_and_smoothed():
+    feed = FlakyFeed([5.0, -0.5])
+    feed.refresh()
+    assert feed.signal == 1.0
+    feed.refresh()
+    assert feed.signal == pytest.approx(SIGNAL_ALPHA * -0.5 + (1 - SIGNAL_ALPHA) * 1.0)
@@ -0,0 +1,55 @@
+import os
+import sys
+import logging
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "advanced"))
+logging.getLogger().addHandler(logging.NullHandler())
+
+from twap_with_sentiment import next_slice_qty, MIN_SLICE_TILT, MAX_SLICE_TILT
+
+PRICE = 100000.0
+FILTERS = {"step_size": 0.001, "min_qty": 0.001, "min_notional": 5.0}
+
+
+def schedule(total, num_slices, tilt):
+    even = total / num_slices
+    remaining, slices = total, []
+    for i in range(num_slices):
+        qty = next_slice_qty(remaining, num_slices - i, tilt, PRICE, FILTERS, even)
+        slices.append(qty)
+        remaining = round(remaining - qty, 10)
+    return slices
+
+
+@pytest.mark.parametrize("num_slices", [5, 10, 20])
+@pytest.mark.parametrize("tilt", [MIN_SLICE_TILT, 0.8, 1.0, 1.2, MAX_SLICE_TILT])
+def test_every_slice_stays_within_the_tilt_range(num_slices, tilt):
+    total = 1.0
+    even = total / num_slices
+    slices = schedule(total, num_slices, tilt)
+
+    assert round(sum(slices), 10) == total
+    for qty in slices:
+        assert even * MIN_SLICE_TILT - FILTERS["step_size"] <= qty <= even * MAX_SLICE_TILT + FILTERS["step_size"]
+
+
+def test_persistent_low_tilt_does_not_pile_up_in_the_last_slice():
+    # Unbounded, a 0.5 tilt on every slice left ~35% of 10 slices for the last
+    slices = schedule(1.0, 10, MIN_SLICE_TILT)
+    assert slices[-1] <= 0.15 + FILTERS["step_size"]
+    assert slices[0] == pytest.approx(0.05)
+
+
+def test_neutral_tilt_gives_even_slices():
+    assert schedule(1.0, 10, 1.0) == [0.1] * 10
+
+
+def test_slices_stay_tradable():
+    # 0.006 over 5 slices is below min notional per even slice: slices are
+    # raised to the minimum, and none leaves an untradable remainder
+    slices = schedule(0.006, 5, 1.0)
+    assert round(sum(slices), 10) == 0.006
+    assert all(qty * PRICE >= FILTERS["min_notional"] for qty in slices if qty)
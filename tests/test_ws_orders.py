@@ -0,0 +1,55 @@
+import os
+import sys
+import logging
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+logging.getLogger().addHandler(logging.NullHandler())
+
+import ws_orders
+from ws_orders import WsOrderSession, install
+
+
+class SilentSocket:
+    """
+    Accepts every frame and never answers.
+    """
+
+    def send(self, data):
+        pass
+
+
+class StubClient:
+    def new_order(self, **params):
+        raise AssertionError("a sent request must not fall back to REST")
+
+    def new_batch_order(self, batchOrders):
+        raise AssertionError("a sent request must not fall back to REST")
+
+    cancel_order = query_order = new_order
+
+
+@pytest.fixture
+def session():
+    s = WsOrderSession("key", "secret")
+    s.ws = SilentSocket()
+    s.connected.set()
+    return s
+
+
+def test_unanswered_call_raises_builtin_timeout(session):
+    with pytest.raises(TimeoutError, match="No response to order.place"):
+        session.call("order.place", {"symbol": "BTCUSDT"}, timeout=0.05)
+    assert session.pending == {}
+
+
+def test_unanswered_batch_entries_come_back_unknown(session, monkeypatch):
+    from batch_orders import is_unknown
+
+    monkeypatch.setattr(ws_orders, "REQUEST_TIMEOUT", 0.05)
+    client = StubClient()
+    install(client, session)
+    results = client.new_batch_order([{"symbol": "BTCUSDT", "side": "BUY"}] * 2)
+    assert all(is_unknown(r) for r in results)
+    assert session.pending == {}